@@ -1,24 +1,1946 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog 
 import os
+import sys
 from dotenv import load_dotenv
 import pyupbit
+import requests
 import time
 import threading
 import datetime 
+import json
+import bisect
+import heapq
+import itertools
+import random
+import collections
+import queue
+import multiprocessing
 import pandas as pd
 import numpy as np 
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.ticker import FuncFormatter 
+from matplotlib.collections import LineCollection
+import matplotlib.dates as mdates
+from pyupbit.errors import UpbitLimitError, TooManyRequests
 
 # 버전 관리 변수 설정
 APP_VERSION = "v00.01.06" 
 LOG_DIR = "../TRADING_LOG" 
 
+# Upbit REST API 주소 (환경 변수 UPBIT_API_BASE_URL 로 모의 거래소 mock_upbit_server.py 등 다른 주소 사용)
+UPBIT_API_URL = "https://api.upbit.com"
+
+# 종료 처리 (트레이딩 스레드/백그라운드 저장 대기 한도)
+STOP_RESTART_GRACE_MS = 10000 # 종료 요청 후 이 시간이 지나도 트레이딩 스레드가 살아 있으면 종료 대기 상태 표시 (재시작은 스레드 종료 후에만)
+FLUSH_JOIN_TIMEOUT = 30 # 최종 저장 전 트레이딩 스레드 종료 대기 (초, 백그라운드)
+CLOSE_FLUSH_TIMEOUT = 15 # 창 닫기 시 백그라운드 저장 완료 대기 (초)
+
+# 샘플링 프로파일러 (켜져 있을 때만 스레드 하나가 주기적으로 스택을 수집, 꺼져 있으면 부하 없음)
+PROFILER_INTERVAL = 0.005 # 스택 샘플링 간격 (초)
+PROFILER_DEFAULT_SECONDS = 30 
+
 # 전역 디버깅/개발 설정
 DEBUG_MODE_CANDLE = False 
 
+# 시간봉별 캔들 길이 (초)
+INTERVAL_SECONDS = {'minute1': 60, 'minute3': 180, 'minute5': 300, 'minute10': 600, 'minute15': 900, 
+                    'minute30': 1800, 'minute60': 3600, 'hour1': 3600, 'minute240': 14400, 'hour4': 14400, 
+                    'day': 86400, 'week': 604800}
+
+# 시간봉 선택값(표시 이름) ↔ pyupbit 시간봉
+TIMEFRAMES = {'1분': 'minute1', '3분': 'minute3', '5분': 'minute5', '10분': 'minute10', '15분': 'minute15', 
+              '30분': 'minute30', '1시간': 'hour1', '4시간': 'hour4', '1일': 'day', '1주': 'week'}
+TIMEFRAME_LABELS = {interval: label for label, interval in TIMEFRAMES.items()}
+
+# 스케줄러 설정 (캔들 마감 후 Upbit 반영 대기용 지터, 주봉은 월요일 09:00 KST 기준 정렬)
+SCHEDULER_JITTER_SECONDS = 1.5 
+WEEK_ALIGN_OFFSET_SECONDS = 4 * 86400 
+
+# 성능 지표 설정
+METRICS_FILE = os.path.join(LOG_DIR, "METRICS.json")
+METRICS_REFRESH_MS = 1000 
+METRICS_DUMP_EVERY = 10 
+METRICS_BUCKET_BOUNDS = [10 ** (i / 20.0) * 1e-5 for i in range(0, 141)] 
+
+# 캔들 저장소 설정
+CANDLE_ARCHIVE_DIR = os.path.join(LOG_DIR, "CANDLES")
+CANDLE_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'value']
+CANDLE_TIME_FORMAT = '%Y-%m-%d %H:%M:%S' # 일자 파일 시각 형식 (자정 캔들도 시각까지 기록)
+KST_EPOCH = pd.Timestamp('1970-01-01 09:00:00') 
+
+# 5분봉 50선 전략 신호 비트 (compute_signal_flags 결과, 캔들 1개당 uint16)
+SIGNAL_TREND_OK = 1 << 0          # 최근 12개 캔들 정배열 (MA200 > VWMA100 > MA50)
+SIGNAL_PREV_BREAKOUT = 1 << 1     # 직전 캔들 50MA 상향 돌파 (시가 <= MA50 < 종가)
+SIGNAL_ABOVE_MA50 = 1 << 2        # 현재 캔들 시가/종가 모두 50MA 위
+SIGNAL_NEAR_MA200 = 1 << 3        # 직전 종가가 200MA 0.5% 이내
+SIGNAL_BREAKOUT = 1 << 4          # PREV_BREAKOUT & ABOVE_MA50 & ~NEAR_MA200
+SIGNAL_BELOW_MA50_10 = 1 << 5     # 최근 10개 종가 모두 50MA 아래
+SIGNAL_HIGH_REACH_MA200 = 1 << 6  # 현재 고가가 200MA 도달
+SIGNAL_TRAILING_SELL = 1 << 7     # 종가 50MA 하향 돌파 (직전 종가는 50MA 이상)
+SIGNAL_BELOW_MA50_3 = 1 << 8      # 최근 3개 고가 모두 50MA 아래
+SIGNAL_STOP_1 = 1 << 9            # 저가가 50MA 대비 0.7% 이상 하락
+SIGNAL_STOP_2 = 1 << 10           # 직전 캔들 시가/종가 50MA 아래 & 현재 음봉
+SIGNAL_BUY = SIGNAL_TREND_OK | SIGNAL_BREAKOUT
+SIGNAL_NAMES = {
+    'trend_ok': SIGNAL_TREND_OK, 'prev_breakout': SIGNAL_PREV_BREAKOUT, 'above_ma50': SIGNAL_ABOVE_MA50,
+    'near_ma200': SIGNAL_NEAR_MA200, 'breakout': SIGNAL_BREAKOUT, 'below_ma50_10': SIGNAL_BELOW_MA50_10,
+    'high_reach_ma200': SIGNAL_HIGH_REACH_MA200, 'trailing_sell': SIGNAL_TRAILING_SELL, 'below_ma50_3': SIGNAL_BELOW_MA50_3,
+    'stop_signal_1': SIGNAL_STOP_1, 'stop_signal_2': SIGNAL_STOP_2, 'buy': SIGNAL_BUY,
+}
+
+# 신호 인덱스 (캔들 보관소의 종목/시간봉 디렉터리에 마감 캔들별 신호 플래그를 고정 길이 레코드로 보관)
+SIGNAL_INDEX_FILE = "signals.bin"
+SIGNAL_INDEX_MAGIC = b'SIGIDX01'
+SIGNAL_INDEX_DTYPE = np.dtype([('epoch', '<i8'), ('flags', '<u2')]) # 10바이트
+SIGNAL_INDEX_LOOKBACK = 256 # 증분 계산에 유지할 직전 캔들 수 (MA200 + 정배열 12개 = 211개 이상)
+
+# 종목별 캔들 버퍼 크기 (전략 판단: MA200 + 정배열 12개 = 211개 이상, 상세 차트: 200개 + MA200 = 399개)
+CANDLE_BUFFER_SIZE = 224
+CHART_BUFFER_SIZE = 400
+
+# 전체 마켓 스캐너 설정
+SCANNER_WINDOW = 256 
+SCANNER_MAX_CANDIDATES = 5 
+SCANNER_REQUEST_INTERVAL = 0.11 
+MARKET_LIST_TTL = 60 # 상장 종목 목록(/market/all) 캐시 유지 시간 (초) - 종목별 사이클마다 조회하지 않음
+
+# 차트 모드 (최근 200봉 캔들스틱 / 장기 이력 LOD: 화면 픽셀 열 단위 OHLC 집계 + 캔들 보관소 지연 로드)
+CHART_MODE_RECENT = '최근 200봉'
+CHART_MODE_LOD = '장기 (LOD)'
+LOD_INITIAL_DAYS = 7 # 장기 차트 최초 진입 시 보관소에서 읽을 일수
+LOD_LOAD_MARGIN_DAYS = 3 # 과거로 이동 시 화면 밖으로 추가로 미리 읽을 일수
+LOD_DEFAULT_CANDLES = 400 # 장기 차트 최초 표시 캔들 수
+LOD_REDRAW_DELAY_MS = 150 # 이동/확대 후 재집계까지 대기 (연속 드래그 중 재계산 방지)
+
+# 종목 대시보드 (스파크라인은 종목별 최근 종가를 한 배열에 모아 하나의 이미지로 그림)
+SPARKLINE_POINTS = 120 # 스파크라인 캔들 수 (= 이미지 가로 픽셀)
+DASHBOARD_ROW_HEIGHT = 24
+DASHBOARD_REFRESH_MS = 1000
+DASHBOARD_BACKGROUND = (22, 27, 34) # '#161b22'
+DASHBOARD_UP_COLOR = (39, 161, 153) # '#27A199'
+DASHBOARD_DOWN_COLOR = (231, 76, 60) # '#E74C3C'
+
+DASHBOARD_COLUMNS = ((8, 'w'), (190, 'e'), (205, 'w'), (390, 'e')) # 종목 / 현재가 / 상태 / 수익률 (x, anchor)
+DASHBOARD_SPARK_X = 405
+
+# 포지션 상태 (opening → open → half_sold → closing → 삭제)
+POSITION_OPENING = 'opening'
+POSITION_OPEN = 'open'
+POSITION_HALF_SOLD = 'half_sold'
+POSITION_CLOSING = 'closing'
+POSITION_SHARDS = 16
+
+# 실행 엔진 (멀티 프로세스: 종목을 워커 프로세스에 나눠 캔들 조회/지표 계산, 주문/포지션은 코디네이터가 처리)
+# 기본값은 단일 스레드 - 멀티 프로세스는 다중 코어 확장성이 측정되기 전까지 선택 사항으로만 제공
+ENGINE_THREAD = '단일 스레드'
+ENGINE_PROCESS = '멀티 프로세스'
+SHARD_WORKERS = max(1, os.cpu_count() or 1)
+SHARD_RESULT_POLL = 0.2 # 샤드 결과 대기 중 종료 요청 확인 주기 (초)
+SHARD_JOIN_TIMEOUT = 5 # 엔진 종료 시 워커 프로세스 종료 대기 (초, 이후 강제 종료)
+
+# 가상 매매(SIMULATION/DEVELOPMENT) 장부 설정
+PAPER_INITIAL_CASH = 10_000_000 
+PAPER_FEE_RATE = 0.0005 
+PAPER_SLIPPAGE = 0.0 
+PAPER_POSITION_DTYPE = np.dtype([
+    ('quantity', 'f8'), ('cost', 'f8'), ('avg_price', 'f8'), ('last_price', 'f8'),
+    ('realized_pnl', 'f8'), ('fees', 'f8'), ('buys', 'i4'), ('sells', 'i4'),
+])
+PAPER_FILL_DTYPE = np.dtype([
+    ('epoch', 'f8'), ('slot', 'i4'), ('side', 'i1'), ('price', 'f8'),
+    ('quantity', 'f8'), ('amount', 'f8'), ('fee', 'f8'), ('realized_pnl', 'f8'), ('cash', 'f8'),
+])
+
+# 전략 판단 로그 (판단/사유가 바뀔 때만 텍스트 로그, 매 틱 상세는 바이너리 트레이스)
+DECISION_SUMMARY_SECONDS = 3600 # 반복 생략된 판단 요약 로그 주기 (시계 기준 초)
+DECISION_TRACE_MAGIC = b'DTRACE01'
+DECISION_TRACE_BATCH = 512 # 트레이스 레코드를 모아서 쓰는 단위
+DECISION_TRACE_DTYPE = np.dtype([
+    ('epoch', '<i8'), ('candle_epoch', '<i8'), ('ticker', 'S16'), ('action', 'u1'), ('reason', 'u1'),
+    ('flags', '<u2'), ('price', '<f8'), ('profit_rate', '<f4'),
+])
+DECISION_ACTIONS = ["Wait", "Buy", "Hold", "Sell (Half)", "Sell"] # 트레이스 action 코드 = 목록 위치
+DECISION_REASONS = [ # 트레이스 reason 코드 = 목록 위치
+    "없음", "매수 조건 만족", "매수 대기: 정배열 미달", "매수 대기: 50MA 돌파 미달", "매수 대기: 200MA 근접",
+    "주문 진행 중", "절반 매도 대기: 10캔들 50MA 아래", "절반 매도 생략", "절반 매도",
+    "나머지 매도 대기: 10캔들 50MA 아래", "나머지 매도: 50MA 하향 돌파", "나머지 매도: 수익 1% 미만",
+    "보유: 나머지 매도 대기", "손절 대기: 10캔들 50MA 아래", "손절 매도", "보유: 손절 대기", "보유: 매수 캔들 진행 중",
+]
+(REASON_NONE, REASON_BUY, REASON_WAIT_TREND, REASON_WAIT_BREAKOUT, REASON_WAIT_NEAR_MA200,
+ REASON_PENDING, REASON_HALF_WAIT, REASON_HALF_SKIPPED, REASON_HALF_SELL,
+ REASON_REST_WAIT, REASON_REST_SELL_TRAILING, REASON_REST_SELL_BELOW,
+ REASON_HOLD_REST, REASON_STOP_WAIT, REASON_STOP_SELL, REASON_HOLD_STOP, REASON_HOLD_BUY_CANDLE) = range(len(DECISION_REASONS))
+
+
+class LatencyHistogram:
+    """로그 스케일 버킷 기반 지연 시간 히스토그램 (백분위 근사치 계산용)"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(METRICS_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        """측정값(초)을 해당 버킷에 누적"""
+        self.counts[bisect.bisect_left(METRICS_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """q(0~100) 백분위 지연 시간(초) - 버킷 상한값 기준, 최대값을 넘지 않음"""
+        if self.count == 0:
+            return 0.0
+        rank = self.count * q / 100.0
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank and bucket_count:
+                if index >= len(METRICS_BUCKET_BOUNDS):
+                    return self.max
+                return min(METRICS_BUCKET_BOUNDS[index], self.max)
+        return self.max
+
+
+class _StageTimer:
+    """with 구문으로 구간 시간을 측정하는 경량 타이머"""
+
+    __slots__ = ('metrics', 'stage', 'started')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class PerformanceMetrics:
+    """트레이딩 사이클/API 호출 구간별 지연 히스토그램과 오류·제한 카운터"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self.started_at = time.time()
+
+    def observe(self, stage, seconds):
+        """구간 지연 시간(초) 기록"""
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def increment(self, name, amount=1):
+        """카운터 증가"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def timer(self, stage):
+        """구간 측정용 컨텍스트 매니저 반환"""
+        return _StageTimer(self, stage)
+
+    def call(self, endpoint, func, *args, **kwargs):
+        """API 호출을 감싸 지연 시간, 오류, 요청 제한(throttle) 횟수를 기록"""
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.observe(f"api.{endpoint}", time.perf_counter() - started)
+            self.increment(f"api_error.{endpoint}")
+            if isinstance(e, UpbitLimitError) or '429' in str(e):
+                self.increment(f"api_throttle.{endpoint}")
+            raise
+        self.observe(f"api.{endpoint}", time.perf_counter() - started)
+        
+        if result is None:
+            self.increment(f"api_error.{endpoint}")
+        elif isinstance(result, dict) and 'error' in result:
+            self.increment(f"api_error.{endpoint}")
+            if 'too_many' in str(result.get('error', {}).get('name', '')).lower():
+                self.increment(f"api_throttle.{endpoint}")
+        return result
+
+    def export(self, reset=False):
+        """다른 프로세스(샤드 워커)에서 합칠 수 있는 원본 값 (구간별 히스토그램 버킷, 카운터) 반환"""
+        with self._lock:
+            exported = ({name: (h.count, h.total, h.max, list(h.counts)) for name, h in self._histograms.items()},
+                        dict(self._counters))
+            if reset:
+                self._histograms = {}
+                self._counters = {}
+        return exported
+
+    def absorb(self, exported):
+        """export() 결과를 현재 지표에 합산"""
+        histograms, counters = exported
+        with self._lock:
+            for name, (count, total, maximum, counts) in histograms.items():
+                histogram = self._histograms.get(name)
+                if histogram is None:
+                    histogram = self._histograms[name] = LatencyHistogram()
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.count += count
+                histogram.total += total
+                histogram.max = max(histogram.max, maximum)
+            for name, value in counters.items():
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self):
+        """모든 히스토그램과 카운터 초기화"""
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """현재 지표를 직렬화 가능한 dict로 반환 (단위: ms)"""
+        with self._lock:
+            histograms = {name: (h.count, h.total, h.max, list(h.counts)) for name, h in self._histograms.items()}
+            counters = dict(self._counters)
+            started_at = self.started_at
+
+        stages = {}
+        for name, (count, total, maximum, counts) in sorted(histograms.items()):
+            histogram = LatencyHistogram()
+            histogram.counts, histogram.count, histogram.total, histogram.max = counts, count, total, maximum
+            stages[name] = {
+                'count': count,
+                'mean_ms': (total / count) * 1000 if count else 0.0,
+                'p50_ms': histogram.percentile(50) * 1000,
+                'p95_ms': histogram.percentile(95) * 1000,
+                'p99_ms': histogram.percentile(99) * 1000,
+                'max_ms': maximum * 1000,
+            }
+
+        return {
+            'generated_at': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'uptime_seconds': time.time() - started_at,
+            'stages': stages,
+            'counters': dict(sorted(counters.items())),
+        }
+
+    def dump(self, path=METRICS_FILE, snapshot=None):
+        """지표 스냅샷을 JSON 파일로 저장 (임시 파일 작성 후 교체, snapshot 을 주면 새로 만들지 않고 그대로 저장)"""
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot() if snapshot is None else snapshot, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+class SamplingProfiler:
+    """sys._current_frames() 로 모든 스레드(트레이딩/로그 저장/UI)의 스택을 주기적으로 수집하는 샘플링 프로파일러
+    
+    settrace/setprofile 훅을 쓰지 않으므로 측정 중인 스레드에는 부하가 없고, 중지 상태에서는 아무 작업도 하지 않습니다.
+    결과는 flamegraph.pl / speedscope 등에서 바로 읽을 수 있는 collapsed-stack 형식으로 저장합니다.
+    """
+
+    def __init__(self, interval=PROFILER_INTERVAL):
+        self.interval = interval
+        self.samples = collections.Counter()
+        self.sample_count = 0
+        self.started_at = None
+        self.elapsed = 0.0
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._finished = False
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._finished
+
+    def start(self, duration=None, on_finish=None):
+        """샘플링 시작 - duration 초가 지나거나 stop() 호출 시 종료 후 on_finish(self) 호출 (프로파일러 스레드)"""
+        if self.running:
+            return False
+        self._stop.clear()
+        self._finished = False
+        self.started_at = time.monotonic()
+        deadline = self.started_at + duration if duration else None
+        self._thread = threading.Thread(target=self._run, args=(deadline, on_finish), name="Profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, wait=False):
+        """샘플링 중지 요청 (wait=True 이면 on_finish 까지 끝날 때까지 대기)"""
+        self._stop.set()
+        thread = self._thread
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self, deadline, on_finish):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.samples[self._collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+            self.sample_count += 1
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        
+        self.elapsed = time.monotonic() - self.started_at
+        self._finished = True
+        if on_finish is not None:
+            on_finish(self)
+
+    def _collapse(self, thread_name, frame):
+        """프레임 체인을 'thread;바깥 함수;...;안쪽 함수' 한 줄로 변환 (코드 객체별 라벨 캐시)"""
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            labels.append(label)
+            frame = frame.f_back
+        labels.append(thread_name)
+        return ';'.join(reversed(labels))
+
+    def dump(self, path):
+        """collapsed-stack 형식('스택 샘플수' 줄)으로 저장하고 경로 반환"""
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+def candle_epoch_seconds(index):
+    """pyupbit 캔들 인덱스(KST, tz 없음)를 epoch 초(int64 배열)로 변환"""
+    return np.asarray((pd.DatetimeIndex(index) - KST_EPOCH) // pd.Timedelta(seconds=1), dtype=np.int64)
+
+
+_upbit_api_base_url = None
+_session_request = None
+
+
+def set_upbit_api_base_url(base_url):
+    """pyupbit 의 모든 REST 호출(UPBIT_API_URL/...)을 base_url 로 보냄 (None 이면 원래 주소 사용)
+    
+    pyupbit 는 주소를 함수마다 직접 적어 두므로 requests 세션 요청 단계에서 주소 앞부분만 바꿉니다.
+    다른 주소를 사용하는 동안에는 429 응답을 pyupbit 가 의도한 TooManyRequests 예외로 변환합니다
+    (pyupbit 는 429 본문을 JSON 으로 먼저 읽다가 실패하므로 요청 제한을 구분하지 못함).
+    """
+    global _upbit_api_base_url, _session_request
+    if _session_request is None:
+        _session_request = requests.sessions.Session.request
+        
+        def request(session, method, url, *args, **kwargs):
+            base = _upbit_api_base_url
+            if base is None or not isinstance(url, str) or not url.startswith(UPBIT_API_URL):
+                return _session_request(session, method, url, *args, **kwargs)
+            response = _session_request(session, method, base + url[len(UPBIT_API_URL):], *args, **kwargs)
+            if response.status_code == 429:
+                raise TooManyRequests()
+            return response
+        
+        requests.sessions.Session.request = request
+    _upbit_api_base_url = base_url.rstrip('/') if base_url else None
+
+
+class SystemClock:
+    """실제 시간 시계 (트레이딩 루프 기본값)"""
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """리플레이용 가상 시계 - sleep 시 실제로 기다리지 않고 시간만 전진"""
+
+    def __init__(self, start, on_sleep=None):
+        self.now = float(start)
+        self.on_sleep = on_sleep
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        if self.on_sleep is not None:
+            self.on_sleep(seconds)
+        self.now += seconds
+
+    def advance_to(self, when):
+        """가상 시각을 when 으로 이동 (과거로는 이동하지 않음)"""
+        if when > self.now:
+            self.sleep(when - self.now)
+
+
+def next_candle_close(interval, now):
+    """now 이후 처음 도래하는 interval 캔들 마감 시각 (epoch 초)"""
+    seconds = INTERVAL_SECONDS.get(interval, 60)
+    offset = WEEK_ALIGN_OFFSET_SECONDS if interval == 'week' else 0
+    return ((now - offset) // seconds + 1) * seconds + offset
+
+
+class ScheduledTimer:
+    """TradingScheduler 에 등록된 1회성 타이머"""
+
+    __slots__ = ('when', 'seq', 'callback', 'name', 'cancelled', 'fired')
+
+    def __init__(self, when, seq, callback, name):
+        self.when = when
+        self.seq = seq
+        self.callback = callback
+        self.name = name
+        self.cancelled = False
+        self.fired = threading.Event()
+
+    def __lt__(self, other):
+        return (self.when, self.seq) < (other.when, other.seq)
+
+    def cancel(self):
+        self.cancelled = True
+        self.fired.set()
+
+
+class TradingScheduler:
+    """힙 기반 타이머 스케줄러
+    
+    실제 시계(SystemClock)에서는 전용 스레드가 가장 가까운 타이머 시각까지만 대기했다가 콜백을 실행하고,
+    가상 시계(VirtualClock)에서는 wait() 를 호출한 쪽이 타이머 순서대로 시간을 진행시킵니다.
+    stop() 은 대기 중인 모든 타이머를 즉시 깨웁니다.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.realtime = not isinstance(clock, VirtualClock)
+        self._heap = []
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self.stopped = False
+
+    def start(self):
+        if self.realtime and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="Scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """스케줄러 종료 - 대기 중인 타이머를 모두 취소하고 대기자를 깨움"""
+        with self._condition:
+            self.stopped = True
+            pending, self._heap = self._heap, []
+            self._condition.notify_all()
+        for timer in pending:
+            timer.cancel()
+
+    def call_at(self, when, callback=None, name=""):
+        """when(epoch 초)에 callback 실행 (callback 없이 대기용으로도 사용)"""
+        timer = ScheduledTimer(when, next(self._seq), callback, name)
+        with self._condition:
+            if self.stopped:
+                timer.cancel()
+                return timer
+            heapq.heappush(self._heap, timer)
+            self._condition.notify_all()
+        return timer
+
+    def call_later(self, delay, callback=None, name=""):
+        return self.call_at(self.clock.time() + delay, callback, name)
+
+    def wait(self, timer):
+        """timer 가 실행(또는 취소)될 때까지 대기. 정상 실행 시 True"""
+        if self.realtime:
+            timer.fired.wait()
+        else:
+            self.run_until(timer.when)
+        return not timer.cancelled
+
+    def run_until(self, when):
+        """(가상 시계 전용) when 까지 도래한 타이머를 순서대로 실행하며 시간을 진행"""
+        while not self.stopped:
+            with self._condition:
+                if not self._heap or self._heap[0].when > when:
+                    break
+                timer = heapq.heappop(self._heap)
+            self.clock.advance_to(timer.when)
+            self._fire(timer)
+        self.clock.advance_to(when)
+
+    def _fire(self, timer):
+        if timer.cancelled:
+            return
+        try:
+            if timer.callback is not None:
+                timer.callback()
+        except Exception as e:
+            print(f"스케줄러 콜백 오류 ({timer.name}): {type(e).__name__} - {e}")
+        finally:
+            timer.fired.set()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self.stopped:
+                    return
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                delay = self._heap[0].when - self.clock.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                timer = heapq.heappop(self._heap)
+            self._fire(timer)
+
+
+Position = collections.namedtuple('Position', ['ticker', 'state', 'buy_price', 'buy_volume', 'buy_candle_time', 'manual_buy', 'opened_at'])
+
+
+class PositionStore:
+    """종목별 포지션 상태 저장소
+    
+    - 쓰기: 종목이 속한 샤드의 잠금 안에서 '현재 상태 확인 → 전이'를 원자적으로 수행 (종목 간 경합 없음)
+    - 읽기: Position 은 불변(namedtuple)이고 쓰기 시 통째로 교체되므로 get/snapshot 은 잠금 없이 일관된 값을 반환
+    """
+
+    def __init__(self, shards=POSITION_SHARDS):
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._positions = {}
+
+    def _lock(self, ticker):
+        return self._locks[hash(ticker) % len(self._locks)]
+
+    def get(self, ticker):
+        return self._positions.get(ticker)
+
+    def __contains__(self, ticker):
+        return ticker in self._positions
+
+    def __len__(self):
+        return len(self._positions)
+
+    def tickers(self):
+        return list(self._positions)
+
+    def snapshot(self):
+        """UI 표시용 {종목: Position} 사본"""
+        return dict(self._positions)
+
+    def reserve(self, ticker):
+        """(없음 → opening) 매수 주문 전 선점. 이미 포지션이 있으면 False"""
+        with self._lock(ticker):
+            if ticker in self._positions:
+                return False
+            self._positions[ticker] = Position(ticker, POSITION_OPENING, 0.0, 0.0, None, False, time.time())
+            return True
+
+    def confirm_open(self, ticker, buy_price, buy_volume=0.0, buy_candle_time=None, manual_buy=False):
+        """(opening → open) 매수 체결 확정"""
+        with self._lock(ticker):
+            current = self._positions.get(ticker)
+            if current is None or current.state != POSITION_OPENING:
+                return False
+            self._positions[ticker] = Position(ticker, POSITION_OPEN, buy_price, buy_volume, buy_candle_time, manual_buy, current.opened_at)
+            return True
+
+    def release(self, ticker):
+        """(opening → 없음) 매수 실패 시 선점 해제"""
+        with self._lock(ticker):
+            current = self._positions.get(ticker)
+            if current is not None and current.state == POSITION_OPENING:
+                del self._positions[ticker]
+
+    def mark_half_sold(self, ticker):
+        """(open → half_sold) 절반 매도. 이미 절반 매도했거나 보유 중이 아니면 False"""
+        with self._lock(ticker):
+            current = self._positions.get(ticker)
+            if current is None or current.state != POSITION_OPEN:
+                return False
+            self._positions[ticker] = current._replace(state=POSITION_HALF_SOLD)
+            return True
+
+    def begin_close(self, ticker):
+        """(open/half_sold → closing) 전량 매도 시작. 직전 Position 반환 (매도 불가 상태면 None)"""
+        with self._lock(ticker):
+            current = self._positions.get(ticker)
+            if current is None or current.state not in (POSITION_OPEN, POSITION_HALF_SOLD):
+                return None
+            self._positions[ticker] = current._replace(state=POSITION_CLOSING)
+            return current
+
+    def finish_close(self, ticker, success, previous=None):
+        """(closing → 삭제) 매도 성공 시 포지션 삭제, 실패 시 previous 상태로 복구"""
+        with self._lock(ticker):
+            current = self._positions.get(ticker)
+            if current is None or current.state != POSITION_CLOSING:
+                return
+            if success:
+                del self._positions[ticker]
+            elif previous is not None:
+                self._positions[ticker] = previous
+
+    def close(self, ticker):
+        """(open/half_sold → 삭제) 주문 없이 즉시 청산 (가상 매매). 삭제된 Position 반환"""
+        with self._lock(ticker):
+            current = self._positions.get(ticker)
+            if current is None or current.state not in (POSITION_OPEN, POSITION_HALF_SOLD):
+                return None
+            del self._positions[ticker]
+            return current
+
+
+class PaperLedger:
+    """가상 매매 장부 - 현금, 소수 단위 포지션, 수수료, 실현/평가 손익을 고정 레이아웃 배열로 관리
+    
+    종목별 포지션은 PAPER_POSITION_DTYPE 구조화 배열의 한 행(slot)이고, 체결 내역은
+    PAPER_FILL_DTYPE 배열에 누적됩니다. 매 틱 평가는 last_price 갱신만 하므로 종목 수가 많아도 저렴합니다.
+    """
+
+    SIDE_BUY = 1
+    SIDE_SELL = -1
+
+    def __init__(self, cash=PAPER_INITIAL_CASH, fee_rate=PAPER_FEE_RATE, slippage=PAPER_SLIPPAGE, capacity=64):
+        self._lock = threading.Lock()
+        self.initial_cash = float(cash)
+        self.cash = float(cash)
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.tickers = []
+        self._slots = {}
+        self.positions = np.zeros(capacity, dtype=PAPER_POSITION_DTYPE)
+        self.fills = np.zeros(256, dtype=PAPER_FILL_DTYPE)
+        self.fill_count = 0
+
+    def _slot(self, ticker):
+        slot = self._slots.get(ticker)
+        if slot is None:
+            slot = len(self.tickers)
+            if slot >= len(self.positions):
+                self.positions = np.concatenate([self.positions, np.zeros(len(self.positions), dtype=PAPER_POSITION_DTYPE)])
+            self._slots[ticker] = slot
+            self.tickers.append(ticker)
+        return slot
+
+    def _record_fill(self, epoch, slot, side, price, quantity, amount, fee, realized_pnl):
+        if self.fill_count >= len(self.fills):
+            self.fills = np.concatenate([self.fills, np.zeros(len(self.fills), dtype=PAPER_FILL_DTYPE)])
+        self.fills[self.fill_count] = (epoch, slot, side, price, quantity, amount, fee, realized_pnl, self.cash)
+        self.fill_count += 1
+
+    def buy(self, ticker, price, krw_amount, epoch=None):
+        """krw_amount 원어치 시장가 가상 매수 (수수료 포함 금액, 잔고 초과분은 잘림). 체결 수량 반환"""
+        with self._lock:
+            amount = min(float(krw_amount), self.cash)
+            if amount <= 0 or price <= 0:
+                return 0.0
+            
+            slot = self._slot(ticker)
+            fill_price = price * (1 + self.slippage)
+            fee = amount * self.fee_rate
+            quantity = (amount - fee) / fill_price
+            
+            position = self.positions[slot]
+            position['quantity'] += quantity
+            position['cost'] += amount
+            position['avg_price'] = position['cost'] / position['quantity']
+            position['last_price'] = price
+            position['fees'] += fee
+            position['buys'] += 1
+            self.cash -= amount
+            
+            self._record_fill(epoch if epoch is not None else time.time(), slot, self.SIDE_BUY, fill_price, quantity, amount, fee, 0.0)
+            return quantity
+
+    def sell(self, ticker, price, fraction=1.0, epoch=None):
+        """보유 수량의 fraction 만큼 시장가 가상 매도. 실현 손익(수수료 차감) 반환"""
+        with self._lock:
+            slot = self._slots.get(ticker)
+            if slot is None or self.positions[slot]['quantity'] <= 0:
+                return 0.0
+            
+            position = self.positions[slot]
+            fraction = min(max(fraction, 0.0), 1.0)
+            fill_price = price * (1 - self.slippage)
+            quantity = position['quantity'] * fraction
+            proceeds = quantity * fill_price
+            fee = proceeds * self.fee_rate
+            cost = position['cost'] * fraction
+            realized_pnl = proceeds - fee - cost
+            
+            if fraction >= 1.0:
+                position['quantity'] = 0.0
+                position['cost'] = 0.0
+                position['avg_price'] = 0.0
+            else:
+                position['quantity'] -= quantity
+                position['cost'] -= cost
+            position['last_price'] = price
+            position['realized_pnl'] += realized_pnl
+            position['fees'] += fee
+            position['sells'] += 1
+            self.cash += proceeds - fee
+            
+            self._record_fill(epoch if epoch is not None else time.time(), slot, self.SIDE_SELL, fill_price, quantity, proceeds, fee, realized_pnl)
+            return realized_pnl
+
+    def mark(self, ticker, price):
+        """평가 가격 갱신 (보유 종목만)"""
+        with self._lock:
+            slot = self._slots.get(ticker)
+            if slot is not None and price:
+                self.positions[slot]['last_price'] = price
+
+    def position(self, ticker):
+        """종목 포지션 레코드 사본 (없으면 None)"""
+        with self._lock:
+            slot = self._slots.get(ticker)
+            return self.positions[slot].copy() if slot is not None else None
+
+    def _unrealized_pnl(self, active):
+        return float(np.sum(active['quantity'] * active['last_price'] - active['cost']))
+
+    def _equity(self, active):
+        return self.cash + float(np.sum(active['quantity'] * active['last_price']))
+
+    def unrealized_pnl(self, ticker=None):
+        """평가 손익 (ticker 미지정 시 전체 합계)"""
+        if ticker is not None:
+            position = self.position(ticker)
+            return float(position['quantity'] * position['last_price'] - position['cost']) if position is not None else 0.0
+        with self._lock:
+            return self._unrealized_pnl(self.positions[:len(self.tickers)])
+
+    def equity(self):
+        """현금 + 보유 포지션 평가 금액"""
+        with self._lock:
+            return self._equity(self.positions[:len(self.tickers)])
+
+    def summary(self):
+        """장부 요약 dict (매수/매도와 같은 잠금 안에서 계산하여 현금과 포지션이 어긋나지 않음)"""
+        with self._lock:
+            active = self.positions[:len(self.tickers)]
+            equity = self._equity(active)
+            return {
+                'cash': self.cash,
+                'equity': equity,
+                'realized_pnl': float(np.sum(active['realized_pnl'])),
+                'unrealized_pnl': self._unrealized_pnl(active),
+                'fees': float(np.sum(active['fees'])),
+                'return_pct': (equity / self.initial_cash - 1) * 100 if self.initial_cash else 0.0,
+                'fills': self.fill_count,
+            }
+
+    def fills_frame(self):
+        """체결 내역 DataFrame (분석/저장용)"""
+        with self._lock:
+            fills = pd.DataFrame(self.fills[:self.fill_count].copy())
+            tickers = list(self.tickers)
+        fills.insert(0, 'ticker', [tickers[slot] for slot in fills['slot']])
+        fills.insert(0, 'time', pd.to_datetime(fills['epoch'], unit='s') + pd.Timedelta(hours=9))
+        return fills.drop(columns=['slot', 'epoch'])
+
+    def dump(self, directory, prefix="PAPER_"):
+        """포지션/체결 내역을 CSV 로 저장하고 파일 경로 목록 반환"""
+        os.makedirs(directory, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        with self._lock:
+            positions = pd.DataFrame(self.positions[:len(self.tickers)].copy())
+            positions.insert(0, 'ticker', list(self.tickers))
+        positions_path = os.path.join(directory, f"{prefix}POSITIONS_{timestamp}.csv")
+        positions.to_csv(positions_path, index=False, encoding='utf-8-sig')
+        
+        fills_path = os.path.join(directory, f"{prefix}FILLS_{timestamp}.csv")
+        self.fills_frame().to_csv(fills_path, index=False, encoding='utf-8-sig')
+        return [positions_path, fills_path]
+
+
+class DecisionLog:
+    """종목/채널별 마지막 판단 상태를 기억하여 상태가 바뀔 때만 로그 줄을 내보내는 중복 억제 로그
+    
+    같은 상태가 반복되면 줄을 내보내지 않고 횟수만 세며, 상태가 바뀌는 줄에 직전 상태의 반복 횟수를 붙입니다.
+    summary() 는 DECISION_SUMMARY_SECONDS 마다 반복 중인 상태의 요약 줄을 반환합니다. (트레이딩 스레드 전용)
+    """
+
+    def __init__(self, summary_seconds=DECISION_SUMMARY_SECONDS):
+        self.summary_seconds = summary_seconds
+        self.suppressed = 0
+        self._entries = {} # (종목, 채널) -> [상태, 마지막 메시지, 반복 횟수, 요약 이후 반복 횟수]
+        self._reasons = {}
+        self._next_summary = None
+
+    def observe(self, ticker, channel, state, message):
+        """상태가 바뀌었으면 내보낼 로그 줄, 같은 상태의 반복이면 None 반환"""
+        key = (ticker, channel)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == state:
+            entry[1] = message
+            entry[2] += 1
+            entry[3] += 1
+            self.suppressed += 1
+            return None
+        
+        self._entries[key] = [state, message, 0, 0]
+        if entry is not None and entry[2]:
+            return f"{message} (직전 판단 {entry[2]:,}회 반복 생략)"
+        return message
+
+    def set_reason(self, ticker, reason):
+        self._reasons[ticker] = reason
+
+    def pop_reason(self, ticker):
+        """이번 틱 전략 판단 사유 코드 (기록이 없으면 REASON_NONE)"""
+        return self._reasons.pop(ticker, REASON_NONE)
+
+    def summary(self, now):
+        """요약 주기가 지났으면 반복 중인 상태의 요약 줄 목록 반환 (아니면 빈 목록)"""
+        if self._next_summary is None:
+            self._next_summary = now + self.summary_seconds
+        if now < self._next_summary:
+            return []
+        
+        self._next_summary = now + self.summary_seconds
+        repeated = {}
+        for (ticker, channel), entry in self._entries.items():
+            if entry[3]:
+                repeated.setdefault(ticker, []).append((entry[3], entry[1]))
+                entry[3] = 0
+        return [f"판단 요약: {ticker} 지난 요약 이후 {max(count for count, _ in entries):,}회 반복 - "
+                + " / ".join(message for _, message in entries)
+                for ticker, entries in repeated.items()]
+
+    def remove(self, ticker):
+        for key in [key for key in self._entries if key[0] == ticker]:
+            del self._entries[key]
+        self._reasons.pop(ticker, None)
+
+
+class DecisionTrace:
+    """매 틱 전략 판단을 DECISION_TRACE_DTYPE 고정 길이(48바이트) 레코드로 기록하는 바이너리 트레이스
+    
+    레코드는 DECISION_TRACE_BATCH 개씩 모아 LOG_DIR/DECISION_TRACE_<시각>.bin 에 추가하며 (파일 앞 8바이트는
+    DECISION_TRACE_MAGIC), read() 로 DataFrame 으로 읽을 수 있습니다. close() 후 다시 기록하면 새 파일을 만듭니다.
+    """
+
+    def __init__(self, directory=LOG_DIR):
+        self.directory = directory
+        self.path = None
+        self.records = np.zeros(DECISION_TRACE_BATCH, dtype=DECISION_TRACE_DTYPE)
+        self.count = 0
+        self.written = 0
+        self._lock = threading.Lock()
+
+    def record(self, epoch, candle_epoch, ticker, action, reason, flags, price, profit_rate=np.nan):
+        with self._lock:
+            self.records[self.count] = (epoch, candle_epoch, ticker.encode('ascii', 'replace')[:16],
+                                        action, reason, flags, price, profit_rate)
+            self.count += 1
+            if self.count >= len(self.records):
+                self._write()
+
+    def _write(self):
+        if not self.count:
+            return
+        if self.path is None:
+            os.makedirs(self.directory, exist_ok=True)
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.path = os.path.join(self.directory, f"DECISION_TRACE_{timestamp}.bin")
+            with open(self.path, 'wb') as f:
+                f.write(DECISION_TRACE_MAGIC)
+        with open(self.path, 'ab') as f:
+            f.write(self.records[:self.count].tobytes())
+        self.written += self.count
+        self.count = 0
+
+    def flush(self):
+        """모아 둔 레코드를 파일에 기록하고 파일 경로 반환 (기록이 없으면 None)"""
+        with self._lock:
+            self._write()
+            return self.path
+
+    def close(self):
+        """남은 레코드를 기록하고 파일을 닫음 (다음 기록은 새 파일)"""
+        with self._lock:
+            self._write()
+            path, self.path = self.path, None
+            return path
+
+    @staticmethod
+    def read(path):
+        """트레이스 파일을 DataFrame 으로 읽기 (시각은 KST, action/reason 은 이름으로 변환)"""
+        with open(path, 'rb') as f:
+            if f.read(len(DECISION_TRACE_MAGIC)) != DECISION_TRACE_MAGIC:
+                raise ValueError(f"판단 트레이스 파일이 아닙니다: {path}")
+            records = np.frombuffer(f.read(), dtype=DECISION_TRACE_DTYPE)
+        
+        df = pd.DataFrame({
+            'time': KST_EPOCH + pd.to_timedelta(records['epoch'], unit='s'),
+            'candle_time': KST_EPOCH + pd.to_timedelta(records['candle_epoch'], unit='s'),
+            'ticker': np.char.decode(records['ticker'], 'ascii'),
+            'action': np.asarray(DECISION_ACTIONS, dtype=object)[records['action']],
+            'reason': np.asarray(DECISION_REASONS, dtype=object)[records['reason']],
+            'flags': records['flags'].astype(np.int64),
+            'price': records['price'],
+            'profit_rate': records['profit_rate'].astype(np.float64),
+        })
+        return df
+
+
+class CandleArchive:
+    """마감된 캔들을 종목/시간봉/일자(KST)별 CSV 파일로 누적 보관하는 로컬 캔들 저장소
+    
+    signal_index=True 이면 추가된 캔들의 신호 플래그를 SignalIndex(self.signals) 에 함께 기록합니다.
+    """
+
+    def __init__(self, root=CANDLE_ARCHIVE_DIR, signal_index=True):
+        self.root = root
+        self._lock = threading.Lock()
+        self._last_saved = {}
+        self.signals = SignalIndex(self) if signal_index else None
+
+    def _directory(self, ticker, interval):
+        return os.path.join(self.root, ticker, interval)
+
+    def days(self, ticker, interval):
+        """보관 중인 일자 목록 (YYYYMMDD, 오름차순)"""
+        directory = self._directory(ticker, interval)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-4] for name in os.listdir(directory) if name.endswith('.csv'))
+
+    def _read_day(self, ticker, interval, day):
+        path = os.path.join(self._directory(ticker, interval), f"{day}.csv")
+        df = pd.read_csv(path, index_col=0)
+        df.index = pd.to_datetime(df.index, format=CANDLE_TIME_FORMAT)
+        return df
+
+    def last_timestamp(self, ticker, interval):
+        """마지막으로 보관된 캔들 시각 (없으면 None)"""
+        key = (ticker, interval)
+        if key not in self._last_saved:
+            days = self.days(ticker, interval)
+            self._last_saved[key] = self._read_day(ticker, interval, days[-1]).index[-1] if days else None
+        return self._last_saved[key]
+
+    def append(self, ticker, interval, df, closed_only=True):
+        """아직 보관되지 않은 캔들만 일자별 파일에 추가 (closed_only: 진행 중인 마지막 캔들 제외). 추가된 개수 반환"""
+        candles = df[CANDLE_COLUMNS].iloc[:-1] if closed_only else df[CANDLE_COLUMNS]
+        
+        with self._lock:
+            last = self.last_timestamp(ticker, interval)
+            if last is not None:
+                candles = candles[candles.index > last]
+            if candles.empty:
+                return 0
+            
+            directory = self._directory(ticker, interval)
+            os.makedirs(directory, exist_ok=True)
+            for day, part in candles.groupby(candles.index.strftime('%Y%m%d')):
+                path = os.path.join(directory, f"{day}.csv")
+                part.to_csv(path, mode='a', header=not os.path.exists(path), date_format=CANDLE_TIME_FORMAT)
+            
+            self._last_saved[(ticker, interval)] = candles.index[-1]
+            if self.signals is not None:
+                self.signals.update(ticker, interval, candles)
+            return len(candles)
+
+    def load(self, ticker, interval, start=None, end=None):
+        """start~end(포함) 구간의 캔들을 pyupbit 와 같은 형식의 DataFrame 으로 반환 (없으면 None)"""
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        
+        days = self.days(ticker, interval)
+        if start is not None:
+            days = [day for day in days if day >= start.strftime('%Y%m%d')]
+        if end is not None:
+            days = [day for day in days if day <= end.strftime('%Y%m%d')]
+        if not days:
+            return None
+        
+        df = pd.concat([self._read_day(ticker, interval, day) for day in days])
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+        return df.loc[start:end]
+
+
+class SignalIndex:
+    """캔들 보관소의 마감 캔들별 5분봉 50선 전략 신호 플래그(compute_signal_flags) 인덱스
+    
+    종목/시간봉마다 보관소 디렉터리의 SIGNAL_INDEX_FILE 에 (epoch, flags) 레코드를 시간순으로 추가합니다 (파일 앞 8바이트는
+    SIGNAL_INDEX_MAGIC). 새 캔들은 메모리에 유지하는 직전 SIGNAL_INDEX_LOOKBACK 개 캔들과 이어 붙여 그 부분만 계산하고,
+    인덱스가 보관소보다 뒤처져 있으면 (처음 사용, 기록 실패 등) 보관소 캔들을 읽어 백필합니다.
+    조회는 레코드 파일만 읽어 시각 구간을 이진 탐색하므로 캔들을 다시 읽거나 전략을 재실행하지 않습니다.
+    """
+
+    def __init__(self, archive):
+        self.archive = archive
+        self._lock = threading.Lock()
+        self._tails = {}
+        self._last_indexed = {}
+
+    def path(self, ticker, interval):
+        return os.path.join(self.archive.root, ticker, interval, SIGNAL_INDEX_FILE)
+
+    def tickers(self, interval):
+        """인덱스가 있는 종목 목록"""
+        if not os.path.isdir(self.archive.root):
+            return []
+        return sorted(ticker for ticker in os.listdir(self.archive.root) if os.path.exists(self.path(ticker, interval)))
+
+    def records(self, ticker, interval):
+        """인덱스 전체 레코드 (SIGNAL_INDEX_DTYPE 배열, 없으면 빈 배열)"""
+        path = self.path(ticker, interval)
+        if not os.path.exists(path):
+            return np.zeros(0, dtype=SIGNAL_INDEX_DTYPE)
+        with open(path, 'rb') as f:
+            if f.read(len(SIGNAL_INDEX_MAGIC)) != SIGNAL_INDEX_MAGIC:
+                raise ValueError(f"신호 인덱스 파일이 아닙니다: {path}")
+            return np.fromfile(f, dtype=SIGNAL_INDEX_DTYPE)
+
+    def last_epoch(self, ticker, interval):
+        """마지막으로 인덱싱된 캔들 epoch (없으면 None)"""
+        key = (ticker, interval)
+        if key not in self._last_indexed:
+            records = self.records(ticker, interval)
+            self._last_indexed[key] = int(records['epoch'][-1]) if len(records) else None
+        return self._last_indexed[key]
+
+    def update(self, ticker, interval, candles=None):
+        """방금 보관된 candles 의 신호를 인덱스에 추가 (candles 가 없거나 직전 캔들이 메모리에 없으면 보관소에서 백필). 추가된 개수 반환"""
+        key = (ticker, interval)
+        with self._lock:
+            last = self.last_epoch(ticker, interval)
+            tail = self._tails.get(key)
+            if candles is None or candles.empty or tail is None or candle_epoch_seconds(tail.index[-1:])[0] != last:
+                return self._backfill(ticker, interval, last)
+            
+            candles = candles[candles.index > tail.index[-1]]
+            if candles.empty:
+                return 0
+            frame = pd.concat([tail, candles[CANDLE_COLUMNS]])
+            return self._write(ticker, interval, frame, len(tail))
+
+    def _backfill(self, ticker, interval, last):
+        start = None
+        if last is not None:
+            lookback = SIGNAL_INDEX_LOOKBACK * INTERVAL_SECONDS.get(interval, 60)
+            start = (KST_EPOCH + pd.Timedelta(seconds=last - lookback)).normalize() - pd.Timedelta(days=1)
+        frame = self.archive.load(ticker, interval, start)
+        if frame is None or frame.empty:
+            return 0
+        frame = frame[CANDLE_COLUMNS]
+        indexed = 0 if last is None else int(np.searchsorted(candle_epoch_seconds(frame.index), last, side='right'))
+        return self._write(ticker, interval, frame, indexed)
+
+    def _write(self, ticker, interval, frame, start):
+        """frame 전체로 플래그를 계산하고 start 위치 이후 캔들만 기록"""
+        key = (ticker, interval)
+        self._tails[key] = frame.iloc[-SIGNAL_INDEX_LOOKBACK:]
+        if start >= len(frame):
+            return 0
+        
+        flags = compute_signal_flags(*(frame[column].to_numpy(dtype=np.float64) for column in ('open', 'high', 'low', 'close', 'volume')))
+        records = np.zeros(len(frame) - start, dtype=SIGNAL_INDEX_DTYPE)
+        records['epoch'] = candle_epoch_seconds(frame.index[start:])
+        records['flags'] = flags[start:]
+        
+        path = self.path(ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(SIGNAL_INDEX_MAGIC)
+        with open(path, 'ab') as f:
+            f.write(records.tobytes())
+        self._last_indexed[key] = int(records['epoch'][-1])
+        return len(records)
+
+    def _select(self, ticker, interval, mask, start, end):
+        records = self.records(ticker, interval)
+        epochs = records['epoch']
+        lo = 0 if start is None else int(np.searchsorted(epochs, candle_epoch_seconds([pd.Timestamp(start)])[0], side='left'))
+        hi = len(records) if end is None else int(np.searchsorted(epochs, candle_epoch_seconds([pd.Timestamp(end)])[0], side='right'))
+        records = records[lo:hi]
+        return records[(records['flags'] & mask) == mask]
+
+    def count(self, tickers, interval, mask, start=None, end=None):
+        """start~end(포함) 구간에서 mask 비트가 모두 켜진 캔들 수 (종목별 dict)"""
+        return {ticker: len(self._select(ticker, interval, mask, start, end)) for ticker in tickers}
+
+    def query(self, tickers, interval, mask, start=None, end=None):
+        """start~end(포함) 구간에서 mask 비트가 모두 켜진 캔들 목록 (time, ticker, flags DataFrame, 시각순)"""
+        parts = []
+        for ticker in tickers:
+            records = self._select(ticker, interval, mask, start, end)
+            parts.append(pd.DataFrame({
+                'time': KST_EPOCH + pd.to_timedelta(np.asarray(records['epoch']), unit='s'),
+                'ticker': ticker,
+                'flags': np.asarray(records['flags'], dtype=np.int64),
+            }))
+        if not parts:
+            return pd.DataFrame(columns=['time', 'ticker', 'flags'])
+        return pd.concat(parts, ignore_index=True).sort_values(['time', 'ticker'], kind='stable', ignore_index=True)
+
+
+def decimate_ohlc(x, open_, high, low, close, x0, x1, columns):
+    """[x0, x1] 구간의 캔들을 화면 픽셀 열(columns) 단위로 OHLC 집계
+    
+    x 는 오름차순 시각 배열이며, 구간 안 캔들이 columns 개 이하면 집계 없이 그대로 반환합니다.
+    반환: dict(x, open, high, low, close, last) - last 는 각 열의 마지막 캔들 위치 (이평선 등 보조선 표본 추출용)
+    """
+    start = max(0, int(np.searchsorted(x, x0, side='left')) - 1)
+    end = min(len(x), int(np.searchsorted(x, x1, side='right')) + 1)
+    if end <= start:
+        empty = np.empty(0)
+        return {'x': empty, 'open': empty, 'high': empty, 'low': empty, 'close': empty, 'last': np.empty(0, dtype=np.int64)}
+    
+    if end - start <= columns:
+        index = np.arange(start, end)
+        return {'x': x[start:end], 'open': open_[start:end], 'high': high[start:end], 'low': low[start:end],
+                'close': close[start:end], 'last': index}
+    
+    span = (x1 - x0) or 1.0
+    column = np.clip(((x[start:end] - x0) / span * columns).astype(np.int64), -1, columns)
+    firsts = np.flatnonzero(np.diff(column, prepend=column[0] - 1))
+    lasts = np.append(firsts[1:], end - start) - 1
+    
+    return {
+        'x': x[start:end][firsts],
+        'open': open_[start:end][firsts],
+        'high': np.maximum.reduceat(high[start:end], firsts),
+        'low': np.minimum.reduceat(low[start:end], firsts),
+        'close': close[start:end][lasts],
+        'last': lasts + start,
+    }
+
+
+class SparklineBuffer:
+    """종목별 최근 종가를 (종목, SPARKLINE_POINTS) 배열 하나에 보관하고
+    모든 스파크라인을 (종목 수 × 행 높이, 포인트, RGB) 이미지 한 장으로 래스터화하는 대시보드 버퍼
+    
+    update 는 트레이딩 스레드, render 는 Tk 스레드에서 호출되며 값이 바뀐 행만 다시 그립니다.
+    """
+
+    def __init__(self, points=SPARKLINE_POINTS, row_height=DASHBOARD_ROW_HEIGHT):
+        self.points = points
+        self.row_height = row_height
+        self.tickers = []
+        self._rows = {}
+        self._lock = threading.Lock()
+        self.values = np.full((0, points), np.nan)
+        self.prices = np.zeros(0)
+        self.statuses = []
+        self.image = np.zeros((0, points, 3), dtype=np.uint8)
+        self._dirty = set()
+
+    def _row(self, ticker):
+        row = self._rows.get(ticker)
+        if row is None:
+            row = len(self.tickers)
+            self.tickers.append(ticker)
+            self._rows[ticker] = row
+            self.values = np.concatenate([self.values, np.full((1, self.points), np.nan)])
+            self.prices = np.append(self.prices, 0.0)
+            self.statuses.append("")
+            self.image = np.concatenate([self.image, np.zeros((self.row_height, self.points, 3), dtype=np.uint8)])
+        return row
+
+    def update(self, ticker, closes, price, status=None):
+        """종목의 최근 종가(최대 points 개)와 현재가/상태 갱신"""
+        closes = np.asarray(closes, dtype=np.float64)[-self.points:]
+        with self._lock:
+            row = self._row(ticker)
+            self.values[row] = np.nan
+            self.values[row, self.points - len(closes):] = closes
+            self.prices[row] = price
+            if status is not None:
+                self.statuses[row] = status
+            self._dirty.add(row)
+
+    def set_status(self, ticker, status):
+        with self._lock:
+            row = self._rows.get(ticker)
+            if row is not None:
+                self.statuses[row] = status
+
+    def remove(self, ticker):
+        """종목 행 삭제 (아래 행이 당겨지므로 전체를 다시 그림)"""
+        with self._lock:
+            row = self._rows.pop(ticker, None)
+            if row is None:
+                return
+            self.tickers.pop(row)
+            self.statuses.pop(row)
+            self.values = np.delete(self.values, row, axis=0)
+            self.prices = np.delete(self.prices, row)
+            self.image = np.delete(self.image, np.s_[row * self.row_height:(row + 1) * self.row_height], axis=0)
+            self._rows = {t: i for i, t in enumerate(self.tickers)}
+            self._dirty = set(range(len(self.tickers)))
+
+    def rows(self):
+        """(종목, 현재가, 상태) 목록 사본"""
+        with self._lock:
+            return list(zip(self.tickers, self.prices.tolist(), self.statuses))
+
+    def render(self):
+        """변경된 행만 다시 래스터화하여 전체 이미지 사본 반환 (변경 없으면 None)"""
+        with self._lock:
+            if not self._dirty:
+                return None
+            dirty = np.fromiter(sorted(self._dirty), dtype=np.int64)
+            self._dirty.clear()
+            values = self.values[dirty]
+            
+            height = self.row_height
+            with np.errstate(invalid='ignore', divide='ignore'):
+                low = np.where(np.isnan(values), np.inf, values).min(axis=1, keepdims=True)
+                high = np.where(np.isnan(values), -np.inf, values).max(axis=1, keepdims=True)
+                scaled = (values - low) / np.where(high > low, high - low, 1.0)
+            y = np.round((height - 3) - scaled * (height - 5))
+            
+            # 각 열마다 직전 점과 현재 점 사이 세로 구간을 칠해 선으로 연결
+            prev = np.concatenate([y[:, :1], y[:, :-1]], axis=1)
+            prev = np.where(np.isnan(prev), y, prev)
+            top, bottom = np.fmin(prev, y), np.fmax(prev, y)
+            pixel_rows = np.arange(height)[None, :, None]
+            mask = (pixel_rows >= top[:, None, :]) & (pixel_rows <= bottom[:, None, :])
+            
+            first = values[np.arange(len(dirty)), np.argmax(~np.isnan(values), axis=1)]
+            rising = values[:, -1] >= first
+            colors = np.where(rising[:, None], DASHBOARD_UP_COLOR, DASHBOARD_DOWN_COLOR).astype(np.uint8)
+            
+            tiles = np.empty((len(dirty), height, self.points, 3), dtype=np.uint8)
+            tiles[:] = DASHBOARD_BACKGROUND
+            tiles[mask] = np.repeat(colors, mask.sum(axis=(1, 2)), axis=0)
+            
+            image = self.image.reshape(len(self.tickers), height, self.points, 3)
+            image[dirty] = tiles
+            return self.image.copy()
+
+
+class ChartHistory:
+    """장기(LOD) 차트용 종목 캔들 이력 - 캔들 보관소에서 과거 구간을 지연 로드하고 실시간 캔들을 병합
+    
+    병합/지표 계산은 Tk 스레드에서만 수행하며, 보관소 읽기만 백그라운드 스레드에서 실행합니다.
+    실시간 캔들(append)은 마지막 캔들 덮어쓰기/뒤에 추가만 하고 지표도 끝부분만 다시 계산하므로 비용이 이력 길이와 무관하며,
+    전체 정렬/지표 재계산은 과거 구간을 앞에 붙이는 merge 에서만 수행합니다.
+    """
+
+    COLUMNS = ('epoch', 'x', 'open', 'high', 'low', 'close', 'volume', 'ma50', 'ma200', 'vwma100')
+    INDICATOR_LOOKBACK = 199 # 끝부분 지표 재계산에 함께 쓰는 직전 캔들 수 (MA200 기준)
+
+    def __init__(self, ticker, interval):
+        self.ticker = ticker
+        self.interval = interval
+        self._size = 0
+        self._data = {name: np.empty(0, dtype=np.int64 if name == 'epoch' else np.float64) for name in self.COLUMNS}
+        self.loading = False
+        self.exhausted = False # 보관소에 더 이전 캔들이 없음
+        self.follow = True # 마지막 캔들을 따라 화면 이동 (사용자가 과거로 이동하면 해제)
+
+    def __len__(self):
+        return self._size
+
+    def _column(self, name):
+        return self._data[name][:self._size]
+
+    @property
+    def x(self):
+        return self._column('x')
+
+    @property
+    def arrays(self):
+        return {column: self._column(column) for column in ('open', 'high', 'low', 'close')}
+
+    @property
+    def ma50(self):
+        return self._column('ma50')
+
+    @property
+    def ma200(self):
+        return self._column('ma200')
+
+    @property
+    def vwma100(self):
+        return self._column('vwma100')
+
+    @property
+    def first_timestamp(self):
+        return None if not self._size else KST_EPOCH + pd.Timedelta(seconds=int(self._data['epoch'][0]))
+
+    def frame(self):
+        """이력 전체를 pyupbit 형식 DataFrame 으로 반환"""
+        index = KST_EPOCH + pd.to_timedelta(self._column('epoch'), unit='s')
+        return pd.DataFrame({field: self._column(field) for field in CandleBuffer.FIELDS}, index=index)
+
+    def _reserve(self, size):
+        """size 개를 담을 수 있도록 저장 공간 확장 (2배씩 늘려 추가 비용을 분할 상환)"""
+        capacity = len(self._data['x'])
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 256)
+        for name, values in self._data.items():
+            grown = np.empty(capacity, dtype=values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._data[name] = grown
+
+    def _write(self, start, part, epochs):
+        """start 위치부터 part 캔들을 기록하고 그 구간 지표 갱신"""
+        size = start + len(part)
+        self._reserve(size)
+        data = self._data
+        data['epoch'][start:size] = epochs
+        data['x'][start:size] = mdates.date2num(part.index)
+        for field in CandleBuffer.FIELDS:
+            data[field][start:size] = part[field].to_numpy(dtype=np.float64)
+        self._size = size
+        
+        lo = max(0, start - self.INDICATOR_LOOKBACK)
+        indicators = compute_indicators(data['close'][lo:size], data['volume'][lo:size])
+        for name, values in zip(('ma50', 'ma200', 'vwma100'), indicators):
+            data[name][start:size] = values[start - lo:]
+
+    def merge(self, df):
+        """캔들 병합 (같은 시각은 새 값 우선, 전체 정렬 후 재계산 - 과거 구간 로드용). 추가된 캔들 수 반환"""
+        if df is None or df.empty:
+            return 0
+        part = df[list(CandleBuffer.FIELDS)]
+        before = len(self)
+        if before:
+            part = pd.concat([self.frame(), part])
+            part = part[~part.index.duplicated(keep='last')]
+        part = part.sort_index()
+        
+        self._size = 0
+        self._write(0, part, candle_epoch_seconds(part.index))
+        return len(self) - before
+
+    def append(self, df):
+        """실시간 캔들 반영 - 마지막 캔들과 같은 시각은 덮어쓰고 이후 캔들만 뒤에 추가 (이전 캔들은 무시). 추가된 캔들 수 반환"""
+        if df is None or df.empty:
+            return 0
+        if not self._size:
+            return self.merge(df)
+        
+        last = int(self._data['epoch'][self._size - 1])
+        part = df.iloc[df.index.searchsorted(KST_EPOCH + pd.Timedelta(seconds=last)):]
+        if part.empty:
+            return 0
+        epochs = candle_epoch_seconds(part.index)
+        before = self._size
+        self._write(before - 1 if epochs[0] == last else before, part, epochs)
+        return self._size - before
+
+    def load_before(self, archive, days):
+        """현재 이력 시작 이전의 보관 일자 중 최근 days 일치 캔들을 읽어 반환 (백그라운드 스레드에서 호출)"""
+        first = self.first_timestamp
+        if first is None:
+            return None
+        earlier = [day for day in archive.days(self.ticker, self.interval) if day <= first.strftime('%Y%m%d')]
+        if not earlier:
+            return None
+        start = pd.Timestamp(earlier[-min(len(earlier), days + 1)])
+        return archive.load(self.ticker, self.interval, start, first - pd.Timedelta(seconds=1))
+
+
+def _shift_right(values, steps=1):
+    """마지막 축 기준으로 steps 만큼 뒤로 민 배열 (앞쪽은 NaN) - 직전 캔들 값 계산용"""
+    shifted = np.full(values.shape, np.nan)
+    shifted[..., steps:] = values[..., :-steps]
+    return shifted
+
+
+def _rolling_sum(values, window):
+    """마지막 축 기준 rolling 합계 (NaN 이 포함된 구간과 window 미만 구간은 NaN)"""
+    valid = np.isfinite(values)
+    csum = np.cumsum(np.where(valid, values, 0.0), axis=-1)
+    ccount = np.cumsum(valid, axis=-1)
+    
+    sums = csum.copy()
+    counts = ccount.copy()
+    sums[..., window:] -= csum[..., :-window]
+    counts[..., window:] -= ccount[..., :-window]
+    
+    sums[counts < window] = np.nan
+    return sums
+
+
+def _rolling_all(condition, window):
+    """마지막 축 기준 최근 window 개가 모두 True 인지 여부"""
+    csum = np.cumsum(condition, axis=-1, dtype=np.int32)
+    counts = csum.copy()
+    counts[..., window:] -= csum[..., :-window]
+    return counts >= window
+
+
+def compute_indicators(close, volume):
+    """MA50, MA200, VWMA100 을 (…, 시간) 배열로 한 번에 계산"""
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    ma50 = _rolling_sum(close, 50) / 50
+    ma200 = _rolling_sum(close, 200) / 200
+    vwma100 = _rolling_sum(close * volume, 100) / _rolling_sum(volume, 100)
+    return ma50, ma200, vwma100
+
+
+def compute_signal_flags(open_, high, low, close, volume, indicators=None):
+    """5분봉 50선 전략의 모든 판단 조건을 캔들별 비트 플래그(uint16)로 계산
+    
+    입력은 (시간,) 또는 (종목, 시간) 배열이며 같은 모양의 플래그 배열을 반환합니다.
+    각 위치의 플래그는 해당 캔들을 '현재 캔들'로 보았을 때 _strategy_5min_ma50 이 평가하는 조건과 같습니다.
+    """
+    open_, high, low, close = (np.asarray(x, dtype=np.float64) for x in (open_, high, low, close))
+    ma50, ma200, vwma100 = indicators if indicators is not None else compute_indicators(close, volume)
+    prev_open, prev_close = _shift_right(open_), _shift_right(close)
+    prev_ma50, prev_ma200 = _shift_right(ma50), _shift_right(ma200)
+    
+    with np.errstate(invalid='ignore'):
+        trend_ok = _rolling_all((ma200 > vwma100) & (vwma100 > ma50), 12)
+        prev_breakout = (prev_close > prev_ma50) & (prev_open <= prev_ma50)
+        above_ma50 = (open_ > ma50) & (close > ma50)
+        near_ma200 = np.abs(prev_close - prev_ma200) < (prev_close * 0.005)
+        breakout = prev_breakout & above_ma50 & ~near_ma200
+        below_ma50_10 = _rolling_all(close < ma50, 10)
+        high_reach_ma200 = high >= ma200
+        trailing_sell = (close < ma50) & (prev_close >= prev_ma50)
+        below_ma50_3 = _rolling_all(high < ma50, 3)
+        stop_1 = low < ma50 * (1 - 0.007)
+        stop_2 = (prev_open < prev_ma50) & (prev_close < prev_ma50) & (close < open_)
+    
+    flags = np.zeros(close.shape, dtype=np.uint16)
+    for condition, bit in ((trend_ok, SIGNAL_TREND_OK), (prev_breakout, SIGNAL_PREV_BREAKOUT), 
+                           (above_ma50, SIGNAL_ABOVE_MA50), (near_ma200, SIGNAL_NEAR_MA200), 
+                           (breakout, SIGNAL_BREAKOUT), (below_ma50_10, SIGNAL_BELOW_MA50_10), 
+                           (high_reach_ma200, SIGNAL_HIGH_REACH_MA200), (trailing_sell, SIGNAL_TRAILING_SELL), 
+                           (below_ma50_3, SIGNAL_BELOW_MA50_3), (stop_1, SIGNAL_STOP_1), (stop_2, SIGNAL_STOP_2)):
+        flags[condition] |= bit
+    return flags
+
+
+class CandleBuffer:
+    """종목 하나의 최근 캔들을 열 단위 고정 크기 배열(epoch int64 + OHLCV float32)로 보관하는 버퍼
+    
+    - 새 캔들은 오른쪽 끝에 추가되고 용량을 넘은 오래된 캔들은 왼쪽으로 밀려 버려집니다 (지표 계산에 바로 쓰도록 항상 시간순 연속 배열 유지)
+    - 가격은 float32 로 보관하고 지표/플래그는 float64 로 계산하되, merge 전까지는 마지막 캔들 값만 캐시합니다
+    - 쓰기는 트레이딩 스레드, 읽기(차트용 frame)는 Tk 스레드에서 할 수 있도록 잠금으로 보호합니다
+    - pandas DataFrame 은 차트/개발 모드 로그처럼 필요한 곳에서만 frame() 으로 생성합니다
+    """
+
+    FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, capacity=CANDLE_BUFFER_SIZE):
+        self.capacity = capacity
+        self.size = 0
+        self.epoch = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((len(self.FIELDS), capacity), dtype=np.float32)
+        self._lock = threading.Lock()
+        self._cache = None
+
+    def __len__(self):
+        return self.size
+
+    def __getstate__(self):
+        # 샤드 워커 → 코디네이터 전달 (잠금 제외)
+        with self._lock:
+            return {'capacity': self.capacity, 'size': self.size, 'epoch': self.epoch, 'values': self.values, '_cache': self._cache}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        return self.epoch.nbytes + self.values.nbytes
+
+    @property
+    def last_epoch(self):
+        return int(self.epoch[-1]) if self.size else None
+
+    @property
+    def last_close(self):
+        return float(self.values[3, -1]) if self.size else None
+
+    def column(self, field):
+        """필드 값 (float64 사본, 시간순)"""
+        return self.values[self.FIELDS.index(field), self.capacity - self.size:].astype(np.float64)
+
+    def missing_count(self, now, interval_seconds):
+        """now 까지 추가로 받아야 할 캔들 수 (진행 중 캔들 갱신 포함). 비어 있거나 용량보다 적으면 용량 전체"""
+        if self.size < self.capacity:
+            return self.capacity
+        return min(self.capacity, int((now - self.epoch[-1]) // interval_seconds) + 2)
+
+    def merge(self, df):
+        """pyupbit 캔들 DataFrame 병합 (같은 시각 캔들은 덮어쓰고, 새 캔들은 오른쪽 끝에 추가). 추가된 캔들 수 반환"""
+        if df is None or df.empty:
+            return 0
+        epochs = candle_epoch_seconds(df.index)
+        values = np.vstack([df[field].to_numpy(dtype=np.float32) for field in self.FIELDS])
+        return self._merge_arrays(epochs, values)
+
+    def _merge_arrays(self, epochs, values):
+        with self._lock:
+            self._cache = None
+            if self.size:
+                last = self.epoch[-1]
+                keep = epochs >= last
+                epochs, values = epochs[keep], values[:, keep]
+                if len(epochs) and epochs[0] == last:
+                    self.values[:, -1] = values[:, 0]
+                    epochs, values = epochs[1:], values[:, 1:]
+            
+            added = min(len(epochs), self.capacity)
+            if added:
+                self.epoch[:-added] = self.epoch[added:].copy()
+                self.values[:, :-added] = self.values[:, added:].copy()
+                self.epoch[-added:] = epochs[-added:]
+                self.values[:, -added:] = values[:, -added:]
+                self.size = min(self.capacity, self.size + added)
+            return added
+
+    def delta(self, since=None):
+        """since(epoch) 이후 캔들 (같은 시각 포함) 의 (epochs, values) 사본 - None 이면 전체 (샤드 → 코디네이터 전송용)"""
+        with self._lock:
+            start = self.capacity - self.size
+            if since is not None:
+                start += int(np.searchsorted(self.epoch[start:], since, side='left'))
+            return self.epoch[start:].copy(), self.values[:, start:].copy()
+
+    def apply_delta(self, epochs, values, latest=None):
+        """delta 로 받은 캔들을 병합하고, 보낸 쪽이 계산한 마지막 캔들 지표(latest)를 캐시로 사용. 추가된 캔들 수 반환"""
+        added = self._merge_arrays(epochs, values)
+        if latest is not None:
+            with self._lock:
+                self._cache = latest
+        return added
+
+    def resize(self, capacity):
+        """용량 변경 (최근 캔들 유지)"""
+        if capacity == self.capacity:
+            return
+        with self._lock:
+            keep = min(self.size, capacity)
+            epoch = np.zeros(capacity, dtype=np.int64)
+            values = np.zeros((len(self.FIELDS), capacity), dtype=np.float32)
+            if keep:
+                epoch[-keep:] = self.epoch[-keep:]
+                values[:, -keep:] = self.values[:, -keep:]
+            self.epoch, self.values, self.capacity, self.size = epoch, values, capacity, keep
+            self._cache = None
+
+    def _indicators(self):
+        return compute_indicators(self.values[3, self.capacity - self.size:].astype(np.float64),
+                                  self.values[4, self.capacity - self.size:].astype(np.float64))
+
+    def latest(self):
+        """마지막 캔들의 (ma50, ma200, vwma100, flags) - 전체 구간을 계산한 뒤 마지막 값만 merge 전까지 캐시"""
+        with self._lock:
+            if self._cache is None:
+                open_, high, low, close, volume = self.values[:, self.capacity - self.size:].astype(np.float64)
+                ma50, ma200, vwma100 = indicators = compute_indicators(close, volume)
+                flags = compute_signal_flags(open_, high, low, close, volume, indicators)
+                self._cache = (float(ma50[-1]), float(ma200[-1]), float(vwma100[-1]), int(flags[-1]))
+            return self._cache
+
+    def frame(self, tail=None):
+        """pandas DataFrame (지표 열 MA50/MA200/VWMA100 포함) - 차트 등 pandas 가 필요한 곳에서만 사용"""
+        with self._lock:
+            ma50, ma200, vwma100 = self._indicators()
+            start = self.capacity - self.size
+            index = KST_EPOCH + pd.to_timedelta(self.epoch[start:], unit='s')
+            df = pd.DataFrame({field: self.values[i, start:].astype(np.float64) for i, field in enumerate(self.FIELDS)}, index=index)
+        df['MA50'], df['MA200'], df['VWMA100'] = ma50, ma200, vwma100
+        return df.tail(tail) if tail is not None else df
+
+
+class MarketScanner:
+    """전체 마켓의 최근 캔들을 (필드, 종목, 시간) 3차원 NumPy 블록 하나에 보관하고
+    모든 종목의 이동평균/매수 조건을 한 번의 벡터 연산으로 계산하는 스캐너"""
+
+    FIELDS = ('open', 'high', 'low', 'close', 'volume', 'value')
+
+    def __init__(self, window=SCANNER_WINDOW):
+        self.window = window
+        self.tickers = []
+        self._rows = {}
+        self.block = np.full((len(self.FIELDS), 0, window), np.nan)
+        self.last_epoch = np.zeros(0, dtype=np.int64)
+
+    def _row(self, ticker):
+        row = self._rows.get(ticker)
+        if row is None:
+            row = len(self.tickers)
+            self.tickers.append(ticker)
+            self._rows[ticker] = row
+            self.block = np.concatenate([self.block, np.full((len(self.FIELDS), 1, self.window), np.nan)], axis=1)
+            self.last_epoch = np.append(self.last_epoch, 0)
+        return row
+
+    def last_candle_time(self, ticker):
+        """종목의 마지막 캔들 epoch 초 (미보유 시 None)"""
+        row = self._rows.get(ticker)
+        return int(self.last_epoch[row]) if row is not None and self.last_epoch[row] else None
+
+    def update(self, ticker, df):
+        """pyupbit 캔들 DataFrame 을 종목 행에 병합 (같은 시각 캔들은 덮어쓰고, 새 캔들은 왼쪽으로 밀어 추가)"""
+        if df is None or df.empty:
+            return
+        
+        row = self._row(ticker)
+        epochs = candle_epoch_seconds(df.index)
+        values = np.vstack([df[field].to_numpy(dtype=np.float64) for field in self.FIELDS])
+        
+        last = self.last_epoch[row]
+        if last:
+            keep = epochs >= last
+            epochs, values = epochs[keep], values[:, keep]
+            if len(epochs) == 0:
+                return
+            if epochs[0] == last:
+                self.block[:, row, -1] = values[:, 0]
+                epochs, values = epochs[1:], values[:, 1:]
+        
+        added = min(len(epochs), self.window)
+        if added:
+            self.block[:, row, :-added] = self.block[:, row, added:].copy()
+            self.block[:, row, -added:] = values[:, -added:]
+            self.last_epoch[row] = epochs[-1]
+
+    def remove(self, ticker):
+        """종목 행 삭제"""
+        row = self._rows.pop(ticker, None)
+        if row is None:
+            return
+        self.tickers.pop(row)
+        self.block = np.delete(self.block, row, axis=1)
+        self.last_epoch = np.delete(self.last_epoch, row)
+        self._rows = {t: i for i, t in enumerate(self.tickers)}
+
+    def scan(self, min_trade_value=0):
+        """모든 종목의 현재 캔들 매수 조건(정배열 + 50MA 돌파)을 한 번에 계산하여 충족 종목을 순위대로 반환
+        
+        순위: 최근 window 캔들 거래 대금 합계 내림차순 (min_trade_value 미만 제외)
+        """
+        if not self.tickers:
+            return []
+        
+        open_, high, low, close, volume, value = self.block
+        flags = compute_signal_flags(open_, high, low, close, volume)[:, -1]
+        trade_value = np.nansum(value, axis=1)
+        
+        matched = np.flatnonzero(((flags & SIGNAL_BUY) == SIGNAL_BUY) & (trade_value >= min_trade_value))
+        ranked = matched[np.argsort(-trade_value[matched], kind='stable')]
+        return [{'ticker': self.tickers[row], 'price': float(close[row, -1]), 
+                 'trade_value': float(trade_value[row]), 'flags': int(flags[row])} for row in ranked]
+
+
+def refresh_candles(candles, ticker, interval, now, metrics, archive=None, stop_event=None):
+    """캔들 버퍼에 마지막 캔들 이후 분량만 증분 조회하여 병합하고 마지막 캔들 지표를 계산
+    
+    트레이딩 스레드와 샤드 워커 프로세스가 함께 사용합니다. 조회 중 종료 요청(stop_event)이 오면 응답을 버리고 False 반환.
+    """
+    count = candles.missing_count(now, INTERVAL_SECONDS.get(interval, 60))
+    df = metrics.call('get_ohlcv', pyupbit.get_ohlcv, ticker, interval=interval, count=count) 
+    
+    if stop_event is not None and stop_event.is_set():
+        # 종료 요청 이후 도착한 응답은 폐기 (전략 판단/주문 없이 종료)
+        return False
+    
+    if df is not None and not df.empty and archive is not None:
+        try:
+            with metrics.timer('archive'):
+                archive.append(ticker, interval, df)
+        except Exception as e:
+            metrics.increment('archive_error')
+            print(f"캔들 저장 오류 ({ticker}): {e}")
+    
+    candles.merge(df)
+    if len(candles) >= 200:
+        with metrics.timer('indicators'):
+            candles.latest()
+    return True
+
+
+def run_shard_worker(shard, commands, results, api_base_url=None, archive_root=None, initializer=None, initargs=()):
+    """샤드 워커 프로세스 본체 - 배정된 종목의 캔들 버퍼/지표 상태를 소유하고, 틱마다 갱신분만 코디네이터로 보냄
+    
+    commands: ('tickers', [종목...]) 배정 변경 / ('tick', (순번, now, 시간봉, 차트 종목)) 갱신 / None 종료
+    results: ('candles', 순번, 샤드, 종목, (시간봉, 전체 여부, 용량, epochs, values, latest)) / ('error', 순번, 샤드, 종목, 메시지) /
+             ('done', 순번, 샤드, None, 지표)
+    캔들은 종목별로 처음 한 번만 전체를 보내고, 이후에는 마지막으로 보낸 캔들(진행 중 캔들 갱신)부터의 행과
+    마지막 캔들 지표(CandleBuffer.latest)만 보냅니다.
+    """
+    if api_base_url:
+        set_upbit_api_base_url(api_base_url)
+    if initializer is not None:
+        initializer(*initargs)
+    
+    metrics = PerformanceMetrics()
+    archive = CandleArchive(archive_root) if archive_root else None
+    tickers = []
+    buffers = {}
+    sent = {} # (종목, 시간봉) → 코디네이터에 마지막으로 보낸 캔들 epoch
+    
+    while True:
+        command = commands.get()
+        if command is None:
+            break
+        kind, payload = command
+        
+        if kind == 'tickers':
+            tickers = list(payload)
+            for key in [key for key in buffers if key[0] not in tickers]:
+                del buffers[key]
+                sent.pop(key, None)
+        
+        elif kind == 'tick':
+            seq, now, interval, chart_ticker = payload
+            for key in [key for key in buffers if key[1] != interval]:
+                del buffers[key] # 시간봉 변경
+                sent.pop(key, None)
+            for ticker in tickers:
+                candles = buffers.get((ticker, interval))
+                if candles is None:
+                    candles = buffers[(ticker, interval)] = CandleBuffer()
+                candles.resize(CHART_BUFFER_SIZE if ticker == chart_ticker else CANDLE_BUFFER_SIZE)
+                try:
+                    refresh_candles(candles, ticker, interval, now, metrics, archive)
+                    key = (ticker, interval)
+                    full = key not in sent
+                    epochs, values = candles.delta(None if full else sent[key])
+                    latest = candles.latest() if len(candles) >= 200 else None
+                    results.put(('candles', seq, shard, ticker, (interval, full, candles.capacity, epochs, values, latest)))
+                    if len(epochs):
+                        sent[key] = int(epochs[-1])
+                except Exception as e:
+                    metrics.increment('shard_error')
+                    results.put(('error', seq, shard, ticker, f"{type(e).__name__} - {e}"))
+            results.put(('done', seq, shard, None, metrics.export(reset=True)))
+
+
+class ShardedEngine:
+    """종목 유니버스를 워커 프로세스(샤드)에 나눠 캔들 조회/지표 계산을 병렬 실행하는 엔진 (코디네이터 측)
+    
+    각 샤드는 자신에게 배정된 종목의 CandleBuffer 를 소유하고 틱마다 갱신된 캔들 행과 마지막 캔들 지표만 결과 큐로 보내며,
+    엔진은 이를 코디네이터 측 버퍼(self.buffers)에 반영합니다 (중단된 틱의 늦은 결과도 반영하여 버퍼에 빈 구간이 생기지 않음).
+    전략 판단, 포지션/주문, 장부, 화면 갱신은 코디네이터(트레이딩 스레드)가 결과 도착 순서대로 처리합니다.
+    종목은 배정된 샤드에 계속 머물고 (캔들 상태 유지), 새 종목은 배정 종목이 가장 적은 샤드로 갑니다.
+    """
+
+    def __init__(self, workers=SHARD_WORKERS, archive_root=CANDLE_ARCHIVE_DIR, initializer=None, initargs=()):
+        context = multiprocessing.get_context('spawn')
+        self.workers = max(1, workers)
+        self.results = context.Queue()
+        self.commands = [context.Queue() for _ in range(self.workers)]
+        self.processes = [
+            context.Process(target=run_shard_worker, name=f"Shard-{shard}", daemon=True,
+                            args=(shard, self.commands[shard], self.results, _upbit_api_base_url, archive_root, initializer, initargs))
+            for shard in range(self.workers)
+        ]
+        self.assignment = {}
+        self.buffers = {} # (종목, 시간봉) → 샤드 버퍼의 코디네이터 측 사본
+        self._seq = 0
+
+    def start(self):
+        for process in self.processes:
+            process.start()
+        return self
+
+    def assign(self, tickers):
+        """샤드별 담당 종목 갱신 (빠진 종목은 샤드에서 제거, 새 종목은 가장 적게 배정된 샤드로)"""
+        tickers = list(dict.fromkeys(tickers))
+        assignment = {ticker: shard for ticker, shard in self.assignment.items() if ticker in tickers}
+        loads = [0] * self.workers
+        for shard in assignment.values():
+            loads[shard] += 1
+        for ticker in tickers:
+            if ticker not in assignment:
+                shard = loads.index(min(loads))
+                assignment[ticker] = shard
+                loads[shard] += 1
+        
+        for shard in range(self.workers):
+            before = [ticker for ticker, owner in self.assignment.items() if owner == shard]
+            after = [ticker for ticker in tickers if assignment[ticker] == shard]
+            if before != after:
+                self.commands[shard].put(('tickers', after))
+        self.assignment = assignment
+        for key in [key for key in self.buffers if key[0] not in assignment]:
+            del self.buffers[key] # 샤드도 버퍼를 지우므로 다시 배정되면 전체를 새로 받음
+
+    def _apply(self, ticker, update):
+        """샤드가 보낸 갱신분을 코디네이터 측 버퍼에 반영하고 버퍼 반환 (전체 전송이면 새로 만듦)"""
+        interval, full, capacity, epochs, values, latest = update
+        key = (ticker, interval)
+        candles = self.buffers.get(key)
+        if candles is None or full:
+            candles = self.buffers[key] = CandleBuffer(capacity)
+        candles.resize(capacity)
+        candles.apply_delta(epochs, values, latest)
+        return candles
+
+    def tick(self, now, interval, chart_ticker=None, stop_event=None, metrics=None):
+        """모든 샤드에 갱신을 요청하고 (종목, CandleBuffer) 를 도착 순서대로 반환하는 제너레이터
+        
+        샤드 오류는 (종목, 오류 메시지 문자열) 로 반환합니다. 종료 요청 시 남은 결과를 기다리지 않고 끝납니다.
+        """
+        self._seq += 1
+        seq = self._seq
+        pending = set()
+        for shard in range(self.workers):
+            if any(owner == shard for owner in self.assignment.values()):
+                self.commands[shard].put(('tick', (seq, now, interval, chart_ticker)))
+                pending.add(shard)
+        
+        while pending:
+            if stop_event is not None and stop_event.is_set():
+                return
+            try:
+                kind, result_seq, shard, ticker, payload = self.results.get(timeout=SHARD_RESULT_POLL)
+            except queue.Empty:
+                if not any(self.processes[shard].is_alive() for shard in pending):
+                    raise RuntimeError("샤드 워커 프로세스가 모두 종료되었습니다.")
+                continue
+            if kind == 'candles' and ticker in self.assignment:
+                candles = self._apply(ticker, payload)
+            if result_seq != seq:
+                continue # 이전에 중단된 틱의 늦은 결과 (버퍼에만 반영)
+            
+            if kind == 'done':
+                pending.discard(shard)
+                if metrics is not None:
+                    metrics.absorb(payload)
+            elif ticker in self.assignment:
+                yield ticker, candles if kind == 'candles' else payload
+
+    def stop(self):
+        """워커 종료 요청 후 SHARD_JOIN_TIMEOUT 초 안에 끝나지 않으면 강제 종료"""
+        for commands in self.commands:
+            commands.put(None)
+        deadline = time.monotonic() + SHARD_JOIN_TIMEOUT
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+        self.assignment = {}
+        self.buffers = {}
+
+
 class AutoTradingGUI:
     """Upbit 자동 트레이딩 GUI 클래스"""
 
@@ -31,6 +1953,12 @@ class AutoTradingGUI:
         self.access_key = os.getenv("UPBIT_ACCESS_KEY")
         self.secret_key = os.getenv("UPBIT_SECRET_KEY")
         
+        api_base_url = os.getenv("UPBIT_API_BASE_URL")
+        if api_base_url:
+            set_upbit_api_base_url(api_base_url)
+            master.title(f"Auto Trading ({APP_VERSION}) - API: {api_base_url}")
+            print(f"Upbit API 주소 변경: {api_base_url}")
+        
         self.upbit = None
         if self.access_key and self.secret_key:
             try:
@@ -41,25 +1969,70 @@ class AutoTradingGUI:
         else:
             messagebox.showwarning("API 경고", ".env 파일에서 API 키를 불러올 수 없습니다.")
 
-        self.min_trade_volume = 0 
-        self.holdings = {} 
-        self.target_ticker = "N/A" 
-        self.buy_candle_time = {}
+        self._init_trading_state()
         
         self._create_frames()
         self._create_widgets()
         self._layout_widgets()
         self._setup_chart() 
 
-        self.trading_active = False
         self.status_text.set("시작 대기 중")
-        self.trading_thread = None 
-        self.log_save_thread = None
         
         self._log_no_source(f"Auto Trading ({APP_VERSION})")
         self._log_no_source(f"디버그 모드 (캔들 로깅): {'활성화' if DEBUG_MODE_CANDLE else '비활성화'}")
+        
+        self.master.after(METRICS_REFRESH_MS, self._refresh_metrics_panel)
+        self.master.after(DASHBOARD_REFRESH_MS, self._refresh_dashboard)
 
 
+    def _init_trading_state(self):
+        """위젯과 무관한 트레이딩 상태 초기화 (헤드리스 실행 시에도 사용)"""
+        self.min_trade_volume = 0 
+        self.positions = PositionStore()
+        self.target_ticker = "N/A" 
+        self.metrics = PerformanceMetrics()
+        self._metrics_refresh_count = 0
+        self.clock = SystemClock()
+        self.candle_archive = CandleArchive()
+        self.paper_ledger = PaperLedger()
+        self.scheduler = TradingScheduler(self.clock)
+        self.cycle_jitter_seconds = SCHEDULER_JITTER_SECONDS
+        self._jitter_random = random.Random()
+        self.market_scanner = None
+        self._market_scan_stop = None
+        self._last_scan_candidates = None
+        self._market_list = None
+        self._market_list_at = 0.0
+        self.chart_history = None
+        self._lod_artists = None
+        self._lod_xlim_cid = None
+        self._lod_redraw_job = None
+        self._lod_updating = False
+        self._last_chart_args = None
+        self.sparklines = SparklineBuffer()
+        self.selected_ticker = None
+        self._chart_frames = {}
+        self.candle_buffers = {}
+        self.shard_workers = SHARD_WORKERS
+        self.shard_initializer = (None, ()) # 샤드 워커 시작 시 실행할 (함수, 인자) - 헤드리스 벤치마크의 가짜 시세 설치 등
+        self._trading_config = None # 트레이딩 스레드에 적용된 설정 (설정 적용 시 변경 비교용)
+        self._pending_config = None # 설정 적용 버튼으로 들어와 다음 사이클부터 반영될 설정
+        self.trade_ratio = 100 # 매수에 사용할 잔고 비율 (%) - 시작/설정 적용 시 확정된 값
+        self._config_lock = threading.Lock()
+        self._warming = set() # 백그라운드 워밍업 중이라 아직 매매 대상에 넣지 않은 종목
+        self._cycle_timer = None
+        self._log_save_timer = None
+        
+        self.trading_active = False
+        self.trading_thread = None 
+        self.stop_event = threading.Event()
+        self._flush_threads = []
+        self._closing = False
+        self.profiler = None
+        self.profile_path = None
+        self.decision_log = DecisionLog()
+        self.decision_trace = DecisionTrace()
+
     def _create_frames(self):
         """GUI 레이아웃을 위한 프레임 생성 (좌측과 우측 분리)"""
         style = ttk.Style()
@@ -88,6 +2061,8 @@ class AutoTradingGUI:
         self.log_frame = ttk.LabelFrame(self.left_panel, text="5. 실시간 로그", padding="10")
         
         self.chart_frame = ttk.LabelFrame(self.right_panel, text="6. 차트", padding="5")
+        self.metrics_frame = ttk.LabelFrame(self.right_panel, text="7. 성능 지표", padding="5")
+        self.dashboard_frame = ttk.LabelFrame(self.right_panel, text="8. 종목 대시보드", padding="5")
 
 
     def _create_widgets(self):
@@ -125,6 +2100,11 @@ class AutoTradingGUI:
         self.ma_timeframe_menu = ttk.Combobox(self.options_frame, textvariable=self.ma_timeframe_var, 
                                               values=self.ma_timeframe_options, state='readonly')
         
+        self.engine_var = tk.StringVar(value=ENGINE_THREAD)
+        self.engine_label = ttk.Label(self.options_frame, text="실행 엔진:")
+        self.engine_options = [ENGINE_THREAD, ENGINE_PROCESS]
+        self.engine_menu = ttk.Combobox(self.options_frame, textvariable=self.engine_var, values=self.engine_options, state='readonly')
+        
         self.data_load_time_var = tk.StringVar(value='10') 
         self.data_load_time_label = ttk.Label(self.settings_frame, text="데이터 로딩 시간 (초):")
         self.data_load_time_entry = ttk.Entry(self.settings_frame, textvariable=self.data_load_time_var, font=('Malgun Gothic', 10))
@@ -133,6 +2113,10 @@ class AutoTradingGUI:
         self.ticker_input_label = ttk.Label(self.settings_frame, text="매매 희망 종목 (쉼표 구분):")
         self.ticker_input_entry = ttk.Entry(self.settings_frame, textvariable=self.ticker_input_var, font=('Malgun Gothic', 10))
         
+        self.align_candle_var = tk.BooleanVar(value=False)
+        self.align_candle_check = ttk.Checkbutton(self.settings_frame, text="캔들 마감 시점에 실행", 
+                                                  variable=self.align_candle_var)
+        
         self.auto_select_var = tk.BooleanVar(value=False)
         self.auto_select_check = ttk.Checkbutton(self.settings_frame, text="종목 자동 선택", 
                                                 variable=self.auto_select_var, command=self._toggle_ticker_input)
@@ -145,14 +2129,49 @@ class AutoTradingGUI:
         self.log_save_time_label = ttk.Label(self.etc_frame, text="로그 저장 주기 (시간):")
         self.log_save_time_entry = ttk.Entry(self.etc_frame, textvariable=self.log_save_time_var, font=('Malgun Gothic', 10))
         
+        self.chart_mode_var = tk.StringVar(value=CHART_MODE_RECENT)
+        self.chart_mode_label = ttk.Label(self.etc_frame, text="차트 모드:")
+        self.chart_mode_menu = ttk.Combobox(self.etc_frame, textvariable=self.chart_mode_var, 
+                                            values=[CHART_MODE_RECENT, CHART_MODE_LOD], state='readonly')
+        self.chart_mode_menu.bind("<<ComboboxSelected>>", self._on_chart_mode_changed)
+        
+        self.profiler_duration_var = tk.StringVar(value=str(PROFILER_DEFAULT_SECONDS))
+        self.profiler_duration_label = ttk.Label(self.etc_frame, text="프로파일링 시간 (초):")
+        self.profiler_duration_entry = ttk.Entry(self.etc_frame, textvariable=self.profiler_duration_var, font=('Malgun Gothic', 10))
+        self.profiler_button = ttk.Button(self.etc_frame, text="프로파일링 시작", command=self._toggle_profiler)
+        
         self.start_button = ttk.Button(self.button_frame, text="트레이딩 시작", command=self._handle_start)
         self.stop_button = ttk.Button(self.button_frame, text="트레이딩 종료", command=self._stop_trading, state='disabled')
+        self.apply_button = ttk.Button(self.button_frame, text="설정 적용", command=self._apply_settings, state='disabled')
         
         self.log_text = tk.Text(self.log_frame, state='disabled', wrap='word', 
                                 font=("Malgun Gothic", 9), height=10, 
                                 bg='#2b2b2b', fg='white', insertbackground='white')
         self.log_scrollbar = ttk.Scrollbar(self.log_frame, command=self.log_text.yview)
         self.log_text.config(yscrollcommand=self.log_scrollbar.set)
+        
+        metrics_columns = ('count', 'p50', 'p95', 'p99', 'max')
+        self.metrics_tree = ttk.Treeview(self.metrics_frame, columns=metrics_columns, height=6)
+        self.metrics_tree.heading('#0', text='구간')
+        self.metrics_tree.column('#0', width=220, anchor='w')
+        for column, heading in zip(metrics_columns, ('횟수', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', '최대 (ms)')):
+            self.metrics_tree.heading(column, text=heading)
+            self.metrics_tree.column(column, width=90, anchor='e')
+        self.metrics_scrollbar = ttk.Scrollbar(self.metrics_frame, command=self.metrics_tree.yview)
+        self.metrics_tree.config(yscrollcommand=self.metrics_scrollbar.set)
+        
+        self.metrics_counter_text = tk.StringVar(value="API 오류: 0 / 요청 제한: 0")
+        self.metrics_counter_label = ttk.Label(self.metrics_frame, textvariable=self.metrics_counter_text, foreground="gray")
+        self.metrics_reset_button = ttk.Button(self.metrics_frame, text="지표 초기화", command=self._reset_metrics)
+        
+        self.dashboard_canvas = tk.Canvas(self.dashboard_frame, height=DASHBOARD_ROW_HEIGHT * 6, bg='#161b22', highlightthickness=0)
+        self.dashboard_scrollbar = ttk.Scrollbar(self.dashboard_frame, command=self.dashboard_canvas.yview)
+        self.dashboard_canvas.config(yscrollcommand=self.dashboard_scrollbar.set)
+        self.dashboard_canvas.bind("<Button-1>", self._on_dashboard_click)
+        self.dashboard_highlight = self.dashboard_canvas.create_rectangle(0, 0, 0, 0, fill='#2d333b', outline='')
+        self.dashboard_spark_item = self.dashboard_canvas.create_image(DASHBOARD_SPARK_X, 0, anchor='nw')
+        self.dashboard_photo = None
+        self.dashboard_text_items = []
 
     def _layout_widgets(self):
         """GUI 위젯 배치"""
@@ -167,6 +2186,8 @@ class AutoTradingGUI:
         self.right_panel.rowconfigure(0, weight=1)
         self.right_panel.columnconfigure(0, weight=1)
         self.chart_frame.grid(row=0, column=0, padx=5, pady=5, sticky="nsew") 
+        self.metrics_frame.grid(row=1, column=0, padx=5, pady=5, sticky="nsew")
+        self.dashboard_frame.grid(row=2, column=0, padx=5, pady=5, sticky="nsew")
 
         self.status_label.pack(fill="x", pady=(5, 0)) 
         self.check_balance_button.pack(fill="x", pady=5)
@@ -184,12 +2205,15 @@ class AutoTradingGUI:
         
         self.ma_timeframe_label.grid(row=3, column=0, padx=5, pady=5, sticky="w")
         self.ma_timeframe_menu.grid(row=3, column=1, padx=5, pady=5, sticky="ew")
+        self.engine_label.grid(row=4, column=0, padx=5, pady=5, sticky="w")
+        self.engine_menu.grid(row=4, column=1, padx=5, pady=5, sticky="ew")
 
         self.settings_frame.columnconfigure(1, weight=1)
         self.data_load_time_label.grid(row=0, column=0, padx=5, pady=5, sticky="w")
         self.data_load_time_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
         self.ticker_input_label.grid(row=1, column=0, padx=5, pady=5, sticky="w")
         self.ticker_input_entry.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
+        self.align_candle_check.grid(row=2, column=0, padx=5, pady=5, sticky="w")
         self.auto_select_check.grid(row=2, column=1, padx=5, pady=5, sticky="e")
         
         self.manual_button_frame.grid(row=3, column=0, columnspan=2, padx=5, pady=(0, 5), sticky="ew")
@@ -199,14 +2223,30 @@ class AutoTradingGUI:
         self.etc_frame.columnconfigure(1, weight=1)
         self.log_save_time_label.grid(row=0, column=0, padx=5, pady=5, sticky="w")
         self.log_save_time_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        self.chart_mode_label.grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        self.chart_mode_menu.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
+        self.profiler_duration_label.grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        self.profiler_duration_entry.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
+        self.profiler_button.grid(row=3, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
 
         self.start_button.pack(side=tk.LEFT, expand=True, fill="x", padx=5)
+        self.apply_button.pack(side=tk.LEFT, expand=True, fill="x", padx=5)
         self.stop_button.pack(side=tk.RIGHT, expand=True, fill="x", padx=5)
         
         self.log_frame.columnconfigure(0, weight=1)
         self.log_frame.rowconfigure(0, weight=1)
         self.log_text.grid(row=0, column=0, sticky='nsew')
         self.log_scrollbar.grid(row=0, column=1, sticky='ns')
+        
+        self.metrics_frame.columnconfigure(0, weight=1)
+        self.metrics_tree.grid(row=0, column=0, columnspan=2, sticky='nsew')
+        self.metrics_scrollbar.grid(row=0, column=2, sticky='ns')
+        self.metrics_counter_label.grid(row=1, column=0, padx=5, pady=(5, 0), sticky='w')
+        self.metrics_reset_button.grid(row=1, column=1, columnspan=2, padx=5, pady=(5, 0), sticky='e')
+        
+        self.dashboard_frame.columnconfigure(0, weight=1)
+        self.dashboard_canvas.grid(row=0, column=0, sticky='nsew')
+        self.dashboard_scrollbar.grid(row=0, column=1, sticky='ns')
 
     def _setup_chart(self):
         """Matplotlib Figure를 생성하고 Tkinter에 임베딩"""
@@ -232,12 +2272,32 @@ class AutoTradingGUI:
         self.fig.tight_layout()
         self.canvas.draw()
         
-    def _draw_chart(self, df, timeframe_label):
-        """캔들 가격과 이평선 추세를 시각화 (캔들스틱 차트)"""
+    def _draw_chart(self, df, timeframe_label, ticker=None, interval=None):
+        """캔들 가격과 이평선 추세를 시각화 (차트 모드에 따라 최근 캔들스틱 또는 장기 LOD 차트)"""
+        self._last_chart_args = (df, timeframe_label, ticker, interval)
+        if isinstance(df, CandleBuffer):
+            df = df.frame()
         
+        if self.chart_mode_var.get() == CHART_MODE_LOD and interval is not None:
+            with self.metrics.timer('draw_chart_lod'):
+                self._render_lod_chart(df, ticker or self.target_ticker, interval)
+            return
+        
+        with self.metrics.timer('draw_chart'):
+            self._render_chart(df, timeframe_label)
+    
+    def _on_chart_mode_changed(self, event=None):
+        """차트 모드 변경 시 마지막 데이터로 즉시 다시 그림"""
+        if self._last_chart_args is not None:
+            self._draw_chart(*self._last_chart_args)
+    
+    def _render_chart(self, df, timeframe_label):
+        """캔들스틱 차트 렌더링 본체"""
+        
+        self._lod_artists = None
         self.ax.clear()
         
-        plot_df = df.tail(200).copy()
+        plot_df = df.tail(200)
         x_index = np.arange(len(plot_df))
         
         up = plot_df['close'] >= plot_df['open']
@@ -259,8 +2319,9 @@ class AutoTradingGUI:
         self.ax.plot(x_index, plot_df['VWMA100'], label='100-VWMA', color='#ffffff', 
                      linestyle='-', linewidth=1.5, alpha=0.7) 
         
-        if self.target_ticker in self.holdings and 'buy_price' in self.holdings[self.target_ticker]:
-            buy_price = self.holdings[self.target_ticker]['buy_price']
+        position = self.positions.get(self.target_ticker)
+        if position is not None and position.state != POSITION_OPENING:
+            buy_price = position.buy_price
             if plot_df['low'].min() <= buy_price <= plot_df['high'].max():
                  self.ax.axhline(buy_price, color='#FFFF00', linestyle='--', linewidth=1, label=f'Buy @ {buy_price:,.0f}') 
         
@@ -288,6 +2349,169 @@ class AutoTradingGUI:
 
         self.fig.tight_layout()
         self.canvas.draw()
+    
+    def _render_lod_chart(self, df, ticker, interval):
+        """장기(LOD) 차트 - 실시간 캔들을 이력에 병합하고 화면 폭 기준으로 집계된 캔들만 갱신"""
+        history = self.chart_history
+        if history is None or history.ticker != ticker or history.interval != interval:
+            history = self.chart_history = ChartHistory(ticker, interval)
+            self._lod_artists = None
+        
+        added = history.append(df)
+        if len(history) == 0:
+            return
+        
+        if self._lod_artists is None:
+            self._setup_lod_axes(history)
+            self._request_lod_history(LOD_INITIAL_DAYS)
+        elif added and history.follow:
+            x0, x1 = self.ax.get_xlim()
+            right = history.x[-1] + INTERVAL_SECONDS.get(interval, 60) / 86400 * 2
+            self._lod_updating = True
+            try:
+                self.ax.set_xlim(right - (x1 - x0), right)
+            finally:
+                self._lod_updating = False
+        
+        self._update_lod_artists()
+    
+    def _setup_lod_axes(self, history):
+        """장기 차트용 축/아티스트 생성 (캔들 몸통·꼬리는 LineCollection 2개, 이평선은 Line2D 3개)"""
+        self.ax.clear()
+        
+        wicks = LineCollection([], linewidths=1, alpha=0.7)
+        bodies = LineCollection([], linewidths=3)
+        self.ax.add_collection(wicks)
+        self.ax.add_collection(bodies)
+        
+        ma50_line, = self.ax.plot([], [], label='50-MA', color='#00ff00', linestyle='-', linewidth=1.5, alpha=0.7)
+        ma200_line, = self.ax.plot([], [], label='200-MA', color='#0000ff', linestyle='-', linewidth=1.5, alpha=0.7)
+        vwma100_line, = self.ax.plot([], [], label='100-VWMA', color='#ffffff', linestyle='-', linewidth=1.5, alpha=0.7)
+        buy_line = self.ax.axhline(0, color='#FFFF00', linestyle='--', linewidth=1, visible=False)
+        
+        self._lod_artists = {'wicks': wicks, 'bodies': bodies, 'ma50': ma50_line, 'ma200': ma200_line,
+                             'vwma100': vwma100_line, 'buy': buy_line}
+        
+        right = history.x[-1] + INTERVAL_SECONDS.get(history.interval, 60) / 86400 * 2
+        left = history.x[max(0, len(history) - LOD_DEFAULT_CANDLES)]
+        self._lod_updating = True
+        try:
+            self.ax.set_xlim(left, right)
+        finally:
+            self._lod_updating = False
+        
+        locator = mdates.AutoDateLocator()
+        self.ax.xaxis.set_major_locator(locator)
+        self.ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        self.ax.yaxis.set_major_formatter(FuncFormatter(lambda x, pos: f'{x:,.0f}'))
+        
+        self.ax.set_title(f"{history.ticker} ({history.interval})", fontsize=12, color='white')
+        self.ax.set_xlabel("Time (KST)", fontsize=10, color='white')
+        self.ax.set_ylabel("KRW", fontsize=10, color='white')
+        self.ax.tick_params(axis='both', which='major', labelsize=8, colors='white')
+        self.ax.legend(loc='upper left', fontsize=8, framealpha=0.8, facecolor='#161b22', edgecolor='white', labelcolor='linecolor')
+        self.ax.grid(True, linestyle=':', alpha=0.3, color='#444444')
+        self.ax.set_facecolor('#161b22')
+        self.fig.set_facecolor('#0d1117')
+        self.fig.tight_layout()
+        
+        if self._lod_xlim_cid is not None:
+            self.ax.callbacks.disconnect(self._lod_xlim_cid)
+        self._lod_xlim_cid = self.ax.callbacks.connect('xlim_changed', self._on_lod_xlim_changed)
+    
+    def _update_lod_artists(self):
+        """현재 보이는 구간만 픽셀 열 단위로 집계하여 아티스트 데이터 교체 (비용은 이력 길이가 아닌 화면 폭에 비례)"""
+        history = self.chart_history
+        artists = self._lod_artists
+        if history is None or artists is None or len(history) == 0:
+            return
+        
+        x0, x1 = self.ax.get_xlim()
+        columns = max(1, int(self.ax.bbox.width))
+        arrays = history.arrays
+        buckets = decimate_ohlc(history.x, arrays['open'], arrays['high'], arrays['low'], arrays['close'], x0, x1, columns)
+        
+        x = buckets['x']
+        up = buckets['close'] >= buckets['open']
+        colors = np.where(up[:, None], np.array([[0.153, 0.631, 0.6, 1.0]]), np.array([[0.906, 0.298, 0.235, 1.0]]))
+        
+        artists['wicks'].set_segments(np.stack([np.column_stack([x, buckets['low']]), np.column_stack([x, buckets['high']])], axis=1))
+        artists['wicks'].set_color(colors)
+        artists['bodies'].set_segments(np.stack([np.column_stack([x, buckets['open']]), np.column_stack([x, buckets['close']])], axis=1))
+        artists['bodies'].set_color(colors)
+        
+        pixels_per_bucket = columns / max(1, len(x))
+        artists['bodies'].set_linewidth(float(np.clip(pixels_per_bucket * 0.7 * 72 / self.fig.dpi, 0.5, 8)))
+        
+        last = buckets['last']
+        artists['ma50'].set_data(x, history.ma50[last])
+        artists['ma200'].set_data(x, history.ma200[last])
+        artists['vwma100'].set_data(x, history.vwma100[last])
+        
+        if len(x):
+            low, high = float(np.nanmin(buckets['low'])), float(np.nanmax(buckets['high']))
+            margin = (high - low) * 0.05 or high * 0.01
+            self.ax.set_ylim(low - margin, high + margin)
+        
+        position = self.positions.get(history.ticker)
+        if position is not None and position.state != POSITION_OPENING and position.buy_price:
+            artists['buy'].set_ydata([position.buy_price, position.buy_price])
+            artists['buy'].set_visible(True)
+        else:
+            artists['buy'].set_visible(False)
+        
+        self.canvas.draw_idle()
+    
+    def _on_lod_xlim_changed(self, ax):
+        """이동/확대 시 재집계 예약 (연속 이벤트는 마지막 한 번만 처리)"""
+        if self._lod_updating or self._lod_artists is None:
+            return
+        if self._lod_redraw_job is not None:
+            self.master.after_cancel(self._lod_redraw_job)
+        self._lod_redraw_job = self.master.after(LOD_REDRAW_DELAY_MS, self._on_lod_view_settled)
+    
+    def _on_lod_view_settled(self):
+        """이동/확대가 멈춘 뒤 - 화면이 이력 시작보다 과거를 보이면 보관소에서 추가 로드 후 재집계"""
+        self._lod_redraw_job = None
+        history = self.chart_history
+        if history is None or self._lod_artists is None or len(history) == 0:
+            return
+        
+        x0, x1 = self.ax.get_xlim()
+        history.follow = x1 >= history.x[-1]
+        if x0 < history.x[0]:
+            self._request_lod_history(int(np.ceil(history.x[0] - x0)) + LOD_LOAD_MARGIN_DAYS)
+        
+        with self.metrics.timer('draw_chart_lod'):
+            self._update_lod_artists()
+    
+    def _request_lod_history(self, days):
+        """보관소에서 이력 이전 구간을 백그라운드로 읽고 Tk 스레드에서 병합"""
+        history = self.chart_history
+        if history is None or history.loading or history.exhausted or self.candle_archive is None:
+            return
+        history.loading = True
+        archive = self.candle_archive
+        
+        def load():
+            try:
+                with self.metrics.timer('chart_history_load'):
+                    older = history.load_before(archive, days)
+            except Exception as e:
+                print(f"차트 이력 로드 오류 ({history.ticker}): {e}")
+                older = None
+            self.master.after(0, lambda: self._on_lod_history_loaded(history, older))
+        
+        threading.Thread(target=load, daemon=True, name="ChartHistoryLoad").start()
+    
+    def _on_lod_history_loaded(self, history, older):
+        history.loading = False
+        if history is not self.chart_history:
+            return
+        if not history.merge(older):
+            history.exhausted = True
+            return
+        self._update_lod_artists()
         
     def _toggle_ticker_input(self):
         """종목 자동 선택 체크박스 상태에 따라 매매 희망 종목 입력 칸 활성화/비활성화"""
@@ -325,7 +2549,7 @@ class AutoTradingGUI:
             
             try:
                 
-                balance = self.upbit.get_balance("KRW") 
+                balance = self.metrics.call('get_balance', self.upbit.get_balance, "KRW") 
                 
                 if balance is not None:
                     display_text = f"현재 잔고: {balance:,.0f} KRW"
@@ -361,8 +2585,193 @@ class AutoTradingGUI:
         """실시간 로그를 Text 위젯에 추가"""
         self._log_no_source(message)
 
+    def _refresh_metrics_panel(self):
+        """성능 지표 패널 갱신 및 주기적으로 METRICS.json 저장 (Tk 스레드에서 주기 실행, 파일 쓰기는 백그라운드 스레드)"""
+        try:
+            snapshot = self.metrics.snapshot()
+            
+            for stage, stats in snapshot['stages'].items():
+                values = (stats['count'], f"{stats['p50_ms']:,.1f}", f"{stats['p95_ms']:,.1f}", 
+                          f"{stats['p99_ms']:,.1f}", f"{stats['max_ms']:,.1f}")
+                if self.metrics_tree.exists(stage):
+                    self.metrics_tree.item(stage, values=values)
+                else:
+                    self.metrics_tree.insert('', tk.END, iid=stage, text=stage, values=values)
+            
+            counters = snapshot['counters']
+            api_errors = sum(v for k, v in counters.items() if k.startswith('api_error.'))
+            api_throttles = sum(v for k, v in counters.items() if k.startswith('api_throttle.'))
+            self.metrics_counter_text.set(f"API 오류: {api_errors} / 요청 제한: {api_throttles}")
+            
+            self._metrics_refresh_count += 1
+            if self._metrics_refresh_count % METRICS_DUMP_EVERY == 0 and snapshot['stages']:
+                self._start_background_flush(self._write_metrics_file, snapshot, name="MetricsWriter")
+        except Exception as e:
+            print(f"성능 지표 갱신 오류: {e}")
+        
+        self.master.after(METRICS_REFRESH_MS, self._refresh_metrics_panel)
+
+    def _write_metrics_file(self, snapshot):
+        """패널 갱신에 쓴 지표 스냅샷을 METRICS.json 으로 저장 (백그라운드 스레드)"""
+        try:
+            self.metrics.dump(METRICS_FILE, snapshot)
+        except Exception as e:
+            print(f"성능 지표 저장 오류: {e}")
+
+    def _refresh_dashboard(self):
+        """종목 대시보드 갱신 (Tk 스레드에서 주기 실행)
+        
+        스파크라인은 SparklineBuffer 가 변경된 행만 래스터화한 이미지 한 장을 PhotoImage 로 교체하여 그리고,
+        텍스트는 값이 바뀐 항목만 itemconfig 하므로 종목 수가 늘어도 갱신 비용이 거의 일정합니다.
+        """
+        try:
+            with self.metrics.timer('dashboard'):
+                rows = self.sparklines.rows()
+                image = self.sparklines.render()
+                if image is not None and len(image):
+                    height, width = image.shape[:2]
+                    ppm = f"P6 {width} {height} 255 ".encode('ascii') + image.tobytes()
+                    self.dashboard_photo = tk.PhotoImage(width=width, height=height, data=ppm, format='PPM')
+                    self.dashboard_canvas.itemconfig(self.dashboard_spark_item, image=self.dashboard_photo)
+                elif not rows and self.dashboard_photo is not None:
+                    self.dashboard_photo = None
+                    self.dashboard_canvas.itemconfig(self.dashboard_spark_item, image='')
+                
+                for row, (ticker, price, status) in enumerate(rows):
+                    texts = (ticker, f"{price:,.0f}" if price else "-", status or "-", self._dashboard_profit_text(ticker, price))
+                    if row == len(self.dashboard_text_items):
+                        y = row * DASHBOARD_ROW_HEIGHT + DASHBOARD_ROW_HEIGHT // 2
+                        items = [self.dashboard_canvas.create_text(x, y, anchor=anchor, fill='white', font=("Malgun Gothic", 9))
+                                 for x, anchor in DASHBOARD_COLUMNS]
+                        self.dashboard_text_items.append([items, (None,) * len(items)])
+                    items, shown = self.dashboard_text_items[row]
+                    if texts != shown:
+                        for item, text, old in zip(items, texts, shown):
+                            if text != old:
+                                self.dashboard_canvas.itemconfig(item, text=text)
+                        self.dashboard_text_items[row][1] = texts
+                
+                while len(self.dashboard_text_items) > len(rows):
+                    items, _ = self.dashboard_text_items.pop()
+                    for item in items:
+                        self.dashboard_canvas.delete(item)
+                
+                selected = self.target_ticker
+                if selected in self.sparklines.tickers:
+                    top = self.sparklines.tickers.index(selected) * DASHBOARD_ROW_HEIGHT
+                    self.dashboard_canvas.coords(self.dashboard_highlight, 0, top, DASHBOARD_SPARK_X + SPARKLINE_POINTS + 8, top + DASHBOARD_ROW_HEIGHT)
+                else:
+                    self.dashboard_canvas.coords(self.dashboard_highlight, 0, 0, 0, 0)
+                self.dashboard_canvas.config(scrollregion=(0, 0, DASHBOARD_SPARK_X + SPARKLINE_POINTS + 8, len(rows) * DASHBOARD_ROW_HEIGHT))
+        except Exception as e:
+            print(f"종목 대시보드 갱신 오류: {e}")
+        
+        self.master.after(DASHBOARD_REFRESH_MS, self._refresh_dashboard)
+    
+    def _dashboard_profit_text(self, ticker, price):
+        """대시보드 수익률 열 - 포지션 상태와 매수가 대비 수익률"""
+        position = self.positions.get(ticker)
+        if position is None:
+            return "-"
+        if not position.buy_price or not price:
+            return position.state
+        return f"{position.state} {((price / position.buy_price) - 1) * 100:+.2f}%"
+    
+    def _on_dashboard_click(self, event):
+        """대시보드 행 클릭 - 해당 종목을 상세 차트 대상으로 선택"""
+        row = int(self.dashboard_canvas.canvasy(event.y) // DASHBOARD_ROW_HEIGHT)
+        tickers = self.sparklines.tickers
+        if not 0 <= row < len(tickers):
+            return
+        
+        ticker = tickers[row]
+        self.selected_ticker = ticker
+        self.target_ticker = ticker
+        self._log(f"[대시보드] 상세 차트 종목 선택: {ticker}")
+        
+        chart_args = self._chart_frames.get(ticker)
+        if chart_args is not None:
+            self._draw_chart(*chart_args)
+    
+    def _reset_metrics(self):
+        """성능 지표 초기화 버튼 핸들러"""
+        self.metrics.reset()
+        self.metrics_tree.delete(*self.metrics_tree.get_children())
+        self._log("성능 지표가 초기화되었습니다.")
+
+    def _toggle_profiler(self):
+        """프로파일링 시작/중지 버튼 핸들러"""
+        if self.profiler is not None and self.profiler.running:
+            self._stop_profiler()
+            return
+        
+        try:
+            duration = float(self.profiler_duration_var.get())
+            if duration <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("입력 오류", "프로파일링 시간은 0보다 큰 숫자(초)로 입력해야 합니다.")
+            return
+        self._start_profiler(duration)
+
+    def _start_profiler(self, duration=None):
+        """샘플링 프로파일러 시작 (duration=None 이면 _stop_profiler 호출 시까지)"""
+        if self.profiler is not None and self.profiler.running:
+            return False
+        self.profiler = SamplingProfiler()
+        self.profile_path = None
+        self.profiler.start(duration, on_finish=self._finish_profiler)
+        self._log(f"프로파일링 시작 (샘플링 간격 {PROFILER_INTERVAL * 1000:.0f}ms"
+                  + (f", {duration:g}초 후 자동 종료)" if duration else ")"))
+        self._update_profiler_button()
+        return True
+
+    def _stop_profiler(self, wait=False):
+        """프로파일링 중지 요청 - wait=True 이면 결과 파일 저장까지 기다린 뒤 경로 반환 (헤드리스용)"""
+        if self.profiler is None:
+            return None
+        self.profiler.stop(wait=wait)
+        return self.profile_path if wait else None
+
+    def _finish_profiler(self, profiler):
+        """프로파일러 종료 시 collapsed-stack 파일 저장 (프로파일러 스레드)"""
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        try:
+            self.profile_path = profiler.dump(os.path.join(LOG_DIR, f"PROFILE_{timestamp}.collapsed"))
+            self._log(f"프로파일링 결과 저장: {self.profile_path} "
+                      f"({profiler.elapsed:.1f}초, 샘플 {profiler.sample_count:,}회, 스택 {len(profiler.samples):,}종)")
+        except Exception as e:
+            self._log(f"프로파일링 결과 저장 중 오류 발생: {e}")
+        self.master.after(0, self._update_profiler_button)
+
+    def _update_profiler_button(self):
+        if not hasattr(self, 'profiler_button'):
+            return
+        running = self.profiler is not None and self.profiler.running
+        self.profiler_button.config(text="프로파일링 중지" if running else "프로파일링 시작")
+
     def _save_log_to_file(self, prefix="TRADING_"): 
-        """현재까지의 로그 내용을 파일로 저장 (엑셀 형식)"""
+        """현재까지의 로그 내용을 파일로 저장 (엑셀 형식)
+        
+        로그 위젯 내용만 Tk 스레드에서 읽고, 엑셀 쓰기는 백그라운드 스레드에서 실행합니다.
+        """
+        try:
+            log_content = self.log_text.get("1.0", tk.END).strip().split('\n')
+        except Exception as e:
+            self._log(f"로그 파일 저장 중 오류 발생 (로그 읽기): {e}")
+            return None
+        return self._start_background_flush(self._write_log_file, log_content, prefix, name="LogWriter")
+
+    def _start_background_flush(self, target, *args, name="Flush"):
+        """파일 저장 작업을 백그라운드 스레드로 실행 (창 닫기 시 완료를 기다릴 수 있도록 추적)"""
+        self._flush_threads = [thread for thread in self._flush_threads if thread.is_alive()]
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        self._flush_threads.append(thread)
+        thread.start()
+        return thread
+
+    def _write_log_file(self, log_content, prefix):
+        """로그 줄 목록을 엑셀 파일로 저장 (백그라운드 스레드)"""
         try:
             if not os.path.exists(LOG_DIR):
                 os.makedirs(LOG_DIR)
@@ -370,8 +2779,6 @@ class AutoTradingGUI:
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = os.path.join(LOG_DIR, f"{prefix}LOG_{timestamp}.xlsx")
             
-            log_content = self.log_text.get("1.0", tk.END).strip().split('\n')
-            
             data = []
             for line in log_content:
                 if line.startswith('['):
@@ -438,7 +2845,15 @@ class AutoTradingGUI:
         self._start_trading()
 
     def _start_trading(self):
-        """실제 트레이딩 로직 시작"""
+        """실제 트레이딩 로직 시작
+        
+        이전 세션의 트레이딩 스레드가 아직 살아 있으면 시작하지 않습니다 (새 세션의 stop_event/포지션/스케줄러를 공유하게 되므로).
+        """
+        
+        if self._trading_thread_alive():
+            messagebox.showwarning("트레이딩 종료 대기", "이전 트레이딩 스레드가 아직 종료되지 않았습니다. 종료 후 다시 시작해 주세요.")
+            self._log("이전 트레이딩 스레드 종료 대기 중 - 시작 요청 무시")
+            return
         
         try:
             load_time = int(self.data_load_time_var.get())
@@ -452,6 +2867,7 @@ class AutoTradingGUI:
             return
 
         self.trading_active = True
+        self.stop_event = threading.Event()
         
         mode = self.mode_var.get()
         if mode == 'DEVELOPMENT':
@@ -461,31 +2877,40 @@ class AutoTradingGUI:
 
         self.start_button.config(state='disabled')
         self.stop_button.config(state='normal')
+        self.apply_button.config(state='normal')
         self.immediate_buy_button.config(state='normal')
         self.immediate_sell_button.config(state='normal')
         
-        self.holdings = {}
-        self.buy_candle_time = {}
+        self.positions = PositionStore()
+        self.paper_ledger = PaperLedger()
+        self.sparklines = SparklineBuffer()
+        self.selected_ticker = None
+        self._chart_frames = {}
+        self.candle_buffers = {}
+        self._warming = set()
 
         strategy = self.strategy_var.get()
-        timeframe_label = self.ma_timeframe_var.get()
-        timeframe_map = {'1분': 'minute1', '3분': 'minute3', '5분': 'minute5', '10분': 'minute10', '15분': 'minute15', 
-                         '30분': 'minute30', '1시간': 'hour1', '4시간': 'hour4', '1일': 'day', '1주': 'week'}
-        
-        if strategy == '5분봉_50선_트레이딩':
-            timeframe = 'minute5'
-            timeframe_label = '5분'
-        else:
-            timeframe = timeframe_map.get(timeframe_label, 'minute1')
+        timeframe, timeframe_label = self._selected_timeframe(strategy)
 
         tickers = [t.strip() for t in self.ticker_input_var.get().upper().split(',') if t.strip()]
         auto_select = self.auto_select_var.get()
+        engine = self.engine_var.get()
+        align = self.align_candle_var.get()
+        self._pending_config = None
+        self._trading_config = {'mode': mode, 'engine': engine, 'load_time': load_time, 'strategy': strategy, 'timeframe': timeframe,
+                                'timeframe_label': timeframe_label, 'tickers': tickers, 'auto_select': auto_select, 'trade_ratio': trade_ratio,
+                                'align': align}
+        self.trade_ratio = trade_ratio
         
         self._log("--- 트레이딩 시작 설정 ---")
         self._log(f"모드: {mode}")
         self._log(f"전략: {strategy} (시간봉: {timeframe_label})") 
         self._log(f"트레이딩 금액: {trade_ratio}%") 
-        self._log(f"데이터 로딩 시간: {load_time}초")
+        self._log(f"실행 엔진: {engine}" + (f" (샤드 {self.shard_workers}개)" if engine == ENGINE_PROCESS else ""))
+        if align:
+             self._log(f"실행 주기: {timeframe_label} 캔들 마감 시점 (+ 최대 {self.cycle_jitter_seconds}초 지터), 보유 중에는 최대 {load_time}초")
+        else:
+             self._log(f"데이터 로딩 시간: {load_time}초")
         self._log(f"종목 자동 선택: {auto_select}")
         if auto_select and mode != 'DEVELOPMENT':
              self._log(f"  ㄴ 최소 거래 대금: {self.min_trade_volume:,.0f} 원")
@@ -493,20 +2918,124 @@ class AutoTradingGUI:
         else:
              self._log(f"매매 희망 종목: {tickers}")
         self._log(f"로그 저장 주기: {log_save_time_hours} 시간")
+        if mode != 'TRADING':
+             self._log(f"가상 매매 장부: 초기 자금 {PAPER_INITIAL_CASH:,.0f} 원, 수수료 {PAPER_FEE_RATE*100:.3f}%")
         self._log("--------------------------")
 
-        self.trading_thread = threading.Thread(target=self._run_trading_loop, 
-                                               args=(load_time, strategy, timeframe, tickers, auto_select, mode))
+        self.scheduler = TradingScheduler(self.clock).start()
+        
+        self.trading_thread = threading.Thread(target=self._run_trading_loop, name="TradingLoop",
+                                               args=(load_time, strategy, timeframe, tickers, auto_select, mode, engine, align))
         self.trading_thread.daemon = True 
         self.trading_thread.start()
         
-        self.log_save_thread = threading.Thread(target=self._run_log_save_loop, 
-                                                args=(log_save_time_hours,))
-        self.log_save_thread.daemon = True
-        self.log_save_thread.start()
+        self._schedule_log_save(log_save_time_hours)
         
+    def _selected_timeframe(self, strategy):
+        """전략/시간봉 선택값으로 (pyupbit 시간봉, 표시 이름) 반환 (5분봉 50선 전략은 5분봉 고정)"""
+        if strategy == '5분봉_50선_트레이딩':
+            return 'minute5', '5분'
+        timeframe_label = self.ma_timeframe_var.get()
+        return TIMEFRAMES.get(timeframe_label, 'minute1'), timeframe_label
+
+    def _apply_settings(self):
+        """설정 적용 버튼 - 트레이딩을 멈추지 않고 전략/시간봉/종목/자동 선택/트레이딩 금액/로딩 시간/캔들 마감 실행 변경을 반영
+        
+        포지션과 캔들 버퍼는 유지되며 (시간봉이 바뀐 경우에만 새로 조회), 대기 중인 사이클을 깨워 바로 새 설정으로 실행합니다.
+        새 종목은 백그라운드에서 캔들을 미리 받은 뒤 매매 대상에 합류하고, 빠진 종목 중 보유 포지션이 있는 종목은
+        매도로 정리될 때까지 계속 관리됩니다. 모드/실행 엔진 변경은 재시작해야 반영됩니다.
+        """
+        current = self._trading_config
+        if not self.trading_active or current is None:
+            return
+        
+        try:
+            load_time = int(self.data_load_time_var.get())
+            trade_ratio = int(self.trade_ratio_var.get())
+            if load_time <= 0 or not (0 <= trade_ratio <= 100):
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("입력 오류", "설정값(로딩 시간, 트레이딩 금액)을 확인해 주세요.")
+            return
+        
+        strategy = self.strategy_var.get()
+        timeframe, timeframe_label = self._selected_timeframe(strategy)
+        config = dict(current, load_time=load_time, strategy=strategy, timeframe=timeframe, timeframe_label=timeframe_label,
+                      tickers=[t.strip() for t in self.ticker_input_var.get().upper().split(',') if t.strip()],
+                      auto_select=self.auto_select_var.get(), trade_ratio=trade_ratio, align=self.align_candle_var.get())
+        
+        labels = (('strategy', "전략"), ('timeframe_label', "시간봉"), ('tickers', "매매 희망 종목"), ('auto_select', "종목 자동 선택"),
+                  ('trade_ratio', "트레이딩 금액 (%)"), ('load_time', "데이터 로딩 시간 (초)"), ('align', "캔들 마감 시점에 실행"))
+        changes = [f"{label}: {current[key]} → {config[key]}" for key, label in labels if current[key] != config[key]]
+        if self.mode_var.get() != current['mode'] or self.engine_var.get() != current['engine']:
+            self._log(f"모드/실행 엔진 변경은 트레이딩을 재시작해야 반영됩니다 (현재: {current['mode']} / {current['engine']}).")
+        if not changes:
+            self._log("설정 적용: 변경된 설정이 없습니다.")
+            return
+        
+        self._log("--- 설정 적용 (재시작 없음) ---")
+        for change in changes:
+            self._log(change)
+        
+        added = [ticker for ticker in config['tickers'] if ticker not in current['tickers']]
+        if (added and not config['auto_select'] and current['engine'] == ENGINE_THREAD
+                and config['timeframe'] == current['timeframe']):
+            self._start_warm_up(added, config['timeframe'])
+        draining = [ticker for ticker in current['tickers'] if ticker not in config['tickers'] and ticker in self.positions]
+        if draining and not config['auto_select']:
+            self._log(f"보유 포지션 매도 후 제외: {', '.join(draining)}")
+        
+        with self._config_lock:
+            self._trading_config = config
+            self._pending_config = config
+        timer = self._cycle_timer
+        if timer is not None:
+            timer.cancel()
+
+    def _take_pending_config(self):
+        with self._config_lock:
+            config, self._pending_config = self._pending_config, None
+        return config
+
+    def _start_warm_up(self, tickers, interval):
+        """추가된 종목의 캔들을 백그라운드에서 미리 조회 - 끝날 때까지 해당 종목은 매매 대상에서 제외
+        
+        종료 신호/캔들 버퍼/워밍업 목록은 시작 시점 세션의 것을 사용하며 (종료 후 재시작된 세션에 섞이지 않음),
+        그 사이 시간봉이 바뀌었으면 조회 결과를 버리고 남은 종목 워밍업도 중단합니다.
+        """
+        stop_event, buffers, warming = self.stop_event, self.candle_buffers, self._warming
+        warming.update(tickers)
+        self._log(f"종목 워밍업 시작: {', '.join(tickers)}")
+        
+        def warm_up():
+            try:
+                for ticker in tickers:
+                    if stop_event.is_set():
+                        break
+                    candles = CandleBuffer()
+                    try:
+                        if not refresh_candles(candles, ticker, interval, self.clock.time(), self.metrics, self.candle_archive, stop_event):
+                            break
+                        with self._config_lock:
+                            # 설정 적용(_trading_config 교체)과 같은 잠금 안에서 확인 - 이후 시간봉 변경은 루프의 _reload_timeframe 이 정리
+                            current = not stop_event.is_set() and self._trading_config['timeframe'] == interval
+                            if current:
+                                buffers[(ticker, interval)] = candles
+                        if not current:
+                            self._log(f"종목 워밍업 중단: 시간봉이 변경되었거나 트레이딩이 종료되었습니다 ({ticker} 결과 폐기).")
+                            break
+                        self._log(f"종목 워밍업 완료: {ticker} (캔들 {len(candles)}개)")
+                    except Exception as e:
+                        self._log(f"종목 워밍업 실패 ({ticker}), 다음 사이클에서 조회합니다: {type(e).__name__} - {e}")
+                    finally:
+                        warming.discard(ticker)
+            finally:
+                warming.difference_update(tickers)
+        
+        threading.Thread(target=warm_up, name="WarmUp", daemon=True).start()
+
     def _immediate_buy(self):
-        """매수 조건과 관계없이 시장가로 즉시 매수 실행"""
+        """매수 조건과 관계없이 시장가로 즉시 매수 실행 (실행 중인 세션의 모드 기준, 모드 선택값 변경은 재시작해야 반영)"""
         if not self.trading_active:
             self._log("즉시 매수 실패: 트레이딩이 활성화되지 않았습니다.")
             return
@@ -518,10 +3047,13 @@ class AutoTradingGUI:
              else:
                  self._log(f"즉시 매수 실패: {ticker}는 매매 희망 종목 목록에 없습니다.")
              return
+        
+        config = self._trading_config
+        mode, strategy = config['mode'], config['strategy']
 
         def execute_manual_buy():
             try:
-                current_price = pyupbit.get_current_price(ticker)
+                current_price = self.metrics.call('get_current_price', pyupbit.get_current_price, ticker)
                 if current_price is None:
                     self._log(f"즉시 매수 실패: {ticker} 현재 가격을 조회할 수 없습니다.")
                     return
@@ -530,26 +3062,21 @@ class AutoTradingGUI:
                 return
 
             self._log(f"--- [즉시 매수] 요청 시작: {ticker} @ {current_price:,.0f} 원 ---")
-            
-            mode = self.mode_var.get()
 
             if mode == 'TRADING':
-                self._execute_buy(ticker, current_price)
-                if ticker in self.holdings:
-                    self.holdings[ticker]['manual_buy'] = True
+                if self._execute_buy(ticker, current_price, manual_buy=True):
                     self._log(f"[즉시 매수] 완료. 이제 전략의 매도 조건에 따라 매도가 진행됩니다.")
             elif mode == 'SIMULATION' or mode == 'DEVELOPMENT':
-                if ticker not in self.holdings:
-                    self.holdings[ticker] = {'buy_price': current_price, 'buy_volume': 0.0, 'half_sold': False, 'manual_buy': True}
+                if ticker in self.positions:
+                    self._log(f"즉시 매수 실패: {ticker}를 이미 보유 중입니다. 현재 전략: {strategy}")
+                elif self._paper_buy(ticker, current_price, manual_buy=True):
                     self._log(f"[즉시 매수] (가상) 완료. 이제 전략의 매도 조건에 따라 매도가 진행됩니다.")
-                else:
-                    self._log(f"즉시 매수 실패: {ticker}를 이미 보유 중입니다. 현재 전략: {self.strategy_var.get()}")
 
         threading.Thread(target=execute_manual_buy, daemon=True).start()
 
 
     def _immediate_sell(self):
-        """보유 중인 코인을 매수 조건과 관계없이 전량 매도 실행"""
+        """보유 중인 코인을 매수 조건과 관계없이 전량 매도 실행 (실행 중인 세션의 모드 기준)"""
         if not self.trading_active:
             self._log("즉시 매도 실패: 트레이딩이 활성화되지 않았습니다.")
             return
@@ -559,49 +3086,145 @@ class AutoTradingGUI:
             self._log("즉시 매도 실패: 대상 종목이 선택되지 않았습니다. 매매 희망 종목을 확인하세요.")
             return
 
-        if ticker not in self.holdings:
+        if ticker not in self.positions:
             self._log(f"즉시 매도 실패: {ticker}를 보유하고 있지 않습니다.")
             return
+        
+        mode = self._trading_config['mode']
 
         def execute_manual_sell():
             self._log(f"--- [즉시 매도] 요청 시작: {ticker} 전량 매도 ---")
             
-            mode = self.mode_var.get()
-            
             if mode == 'TRADING':
                 self._execute_sell(ticker, is_half_sell=False)
             elif mode == 'SIMULATION' or mode == 'DEVELOPMENT':
-                if ticker in self.holdings:
-                    if ticker in self.buy_candle_time:
-                        del self.buy_candle_time[ticker]
-                    del self.holdings[ticker]
+                closed = self.positions.close(ticker)
+                if closed is not None:
+                    try:
+                        current_price = self.metrics.call('get_current_price', pyupbit.get_current_price, ticker)
+                    except Exception:
+                        current_price = None
+                    if current_price is None:
+                        position = self.paper_ledger.position(ticker)
+                        current_price = position['last_price'] if position is not None else closed.buy_price
+                    self._paper_sell(ticker, current_price, 1.0)
                     self._log(f"[즉시 매도] (가상) 완료. 보유 기록이 삭제되었습니다.")
                 else:
                     self._log(f"즉시 매도 실패: {ticker} 보유 기록이 이미 삭제되었거나 찾을 수 없습니다.")
 
         threading.Thread(target=execute_manual_sell, daemon=True).start()
 
-    def _run_log_save_loop(self, save_interval_hours):
-        """설정된 시간마다 로그를 파일로 저장하는 루프"""
+    def _schedule_log_save(self, save_interval_hours):
+        """설정된 시간마다 로그를 파일로 저장하도록 스케줄러에 타이머 등록"""
         
         save_interval_seconds = save_interval_hours * 3600
-        self._log(f"로그 자동 저장 루프 시작. 주기: {save_interval_hours} 시간 ({save_interval_seconds}초)")
+        self._log(f"로그 자동 저장 예약. 주기: {save_interval_hours} 시간 ({save_interval_seconds}초)")
         
-        while self.trading_active:
+        def on_log_save_due():
+            if not self.trading_active:
+                return
+            self.master.after(0, lambda: self._save_log_to_file("AUTO_SAVE")) 
+            self._log_save_timer = self.scheduler.call_later(save_interval_seconds, on_log_save_due, name="log_save")
+        
+        self._log_save_timer = self.scheduler.call_later(save_interval_seconds, on_log_save_due, name="log_save")
+
+    def _start_market_scan(self, universe, interval, load_time):
+        """종목 자동 선택 스캔을 전용 스레드(MarketScan)에서 시작 (실행 중인 스캔은 중지)
+        
+        전체 마켓 조회는 요청 간격 때문에 수십 초가 걸리므로 트레이딩 스레드는 기다리지 않고
+        마지막으로 끝난 스캔 결과(_last_scan_candidates)만 사용합니다.
+        """
+        self._stop_market_scan()
+        scan_stop = self._market_scan_stop = threading.Event()
+        scanner = self.market_scanner = MarketScanner()
+        self._last_scan_candidates = None
+        threading.Thread(target=self._run_market_scan, args=(scanner, universe, interval, load_time, scan_stop),
+                         name="MarketScan", daemon=True).start()
+
+    def _stop_market_scan(self):
+        if self._market_scan_stop is not None:
+            self._market_scan_stop.set()
+            self._market_scan_stop = None
+
+    def _run_market_scan(self, scanner, universe, interval, load_time, scan_stop):
+        """(스캔 스레드) 전체 마켓 스캔 반복 - 한 바퀴가 끝나면 load_time 초 후 다시 스캔"""
+        while not scan_stop.is_set():
             try:
-                for _ in range(save_interval_seconds):
-                    if not self.trading_active:
-                        break
-                    time.sleep(1)
-                
-                if self.trading_active:
-                    self.master.after(0, lambda: self._save_log_to_file("AUTO_SAVE")) 
-            
+                self._refresh_market_scan(scanner, universe, interval, scan_stop)
             except Exception as e:
-                self._log(f"로그 자동 저장 중 치명적인 오류 발생: {e}")
-                time.sleep(60) 
-
-        self._log("로그 자동 저장 루프 종료.")
+                self.metrics.increment('scan_error')
+                self._log(f"[종목 자동 선택] 스캔 오류: {type(e).__name__} - {e}")
+            scan_stop.wait(load_time)
+
+    def _market_scan_tickers(self):
+        """보유 종목(매도 관리를 위해 항상 앞쪽) + 마지막 스캔의 매수 조건 충족 종목"""
+        held = self.positions.tickers()
+        return held + [ticker for ticker in (self._last_scan_candidates or []) if ticker not in held]
+
+    def _refresh_market_scan(self, scanner, universe, interval, scan_stop):
+        """종목 자동 선택: 대상 마켓 캔들을 스캐너 블록에 갱신(증분 조회)하고 매수 조건 충족 종목을 순위대로 _last_scan_candidates 에 반영
+        
+        scan_stop 이 설정되면 (트레이딩 종료, 설정 변경) 중간 결과는 버립니다.
+        """
+        if not universe:
+            universe = self.metrics.call('get_tickers', pyupbit.get_tickers, fiat="KRW") or []
+        
+        failed = 0
+        with self.metrics.timer('scan_fetch'):
+            for ticker in universe:
+                if scan_stop.is_set():
+                    return
+                
+                last_epoch = scanner.last_candle_time(ticker)
+                if last_epoch is None:
+                    count = SCANNER_WINDOW
+                else:
+                    count = min(SCANNER_WINDOW, int((self.clock.time() - last_epoch) // INTERVAL_SECONDS.get(interval, 60)) + 2)
+                
+                try:
+                    df = self.metrics.call('get_ohlcv', pyupbit.get_ohlcv, ticker, interval=interval, count=count)
+                    scanner.update(ticker, df)
+                except Exception:
+                    df = None
+                if df is None:
+                    failed += 1
+                    self.metrics.increment('scan_error')
+                if scan_stop.wait(SCANNER_REQUEST_INTERVAL):
+                    return
+        
+        if failed:
+            self._log(f"[종목 자동 선택] 캔들 조회 실패 {failed}개 / {len(universe)}개 마켓 (이전 캔들로 스캔)")
+        
+        with self.metrics.timer('scan'):
+            results = scanner.scan(self.min_trade_volume)
+        
+        candidates = [result['ticker'] for result in results[:SCANNER_MAX_CANDIDATES]]
+        if candidates != self._last_scan_candidates:
+            self._last_scan_candidates = candidates
+            if candidates:
+                self._log(f"[종목 자동 선택] 매수 조건 충족 {len(results)}개 / {len(scanner.tickers)}개 마켓: {', '.join(candidates)}")
+            else:
+                self._log(f"[종목 자동 선택] 매수 조건을 충족하는 마켓이 없습니다 ({len(scanner.tickers)}개 마켓 스캔).")
+
+    def _wait_next_cycle(self, interval, load_time, align=False):
+        """다음 사이클까지 대기 - 캔들 마감 정렬(align) 시 다음 마감 + 지터, 아니면 load_time 초 후. 종료 요청 시 즉시 반환
+        
+        캔들 마감 정렬 중에도 보유 포지션이 있으면 손절/매도 판단이 캔들 하나(1일봉이면 하루)씩 밀리지 않도록
+        load_time 초를 넘겨 기다리지 않습니다.
+        """
+        now = self.clock.time()
+        if align:
+            when = next_candle_close(interval, now) + self._jitter_random.uniform(0, self.cycle_jitter_seconds)
+            if len(self.positions):
+                when = min(when, now + load_time)
+        else:
+            when = now + load_time
+        
+        timer = self._cycle_timer = self.scheduler.call_at(when, name="trading_cycle")
+        if self._pending_config is not None:
+            # 사이클 실행 중에 적용된 설정은 대기 없이 바로 반영
+            timer.cancel()
+        return self.scheduler.wait(timer)
 
     def _calculate_moving_average(self, df, window):
         """이동평균(Moving Average) 계산 - 전체 캔들 기간에 대한 Series 반환"""
@@ -613,20 +3236,25 @@ class AutoTradingGUI:
         v_sum = df['volume'].rolling(window=window, min_periods=window).sum()
         return pv_sum / v_sum
 
-    def _execute_buy(self, ticker, current_price):
-        """TRADING 모드에서 실제 시장가 매수 주문 실행"""
+    def _execute_buy(self, ticker, current_price, buy_candle_time=None, manual_buy=False):
+        """TRADING 모드에서 실제 시장가 매수 주문 실행 - 주문 성공 시에만 포지션 등록 (성공 여부 반환)"""
         if not self.upbit:
             self._log("매수 실패: Upbit 객체 초기화 실패. API 키를 확인해 주세요.")
-            return
+            return False
+        
+        if not self.positions.reserve(ticker):
+            self._log(f"매수 생략: {ticker} 포지션이 이미 존재하거나 다른 주문이 진행 중입니다.")
+            return False
 
+        opened = False
         try:
-            trade_ratio = int(self.trade_ratio_var.get()) / 100.0
+            trade_ratio = self.trade_ratio / 100.0
             
             
-            krw_balance = self.upbit.get_balance("KRW") 
+            krw_balance = self.metrics.call('get_balance', self.upbit.get_balance, "KRW") 
             if krw_balance is None:
                 self._log("매수 실패: KRW 잔고 조회 실패.")
-                return
+                return False
             
             
             order_amount = krw_balance * trade_ratio
@@ -636,7 +3264,7 @@ class AutoTradingGUI:
                 self._log(f"매수 신호({ticker}). 시장가 매수 주문 시도 (금액: {order_amount:,.0f} KRW, 비율: {trade_ratio*100:.0f}%)")
                 
                 
-                result = self.upbit.buy_market_order(ticker, order_amount)
+                result = self.metrics.call('buy_market_order', self.upbit.buy_market_order, ticker, order_amount)
                 
                 if result is None or 'error' in result:
                     err_msg = result.get('error', {}).get('message', '알 수 없는 오류') if result else '응답 없음'
@@ -644,23 +3272,39 @@ class AutoTradingGUI:
                 else:
                     self._log(f"매수 주문 성공 (UUID: {result.get('uuid', 'N/A')}).")
                     
-                    self.holdings[ticker] = {'buy_price': current_price, 'buy_volume': 0.0, 'half_sold': False}
+                    opened = self.positions.confirm_open(ticker, current_price, 0.0, buy_candle_time, manual_buy)
                     
             else:
                 self._log(f"매수 금액 ({order_amount:,.0f} KRW)이 최소 주문 금액({MIN_ORDER_KRW:,.0f} KRW) 미만입니다. 주문 생략.")
                 
         except Exception as e:
             self._log(f"매수 주문 중 예외 발생: {type(e).__name__} - {e}")
+        finally:
+            if not opened:
+                self.positions.release(ticker)
+        return opened
 
     def _execute_sell(self, ticker, is_half_sell=False):
-        """TRADING 모드에서 실제 시장가 매도 주문 실행 (전량 또는 절반)"""
+        """TRADING 모드에서 실제 시장가 매도 주문 실행 (전량 또는 절반)
+        
+        절반 매도의 상태 전이(half_sold)는 호출 측에서 mark_half_sold 로 먼저 선점하고,
+        전량 매도는 closing 상태로 선점한 뒤 주문 성공 시 포지션 삭제 / 실패 시 이전 상태로 복구합니다.
+        """
         if not self.upbit:
             self._log("매도 실패: Upbit 객체 초기화 실패. API 키를 확인해 주세요.")
             return
-            
+        
+        previous = None
+        if not is_half_sell:
+            previous = self.positions.begin_close(ticker)
+            if previous is None:
+                self._log(f"매도 생략: {ticker} 포지션이 없거나 다른 매도 주문이 진행 중입니다.")
+                return
+
+        sold = False
         try:
             coin_symbol = ticker.split('-')[1]
-            holdings = self.upbit.get_balances() 
+            holdings = self.metrics.call('get_balances', self.upbit.get_balances) 
             target_coin_balance = [bal for bal in holdings if bal['currency'] == coin_symbol]
             
             if target_coin_balance:
@@ -673,23 +3317,14 @@ class AutoTradingGUI:
                     self._log(f"매도 신호({ticker}). 시장가 매도 주문 시도 (수량: {volume_to_sell}, {'절반' if is_half_sell else '전량'})")
                     
                     
-                    sell_result = self.upbit.sell_market_order(ticker, volume_to_sell)
+                    sell_result = self.metrics.call('sell_market_order', self.upbit.sell_market_order, ticker, volume_to_sell)
                     
                     if sell_result is None or 'error' in sell_result:
                         err_msg = sell_result.get('error', {}).get('message', '알 수 없는 오류') if sell_result else '응답 없음'
                         self._log(f"매도 실패: {err_msg}")
                     else:
                         self._log(f"매도 주문 성공 (UUID: {sell_result.get('uuid', 'N/A')}).")
-                        
-                        if is_half_sell:
-                            if ticker in self.holdings:
-                                self.holdings[ticker]['half_sold'] = True
-                        else:
-                            
-                            if ticker in self.holdings:
-                                if ticker in self.buy_candle_time:
-                                    del self.buy_candle_time[ticker]
-                                del self.holdings[ticker]
+                        sold = True
                 else:
                     self._log(f"매도 실패: 매도할 수량({coin_symbol})이 0입니다.")
             else:
@@ -697,99 +3332,130 @@ class AutoTradingGUI:
                 
         except Exception as e:
             self._log(f"매도 주문 중 예외 발생: {type(e).__name__} - {e}")
+        finally:
+            if not is_half_sell:
+                self.positions.finish_close(ticker, sold, previous)
 
-    def _strategy_5min_ma50(self, ticker, df, mode):
-        """5분봉 50선 트레이딩 전략 로직"""
+    def _paper_buy(self, ticker, current_price, buy_candle_time=None, manual_buy=False):
+        """SIMULATION/DEVELOPMENT 가상 매수 - 장부 잔고의 트레이딩 금액(%)만큼 체결하고 포지션 등록 (성공 여부 반환)
         
-        raw_action = "Wait"
-        current_price = df.iloc[-1]['close']
-        current_candle_time = df.index[-1]
+        체결 수량이 0이면 (잔고 또는 비율 0) 매수 실패로 보고 선점한 포지션을 해제합니다.
+        """
+        if not self.positions.reserve(ticker):
+            return False
         
-        if len(df) < 200:
-            return "Wait", current_price
+        opened = False
+        try:
+            trade_ratio = self.trade_ratio / 100.0
+            quantity = self.paper_ledger.buy(ticker, current_price, self.paper_ledger.cash * trade_ratio, epoch=self.clock.time())
             
-        if len(df) < 2 or df['MA50'].iloc[-1] is np.nan or df['MA200'].iloc[-1] is np.nan or df['VWMA100'].iloc[-1] is np.nan:
-            return "Wait", current_price
+            if quantity > 0:
+                self._log(f"[가상 체결] 매수 {ticker} {quantity:.8f} @ {current_price:,.0f} 원 (잔고: {self.paper_ledger.cash:,.0f} 원)")
+                opened = self.positions.confirm_open(ticker, current_price, quantity, buy_candle_time, manual_buy)
+            else:
+                self._log(f"[가상 체결] 매수 생략: 가상 잔고({self.paper_ledger.cash:,.0f} 원) 또는 트레이딩 금액 비율이 0입니다.")
+        finally:
+            if not opened:
+                self.positions.release(ticker)
+        return opened
+
+    def _paper_sell(self, ticker, current_price, fraction):
+        """SIMULATION/DEVELOPMENT 가상 매도 - 보유 수량의 fraction 만큼 체결하고 실현 손익 반환"""
+        realized_pnl = self.paper_ledger.sell(ticker, current_price, fraction, epoch=self.clock.time())
+        summary = self.paper_ledger.summary()
+        self._log(f"[가상 체결] 매도 {ticker} {fraction*100:.0f}% @ {current_price:,.0f} 원, 실현 손익: {realized_pnl:+,.0f} 원 "
+                  f"(누적 실현: {summary['realized_pnl']:+,.0f} 원, 평가금액: {summary['equity']:,.0f} 원)")
+        return realized_pnl
+
+    def _log_decision(self, ticker, reason, message, *detail):
+        """전략 판단 로그 - 사유(와 detail 조건)가 직전 틱과 달라졌을 때만 출력하고 반복은 횟수만 집계"""
+        self.decision_log.set_reason(ticker, reason)
+        line = self.decision_log.observe(ticker, 'strategy', (reason,) + detail, message)
+        if line is None:
+            self.metrics.increment('log_suppressed')
+        else:
+            self._log(line)
 
+    def _strategy_5min_ma50(self, ticker, candles, mode):
+        """5분봉 50선 트레이딩 전략 로직 (candles: CandleBuffer, 판단 조건은 compute_signal_flags 비트 플래그)"""
         
-        current_candle = df.iloc[-1]
-        prev_candle = df.iloc[-2]
-        
-        
-        ma50_current = current_candle['MA50']
-        ma200_current = current_candle['MA200']
-        vwma100_current = current_candle['VWMA100']
+        raw_action = "Wait"
+        current_price = candles.last_close
+        current_candle_time = candles.last_epoch
         
-        prev_ma50 = prev_candle['MA50']
-        prev_ma200 = prev_candle['MA200']
-        prev_vwma100 = prev_candle['VWMA100']
+        if len(candles) < 200:
+            return "Wait", current_price
+
+        _, ma200_current, _, flags = candles.latest()
         
         
-        is_ma50_below_10_candles = (df['close'].tail(10) < df['MA50'].tail(10)).all()
+        is_ma50_below_10_candles = bool(flags & SIGNAL_BELOW_MA50_10)
 
+        position = self.positions.get(ticker)
         
-        if ticker not in self.holdings:
+        if position is None:
             
-            ma_trend_ok = (df['MA200'].tail(12) > df['VWMA100'].tail(12)).all() and \
-                          (df['VWMA100'].tail(12) > df['MA50'].tail(12)).all()
+            ma_trend_ok = bool(flags & SIGNAL_TREND_OK)
             
             
-            is_prev_breakout = (prev_candle['close'] > prev_ma50) and \
-                               (prev_candle['open'] <= prev_ma50)
+            is_prev_breakout = bool(flags & SIGNAL_PREV_BREAKOUT)
             
-            is_current_above_ma50 = (current_candle['open'] > ma50_current) and \
-                                    (current_candle['close'] > ma50_current)
+            is_current_above_ma50 = bool(flags & SIGNAL_ABOVE_MA50)
             
-            is_near_ma200 = abs(prev_candle['close'] - prev_ma200) < (prev_candle['close'] * 0.005)
+            is_near_ma200 = bool(flags & SIGNAL_NEAR_MA200)
             
-            is_breakout = is_prev_breakout and is_current_above_ma50 and (not is_near_ma200)
+            is_breakout = bool(flags & SIGNAL_BREAKOUT)
 
             if ma_trend_ok and is_breakout:
                 raw_action = "Buy"
-                self._log(f"매수 조건 만족: 정배열({ma_trend_ok}), 50MA 상향 돌파({is_breakout}), 200MA 근접({is_near_ma200})")
+                self._log_decision(ticker, REASON_BUY, f"매수 조건 만족: 정배열({ma_trend_ok}), 50MA 상향 돌파({is_breakout}), 200MA 근접({is_near_ma200})")
                 
                 if mode == 'TRADING':
-                    self._execute_buy(ticker, current_price) 
-                    
-                    self.holdings[ticker] = {'buy_price': current_price, 'buy_volume': 0.0, 'half_sold': False}
-                    self.buy_candle_time[ticker] = current_candle_time
+                    self._execute_buy(ticker, current_price, buy_candle_time=current_candle_time) 
                 elif mode == 'SIMULATION':
-                     
-                     self.holdings[ticker] = {'buy_price': current_price, 'buy_volume': 0.0, 'half_sold': False}
-                     self.buy_candle_time[ticker] = current_candle_time
+                    self._paper_buy(ticker, current_price, buy_candle_time=current_candle_time)
             else:
                 
                 if not ma_trend_ok:
-                    self._log(f"매수 대기: 정배열 조건 미달 (MA200 > VWMA100 > MA50 불만족)")
+                    self._log_decision(ticker, REASON_WAIT_TREND, f"매수 대기: 정배열 조건 미달 (MA200 > VWMA100 > MA50 불만족)")
                 elif not (is_prev_breakout and is_current_above_ma50):
-                    self._log(f"매수 대기: 50MA 상향 돌파 조건 미달 (직전캔들 돌파: {is_prev_breakout}, 현재캔들 위: {is_current_above_ma50})")
+                    self._log_decision(ticker, REASON_WAIT_BREAKOUT, f"매수 대기: 50MA 상향 돌파 조건 미달 (직전캔들 돌파: {is_prev_breakout}, 현재캔들 위: {is_current_above_ma50})",
+                                       is_prev_breakout, is_current_above_ma50)
                 elif is_near_ma200:
-                    self._log(f"매수 대기: 200MA에 너무 근접하여 (0.5% 미만) 매수 조건 미달")
+                    self._log_decision(ticker, REASON_WAIT_NEAR_MA200, f"매수 대기: 200MA에 너무 근접하여 (0.5% 미만) 매수 조건 미달")
 
         
-        elif ticker in self.holdings:
+        elif position.state in (POSITION_OPENING, POSITION_CLOSING):
+            # 다른 스레드(즉시 매수/매도)의 주문이 진행 중 - 결과가 확정될 때까지 판단 보류
+            self.decision_log.set_reason(ticker, REASON_PENDING)
+            return "Hold", current_price
+        
+        else:
             raw_action = "Hold" 
-            buy_price = self.holdings[ticker]['buy_price']
-            is_half_sold = self.holdings[ticker].get('half_sold', False)
+            buy_price = position.buy_price
+            is_half_sold = position.state == POSITION_HALF_SOLD
+            buy_candle_time = position.buy_candle_time if position.buy_candle_time is not None else 0
 
             
-            is_after_buy_candle = current_candle_time > self.buy_candle_time.get(ticker, pd.Timestamp('1970-01-01'))
+            is_after_buy_candle = current_candle_time > buy_candle_time
 
             
             if not is_half_sold:
                 
-                if current_candle['high'] >= ma200_current:
+                if flags & SIGNAL_HIGH_REACH_MA200:
                     
                     if is_ma50_below_10_candles:
-                        self._log(f"절반 매도 대기: 10개 캔들이 50MA 아래에 있어 매도 조건 미달")
+                        self._log_decision(ticker, REASON_HALF_WAIT, f"절반 매도 대기: 10개 캔들이 50MA 아래에 있어 매도 조건 미달")
+                    elif not self.positions.mark_half_sold(ticker):
+                        self._log_decision(ticker, REASON_HALF_SKIPPED, f"절반 매도 생략: {ticker} 포지션 상태가 변경되었습니다.")
                     else:
-                        self.holdings[ticker]['half_sold'] = True 
-                        
                         if mode == 'TRADING':
+                            self.decision_log.set_reason(ticker, REASON_HALF_SELL)
                             self._execute_sell(ticker, is_half_sell=True)
                         else: 
                             raw_action = "Sell (Half)" 
-                            self._log(f"가상 절반 매도 (이익 실현): 200MA({ma200_current:,.0f}) 도달. 현재가격:{current_price:,.0f}원")
+                            self._log_decision(ticker, REASON_HALF_SELL, f"가상 절반 매도 (이익 실현): 200MA({ma200_current:,.0f}) 도달. 현재가격:{current_price:,.0f}원")
+                            self._paper_sell(ticker, current_price, 0.5)
                     
                     
                     return "Hold", current_price
@@ -799,8 +3465,7 @@ class AutoTradingGUI:
                 profit_rate = ((current_price / buy_price) - 1) * 100
                 
                 
-                is_trailing_sell_signal = (current_candle['close'] < ma50_current) and \
-                                          (prev_candle['close'] >= prev_ma50)
+                is_trailing_sell_signal = bool(flags & SIGNAL_TRAILING_SELL)
                 
                 
                 is_profitable = profit_rate >= 1.0
@@ -809,54 +3474,49 @@ class AutoTradingGUI:
                 if is_trailing_sell_signal and is_profitable:
                     
                     if is_ma50_below_10_candles:
-                        self._log(f"나머지 절반 매도 대기: 10개 캔들이 50MA 아래에 있어 매도 조건 미달")
+                        self._log_decision(ticker, REASON_REST_WAIT, f"나머지 절반 매도 대기: 10개 캔들이 50MA 아래에 있어 매도 조건 미달")
                     else:
                         raw_action = "Sell" 
-                        self._log(f"나머지 절반 매도 조건 만족: 50MA 하향 돌파 및 수익 1% 이상 ({profit_rate:+.2f}%)")
+                        self._log_decision(ticker, REASON_REST_SELL_TRAILING, f"나머지 절반 매도 조건 만족: 50MA 하향 돌파 및 수익 1% 이상 ({profit_rate:+.2f}%)")
                         
                         if mode == 'TRADING':
                             self._execute_sell(ticker, is_half_sell=False)
                         else: 
-                            if ticker in self.buy_candle_time:
-                                del self.buy_candle_time[ticker]
-                            del self.holdings[ticker]
+                            if self.positions.close(ticker) is not None:
+                                self._paper_sell(ticker, current_price, 1.0)
                 
                 
                 else:
                     
-                    is_below_ma50 = df.tail(3).apply(lambda x: x['high'] < x['MA50'], axis=1).all()
+                    is_below_ma50 = bool(flags & SIGNAL_BELOW_MA50_3)
                     
                     if not is_profitable and is_below_ma50:
                         
                         if is_ma50_below_10_candles:
-                            self._log(f"나머지 절반 매도 대기: 10개 캔들이 50MA 아래에 있어 매도 조건 미달")
+                            self._log_decision(ticker, REASON_REST_WAIT, f"나머지 절반 매도 대기: 10개 캔들이 50MA 아래에 있어 매도 조건 미달")
                         else:
                             raw_action = "Sell" 
-                            self._log(f"나머지 절반 매도 조건 만족: 수익 1% 미만({profit_rate:+.2f}%) & 50MA 아래 3개 연속 캔들({is_below_ma50})")
+                            self._log_decision(ticker, REASON_REST_SELL_BELOW, f"나머지 절반 매도 조건 만족: 수익 1% 미만({profit_rate:+.2f}%) & 50MA 아래 3개 연속 캔들({is_below_ma50})")
                             
                             if mode == 'TRADING':
                                 self._execute_sell(ticker, is_half_sell=False)
                             else: 
-                                if ticker in self.buy_candle_time:
-                                    del self.buy_candle_time[ticker]
-                                del self.holdings[ticker]
+                                if self.positions.close(ticker) is not None:
+                                    self._paper_sell(ticker, current_price, 1.0)
                              
                     else:
-                        self._log(f"보유 중: 나머지 절반 매도 대기. 50MA 하향 돌파({is_trailing_sell_signal}), 수익률({profit_rate:+.2f}%)")
+                        self._log_decision(ticker, REASON_HOLD_REST, f"보유 중: 나머지 절반 매도 대기. 50MA 하향 돌파({is_trailing_sell_signal}), 수익률({profit_rate:+.2f}%)",
+                                           is_trailing_sell_signal)
             
             
             elif is_after_buy_candle:
                  
                  
-                 stop_loss_level = ma50_current * (1 - 0.007)
-                 
-                 
-                 is_stop_loss_signal_1 = current_candle['low'] < stop_loss_level
-                 
+                 # 저가가 50MA 대비 0.7% 이상 하락
+                 is_stop_loss_signal_1 = bool(flags & SIGNAL_STOP_1)
                  
-                 is_stop_loss_signal_2 = (prev_candle['open'] < prev_ma50) and \
-                                         (prev_candle['close'] < prev_ma50) and \
-                                         (current_candle['close'] < current_candle['open'])
+                 # 직전 캔들 시가/종가 50MA 아래 & 현재 음봉
+                 is_stop_loss_signal_2 = bool(flags & SIGNAL_STOP_2)
                  
                  
                  is_stop_loss_signal = is_stop_loss_signal_1 or is_stop_loss_signal_2
@@ -864,193 +3524,424 @@ class AutoTradingGUI:
                  if is_stop_loss_signal:
                      
                      if is_ma50_below_10_candles:
-                         self._log(f"손절 매도 대기: 10개 캔들이 50MA 아래에 있어 매도 조건 미달")
+                         self._log_decision(ticker, REASON_STOP_WAIT, f"손절 매도 대기: 10개 캔들이 50MA 아래에 있어 매도 조건 미달")
                      else:
                          raw_action = "Sell" 
                          profit_rate = ((current_price / buy_price) - 1) * 100
-                         self._log(f"손절 조건 만족: 50MA 0.7% 하향 돌파 또는 두 번째 손절 조건(두 캔들 연속 하향 추세) 충족. 수익률: {profit_rate:+.2f}%")
+                         self._log_decision(ticker, REASON_STOP_SELL, f"손절 조건 만족: 50MA 0.7% 하향 돌파 또는 두 번째 손절 조건(두 캔들 연속 하향 추세) 충족. 수익률: {profit_rate:+.2f}%")
                          
                          if mode == 'TRADING':
                              self._execute_sell(ticker, is_half_sell=False)
                          else: 
-                             if ticker in self.buy_candle_time:
-                                 del self.buy_candle_time[ticker]
-                             del self.holdings[ticker]
+                             if self.positions.close(ticker) is not None:
+                                 self._paper_sell(ticker, current_price, 1.0)
                  else:
                     profit_rate = ((current_price / buy_price) - 1) * 100
-                    self._log(f"보유 중: 손절 대기. 50MA 0.7% 하향 돌파({is_stop_loss_signal_1}), 두 번째 조건({is_stop_loss_signal_2}), 수익률({profit_rate:+.2f}%)")
+                    self._log_decision(ticker, REASON_HOLD_STOP, f"보유 중: 손절 대기. 50MA 0.7% 하향 돌파({is_stop_loss_signal_1}), 두 번째 조건({is_stop_loss_signal_2}), 수익률({profit_rate:+.2f}%)")
             
             
             elif not is_after_buy_candle:
-                self._log(f"보유 중: 손절 로직 대기. 매수 캔들({self.buy_candle_time.get(ticker)})이 종료되지 않았습니다.")
+                self._log_decision(ticker, REASON_HOLD_BUY_CANDLE, f"보유 중: 손절 로직 대기. 매수 캔들({KST_EPOCH + pd.Timedelta(seconds=buy_candle_time)})이 종료되지 않았습니다.")
 
 
         return raw_action, current_price
 
 
-    def _run_trading_loop(self, load_time, strategy, timeframe, tickers, auto_select, mode):
-        """실제 트레이딩 로직 (별도 스레드에서 실행)"""
+    def _listed_tickers(self):
+        """KRW 마켓 상장 종목 집합 (MARKET_LIST_TTL 초 동안 캐시, 조회 실패/빈 응답은 캐시하지 않음)"""
+        now = self.clock.time()
+        if self._market_list is None or now - self._market_list_at >= MARKET_LIST_TTL:
+            markets = set(self.metrics.call('get_tickers', pyupbit.get_tickers, fiat="KRW") or [])
+            if not markets:
+                return markets
+            self._market_list, self._market_list_at = markets, now
+        return self._market_list
+
+    def _candle_buffer(self, ticker, interval):
+        """종목/시간봉별 캔들 버퍼 (상세 차트 대상 종목만 차트 표시용 용량으로 확장)"""
+        key = (ticker, interval)
+        candles = self.candle_buffers.get(key)
+        if candles is None:
+            candles = self.candle_buffers[key] = CandleBuffer()
+        candles.resize(CHART_BUFFER_SIZE if ticker == self.target_ticker else CANDLE_BUFFER_SIZE)
+        return candles
+
+    def _run_trading_cycle(self, target_ticker, strategy, mode, timeframe, candles=None):
+        """단일 종목에 대한 1회 트레이딩 사이클 (데이터 로드 → 지표 계산 → 전략 → 상태 갱신)
+        
+        timeframe 은 시작/설정 적용 시 확정된 pyupbit 시간봉입니다 (트레이딩 스레드에서 Tk 변수를 읽지 않음).
+        candles 를 주면 (멀티 프로세스 엔진에서 샤드가 갱신한 버퍼) 종목 확인과 캔들 조회를 생략합니다.
+        """
         
         action_map = {"Buy": "매수 대기 중", "Hold": "보유 중", "Sell": "매도 대기 중", "Wait": "탐색 중", "Sell (Half)": "절반 매도"} 
         is_development_mode = (mode == 'DEVELOPMENT')
         
-        timeframe_map = {'1분': 'minute1', '3분': 'minute3', '5분': 'minute5', '10분': 'minute10', '15분': 'minute15', 
-                         '30분': 'minute30', '1시간': 'hour1', '4시간': 'hour4', '1일': 'day', '1주': 'week'}
-        
-        while self.trading_active:
-            try:
+        if candles is not None or target_ticker in self._listed_tickers():
+            
+            selected_interval = timeframe
+            selected_timeframe_label = TIMEFRAME_LABELS.get(timeframe, timeframe)
+            
+            
+            # 종목별 캔들 버퍼에 마지막 캔들 이후 분량만 증분 조회하여 병합
+            if candles is None:
+                candles = self._candle_buffer(target_ticker, selected_interval)
+                if not refresh_candles(candles, target_ticker, selected_interval, self.clock.time(),
+                                       self.metrics, self.candle_archive, self.stop_event):
+                    return
+            
+            current_price = None
+            raw_action = "Wait"
+            
+            if len(candles) >= 200:
                 
-                current_tickers = []
-                if tickers:
-                    current_tickers = tickers
-                elif is_development_mode:
-                    current_tickers = ['KRW-BTC'] 
-                    self.master.after(0, lambda: self.status_text.set(f"개발 모드 / 종목 미입력: KRW-BTC 로딩 중"))
                 
+                ma50_current, ma200_current, vwma100_current, _ = candles.latest()
+
+                current_price = candles.last_close 
+                self.sparklines.update(target_ticker, candles.column('close'), current_price)
                 
-                if not current_tickers:
-                    status_msg = f"종목 탐색 중 / 대상 종목 없음"
+                chart_args = (candles, selected_timeframe_label, target_ticker, selected_interval)
+                self._chart_frames[target_ticker] = chart_args
+                if target_ticker == self.target_ticker:
+                    self.master.after(0, lambda: self._draw_chart(*chart_args))
+            
+            
+            if is_development_mode and len(candles) >= 200:
+                
+                
+                status_msg = f"개발 모드 ({target_ticker}) @ {current_price:,.0f} 원 ({selected_timeframe_label} 로드 완료)"
+                self.sparklines.set_status(target_ticker, "개발 모드")
+                if target_ticker == self.target_ticker:
                     self.master.after(0, lambda: self.status_text.set(status_msg))
-                    time.sleep(load_time)
-                    continue
-
-                target_ticker = current_tickers[0] 
-                self.target_ticker = target_ticker 
                 
                 
-                if target_ticker in pyupbit.get_tickers(fiat="KRW"):
-                    
-                    selected_timeframe_label = self.ma_timeframe_var.get()
-                    
+                self._log(f"--- 개발 모드 데이터 로깅: {target_ticker} ({selected_timeframe_label}) ---")
+                self._log(f"현재 가격: {current_price:,.0f} 원")
+                self._log(f"MA50: {ma50_current:,.0f} 원 / MA200: {ma200_current:,.0f} 원 / VWMA100: {vwma100_current:,.0f} 원")
+                
+                if DEBUG_MODE_CANDLE:
+                    recent_trend_df = candles.frame(tail=200)
+                    self._log(f"캔들 및 이평선 추세 데이터 (최근 {len(recent_trend_df)}개): \n{recent_trend_df[['close', 'MA50', 'MA200', 'VWMA100']].to_string()}")
+            
+            
+            elif not is_development_mode:
+                
+                
+                if current_price is None:
+                    current_price = self.metrics.call('get_current_price', pyupbit.get_current_price, target_ticker)
+
+                if current_price:
                     
                     if strategy == '5분봉_50선_트레이딩':
-                         selected_interval = 'minute5'
-                         selected_timeframe_label = '5분'
+                        with self.metrics.timer('strategy'):
+                            raw_action, strategy_price = self._strategy_5min_ma50(target_ticker, candles, mode)
+                        # 캔들 조회 실패로 버퍼가 비어 있으면 전략 가격이 없으므로 현재가 조회 값 유지
+                        if strategy_price is not None:
+                            current_price = strategy_price
+                        reason = self.decision_log.pop_reason(target_ticker)
+                    
                     else:
-                         selected_interval = timeframe_map.get(selected_timeframe_label, 'day')
+                        raw_action = "Wait"
+                        reason = REASON_NONE
                     
                     
-                    df = pyupbit.get_ohlcv(target_ticker, interval=selected_interval, count=400) 
                     
-                    current_price = None
-                    raw_action = "Wait"
                     
-                    if df is not None and len(df) >= 200:
-                        
-                        
-                        df['MA50'] = self._calculate_moving_average(df, 50)
-                        df['MA200'] = self._calculate_moving_average(df, 200)
-                        df['VWMA100'] = self._calculate_vwma(df, 100) 
+                    korean_status = action_map.get(raw_action, "알 수 없음") 
+                    self.sparklines.set_status(target_ticker, korean_status)
+                    
+                    if mode != 'TRADING':
+                        self.paper_ledger.mark(target_ticker, current_price)
+                    
+                    profit_rate_str = ""
+                    position = self.positions.get(target_ticker)
+                    if position is not None and position.buy_price:
+                        profit_rate = ((current_price / position.buy_price) - 1) * 100
+                        buy_type = "즉시 매수" if position.manual_buy else "전략 매수"
+                        profit_rate_str = f" (수익률: {profit_rate:+.2f}%, {'매도 대기 중' if position.state == POSITION_HALF_SOLD else '절반 대기 중'}, 매수: {buy_type})"
 
-                        current_price = df.iloc[-1]['close'] 
-                        
-                        
-                        self.master.after(0, lambda: self._draw_chart(df, selected_timeframe_label))
                     
                     
-                    if is_development_mode and df is not None and len(df) >= 200:
-                        
-                        ma50_current = df['MA50'].iloc[-1]
-                        ma200_current = df['MA200'].iloc[-1]
-                        vwma100_current = df['VWMA100'].iloc[-1]
-                        
-                        
-                        status_msg = f"개발 모드 ({target_ticker}) @ {current_price:,.0f} 원 ({selected_timeframe_label} 로드 완료)"
-                        self.master.after(0, lambda: self.status_text.set(status_msg))
-                        
-                        
-                        self._log(f"--- 개발 모드 데이터 로깅: {target_ticker} ({selected_timeframe_label}) ---")
-                        self._log(f"현재 가격: {current_price:,.0f} 원")
-                        self._log(f"MA50: {ma50_current:,.0f} 원 / MA200: {ma200_current:,.0f} 원 / VWMA100: {vwma100_current:,.0f} 원")
-                        
-                        if DEBUG_MODE_CANDLE:
-                            recent_trend_df = df.tail(200).copy()
-                            self._log(f"캔들 및 이평선 추세 데이터 (최근 {len(recent_trend_df)}개): \n{recent_trend_df[['close', 'MA50', 'MA200', 'VWMA100']].to_string()}")
+                    new_status = f"{target_ticker} ({korean_status}) @ {current_price:,.0f} 원{profit_rate_str}"
+                    if mode != 'TRADING':
+                        paper_summary = self.paper_ledger.summary()
+                        new_status += f" / 가상 평가금액: {paper_summary['equity']:,.0f} 원 ({paper_summary['return_pct']:+.2f}%)"
+                    if target_ticker == self.target_ticker:
+                        self.master.after(0, lambda: self.status_text.set(new_status))
                     
+                    if self.decision_trace is not None and len(candles) >= 200:
+                        self.decision_trace.record(self.clock.time(), candles.last_epoch, target_ticker,
+                                                   DECISION_ACTIONS.index(raw_action), reason, candles.latest()[3], current_price,
+                                                   profit_rate if position is not None and position.buy_price else np.nan)
                     
-                    elif not is_development_mode:
-                        
-                        
-                        if current_price is None:
-                            current_price = pyupbit.get_current_price(target_ticker)
+                    # 상태 줄은 판단/포지션 상태가 바뀔 때만 출력 (가격/수익률 변화만 있는 틱은 생략)
+                    log_message = f"현재 상태: ({target_ticker}) {korean_status} (현재 가격: {current_price:,.0f} 원{profit_rate_str})"
+                    status_key = (korean_status, position.state if position is not None else None)
+                    log_line = self.decision_log.observe(target_ticker, 'status', status_key, log_message)
+                    if log_line is None:
+                        self.metrics.increment('log_suppressed')
+                    else:
+                        self._log(log_line)
+                else:
+                    self.master.after(0, lambda: self.status_text.set(f"{target_ticker} 데이터 로드 실패"))
+                    self._log(f"{target_ticker} 현재가 데이터를 불러오지 못했습니다.")
+                    
+            else:
+                
+                self.master.after(0, lambda: self.status_text.set(f"{target_ticker} 데이터 로드 실패/불충분"))
+                self._log(f"데이터 로드 실패: {target_ticker} 캔들 데이터를 불러오지 못했거나 200개 미만입니다.")
 
-                        if current_price:
-                            
-                            if strategy == '5분봉_50선_트레이딩':
-                                raw_action, current_price = self._strategy_5min_ma50(target_ticker, df, mode)
-                            
-                            else:
-                                raw_action = "Wait"
-                            
-                            
-                            
-                            
-                            korean_status = action_map.get(raw_action, "알 수 없음") 
-                            
-                            profit_rate_str = ""
-                            if target_ticker in self.holdings:
-                                buy_price = self.holdings[target_ticker]['buy_price']
-                                profit_rate = ((current_price / buy_price) - 1) * 100
-                                buy_type = "즉시 매수" if self.holdings[target_ticker].get('manual_buy') else "전략 매수"
-                                profit_rate_str = f" (수익률: {profit_rate:+.2f}%, {'매도 대기 중' if self.holdings[target_ticker].get('half_sold') else '절반 대기 중'}, 매수: {buy_type})"
 
-                            
-                            
-                            new_status = f"{target_ticker} ({korean_status}) @ {current_price:,.0f} 원{profit_rate_str}"
-                            self.master.after(0, lambda: self.status_text.set(new_status))
-                            
-                            log_message = f"현재 상태: ({target_ticker}) {korean_status} (현재 가격: {current_price:,.0f} 원{profit_rate_str})"
-                            self._log(log_message)
-                        else:
-                            self.master.after(0, lambda: self.status_text.set(f"{target_ticker} 데이터 로드 실패"))
-                            self._log(f"{target_ticker} 현재가 데이터를 불러오지 못했습니다.")
-                            
-                    else:
-                        
-                        self.master.after(0, lambda: self.status_text.set(f"{target_ticker} 데이터 로드 실패/불충분"))
-                        self._log(f"데이터 로드 실패: {target_ticker} 캔들 데이터를 불러오지 못했거나 200개 미만입니다.")
+        else:
+            self.master.after(0, lambda: self.status_text.set(f"{target_ticker} (잘못된 종목명)"))
 
+    def _run_trading_loop(self, load_time, strategy, timeframe, tickers, auto_select, mode, engine=ENGINE_THREAD, align=False):
+        """실제 트레이딩 로직 (별도 스레드에서 실행)
+        
+        engine 이 ENGINE_PROCESS 이면 캔들 조회/지표 계산을 ShardedEngine 워커 프로세스에 나눠 맡기고,
+        이 스레드는 샤드 결과가 도착하는 순서대로 전략 판단/주문/화면 갱신만 처리합니다.
+        설정 적용 버튼으로 바뀐 설정(_pending_config)은 매 사이클 시작 시 반영합니다.
+        """
+        
+        is_development_mode = (mode == 'DEVELOPMENT')
+        use_market_scanner = auto_select and not is_development_mode
+        if use_market_scanner:
+            self._start_market_scan(tickers, timeframe, load_time)
+        
+        sharded_engine = None
+        if engine == ENGINE_PROCESS:
+            try:
+                sharded_engine = self._start_sharded_engine()
+            except Exception as e:
+                self._log(f"멀티 프로세스 엔진 시작 실패, 단일 스레드로 실행합니다: {type(e).__name__} - {e}")
+        
+        stop_event = self.stop_event
+        while self.trading_active and not stop_event.is_set():
+            cycle_started = time.perf_counter()
+            try:
+                config = self._take_pending_config()
+                if config is not None:
+                    if config['timeframe'] != timeframe:
+                        self._reload_timeframe(config['timeframe'])
+                    load_time, strategy, timeframe, tickers, auto_select, align = (
+                        config['load_time'], config['strategy'], config['timeframe'], config['tickers'], config['auto_select'],
+                        config['align'])
+                    self.trade_ratio = config['trade_ratio']
+                    use_market_scanner = auto_select and not is_development_mode
+                    if use_market_scanner:
+                        self._start_market_scan(tickers, timeframe, load_time)
+                    else:
+                        self._stop_market_scan()
+                    self._log(f"설정 적용 완료: {strategy} / {config['timeframe_label']}")
+                
+                current_tickers = []
+                if use_market_scanner:
+                    current_tickers = self._market_scan_tickers()
+                elif tickers or len(self.positions):
+                    # 워밍업 중인 종목은 제외, 목록에서 빠진 보유 종목은 매도로 정리될 때까지 계속 관리
+                    current_tickers = [ticker for ticker in tickers if ticker not in self._warming]
+                    current_tickers += [ticker for ticker in self.positions.tickers() if ticker not in tickers]
+                elif is_development_mode:
+                    current_tickers = ['KRW-BTC'] 
+                    self.master.after(0, lambda: self.status_text.set(f"개발 모드 / 종목 미입력: KRW-BTC 로딩 중"))
+                
+                
+                if not current_tickers:
+                    if use_market_scanner and self._last_scan_candidates is None:
+                        status_msg = "종목 탐색 중 / 첫 마켓 스캔 진행 중"
+                    else:
+                        status_msg = f"종목 탐색 중 / 대상 종목 없음"
+                    self.master.after(0, lambda: self.status_text.set(status_msg))
+                    self._wait_next_cycle(timeframe, load_time, align)
+                    continue
 
+                for ticker in list(self.sparklines.tickers):
+                    if ticker not in current_tickers:
+                        self.sparklines.remove(ticker)
+                        self._chart_frames.pop(ticker, None)
+                        self.decision_log.remove(ticker)
+                        for key in [key for key in list(self.candle_buffers) if key[0] == ticker]:
+                            del self.candle_buffers[key]
+                
+                # 상세 차트/상태 표시 대상: 대시보드에서 선택한 종목 (없으면 첫 번째 종목)
+                if self.selected_ticker in current_tickers:
+                    self.target_ticker = self.selected_ticker
                 else:
-                    self.master.after(0, lambda: self.status_text.set(f"{target_ticker} (잘못된 종목명)"))
-
+                    self.target_ticker = current_tickers[0]
+                
+                if sharded_engine is not None:
+                    self._run_sharded_cycles(sharded_engine, current_tickers, strategy, timeframe, mode)
+                else:
+                    for ticker in current_tickers:
+                        if not self.trading_active:
+                            break
+                        self._run_trading_cycle(ticker, strategy, mode, timeframe)
 
-                time.sleep(load_time)
+                self.metrics.observe('cycle', time.perf_counter() - cycle_started)
+                
+                summary_lines = self.decision_log.summary(self.clock.time())
+                for line in summary_lines:
+                    self._log(line)
+                if summary_lines and self.decision_trace is not None:
+                    self.decision_trace.flush()
+                
+                self._wait_next_cycle(timeframe, load_time, align)
 
             except Exception as e:
                 error_msg = f"트레이딩 루프 오류 발생: {type(e).__name__} - {e}"
+                self.metrics.increment('loop_error')
                 self._log(error_msg) 
                 self.master.after(0, lambda: self.status_text.set(f"오류 발생: {type(e).__name__}"))
-                time.sleep(5) 
+                self.scheduler.wait(self.scheduler.call_later(5, name="error_backoff")) 
+        
+        self._stop_market_scan()
+        if sharded_engine is not None:
+            sharded_engine.stop()
+        self.master.after(0, self._on_trading_loop_exit)
+
+    def _reload_timeframe(self, timeframe):
+        """(트레이딩 스레드) 시간봉 변경 - 이전 시간봉 캔들 버퍼/차트 캐시를 비우고 새 시간봉으로 다시 조회 (스캐너는 설정 적용 시 재시작)"""
+        for key in [key for key in list(self.candle_buffers) if key[1] != timeframe]:
+            del self.candle_buffers[key]
+        self._chart_frames = {}
+
+    def _start_sharded_engine(self):
+        archive_root = self.candle_archive.root if self.candle_archive is not None else None
+        engine = ShardedEngine(self.shard_workers, archive_root, *self.shard_initializer).start()
+        self._log(f"멀티 프로세스 엔진 시작: 샤드 {engine.workers}개")
+        return engine
+
+    def _run_sharded_cycles(self, engine, tickers, strategy, timeframe, mode):
+        """샤드에 종목을 배정하고 갱신된 캔들 버퍼가 도착하는 순서대로 트레이딩 사이클 실행
+        
+        상장 종목 목록 조회에 실패하면 (빈 목록) 배정을 바꾸지 않습니다. 빈 배정은 모든 샤드의 캔들 버퍼를 비워
+        API 장애 중에 전체 종목 이력을 다시 받게 만들기 때문입니다.
+        """
+        valid_tickers = self._listed_tickers()
+        if valid_tickers:
+            engine.assign([ticker for ticker in tickers if ticker in valid_tickers])
+        else:
+            self._log("상장 종목 목록 조회 실패 - 샤드 종목 배정을 유지합니다.")
         
-        self.master.after(0, lambda: self.status_text.set("트레이딩 종료 완료"))
+        for ticker, candles in engine.tick(self.clock.time(), timeframe, self.target_ticker, self.stop_event, self.metrics):
+            if not self.trading_active:
+                break
+            if isinstance(candles, str):
+                self._log(f"[{ticker}] 샤드 캔들 조회 오류: {candles}")
+                continue
+            self.candle_buffers[(ticker, timeframe)] = candles
+            self._run_trading_cycle(ticker, strategy, mode, timeframe, candles=candles)
 
 
+    def _on_trading_loop_exit(self):
+        """트레이딩 스레드 종료 후 (Tk 스레드) - 상태 표시 및 시작 버튼 재활성화"""
+        if self.trading_active:
+            return
+        self.status_text.set("트레이딩 종료 완료")
+        self._enable_restart()
+
+    def _trading_thread_alive(self):
+        return self.trading_thread is not None and self.trading_thread.is_alive() and self.trading_thread is not threading.current_thread()
+
+    def _on_restart_grace_elapsed(self):
+        """종료 요청 후 STOP_RESTART_GRACE_MS 경과 - 스레드가 아직 응답 대기 중이면 시작 버튼은 스레드 종료 시 활성화"""
+        if self.trading_active or self._closing:
+            return
+        if self._trading_thread_alive():
+            self.status_text.set("이전 트레이딩 스레드 종료 대기 중 (API 응답 대기)")
+            self._log("트레이딩 스레드가 아직 종료되지 않았습니다. 종료되면 시작 버튼이 활성화됩니다.")
+            return
+        self._enable_restart()
+
+    def _enable_restart(self):
+        if not self.trading_active and not self._closing:
+            self.start_button.config(state='normal')
+
     def _stop_trading(self):
-        """트레이딩 종료 버튼 클릭 핸들러"""
+        """트레이딩 종료 버튼 클릭 핸들러
+        
+        종료 신호만 보내고 즉시 반환합니다. 대기 중인 사이클/재시도 대기와 스캐너 요청 간격 대기는 바로 깨어나고,
+        진행 중이던 API 응답은 도착 후 폐기됩니다. 로그/장부/지표 저장은 백그라운드 스레드에서 실행됩니다.
+        시작 버튼은 트레이딩 스레드가 끝난 뒤에만 다시 활성화됩니다 (STOP_RESTART_GRACE_MS 후에도 살아 있으면 종료 대기 상태 표시).
+        """
         
         if not self.trading_active:
             return
             
         self.trading_active = False
+        self.stop_event.set()
+        self.scheduler.stop()
         self.status_text.set("종료 요청 중...")
         
-        self.start_button.config(state='normal')
         self.stop_button.config(state='disabled')
+        self.apply_button.config(state='disabled')
         self.immediate_buy_button.config(state='disabled')
         self.immediate_sell_button.config(state='disabled')
+        self.master.after(STOP_RESTART_GRACE_MS, self._on_restart_grace_elapsed)
         
         self._log("트레이딩 종료 요청됨. 로그 저장 중...")
-        
-        self._save_log_to_file("MANUAL_STOP")
+        self._flush_final_state("MANUAL_STOP")
 
-        if self.trading_thread and self.trading_thread.is_alive():
-            for _ in range(30):
-                if not self.trading_thread.is_alive():
-                    break
-                time.sleep(0.1)
+    def _flush_final_state(self, prefix):
+        """종료 시 로그(엑셀)/가상 매매 장부/성능 지표 저장 - 로그 위젯은 Tk 스레드에서 읽고 파일 쓰기는 백그라운드에서 실행"""
+        try:
+            log_content = self.log_text.get("1.0", tk.END).strip().split('\n')
+        except Exception as e:
+            self._log(f"로그 파일 저장 중 오류 발생 (로그 읽기): {e}")
+            log_content = []
+        trading_thread = self.trading_thread
+        ledger = self.paper_ledger
+        decision_trace = self.decision_trace
+        
+        def flush():
+            # 진행 중이던 사이클의 가상 체결까지 장부에 반영된 뒤 저장
+            if trading_thread is not None and trading_thread is not threading.current_thread():
+                trading_thread.join(FLUSH_JOIN_TIMEOUT)
+            
+            if log_content:
+                self._write_log_file(log_content, prefix)
+            
+            if ledger.fill_count:
+                try:
+                    summary = ledger.summary()
+                    paths = ledger.dump(LOG_DIR)
+                    self._log(f"가상 매매 결과: 평가금액 {summary['equity']:,.0f} 원 ({summary['return_pct']:+.2f}%), "
+                              f"실현 손익 {summary['realized_pnl']:+,.0f} 원, 수수료 {summary['fees']:,.0f} 원")
+                    self._log(f"가상 매매 장부 저장: {', '.join(paths)}")
+                except Exception as e:
+                    self._log(f"가상 매매 장부 저장 중 오류 발생: {e}")
+            
+            if decision_trace is not None:
+                try:
+                    trace_path = decision_trace.close()
+                    if trace_path:
+                        self._log(f"판단 트레이스 저장: {trace_path} ({decision_trace.written:,}건)")
+                except Exception as e:
+                    self._log(f"판단 트레이스 저장 중 오류 발생: {e}")
+            
+            try:
+                self.metrics.dump(METRICS_FILE)
+            except Exception as e:
+                print(f"성능 지표 저장 오류: {e}")
+        
+        return self._start_background_flush(flush, name="FinalFlush")
 
-        self.status_text.set("트레이딩 종료 완료")
+    def _on_close(self):
+        """창 닫기 - 트레이딩 종료를 요청하고 백그라운드 저장이 끝나면 (최대 CLOSE_FLUSH_TIMEOUT 초) 창을 닫음"""
+        if self._closing:
+            return
+        if self.trading_active:
+            self._stop_trading()
+        self._closing = True
+        self.status_text.set("저장 완료 후 종료합니다...")
+        self._close_deadline = time.monotonic() + CLOSE_FLUSH_TIMEOUT
+        self._destroy_when_flushed()
+
+    def _destroy_when_flushed(self):
+        if any(thread.is_alive() for thread in self._flush_threads) and time.monotonic() < self._close_deadline:
+            self.master.after(50, self._destroy_when_flushed)
+            return
+        self.master.destroy()
 
 if __name__ == "__main__":
     try:
@@ -1071,5 +3962,5 @@ if __name__ == "__main__":
 
     root = tk.Tk()
     app = AutoTradingGUI(root)
-    root.protocol("WM_DELETE_WINDOW", lambda: [app._stop_trading() if app.trading_thread else None, root.destroy()])
+    root.protocol("WM_DELETE_WINDOW", app._on_close)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""트레이딩 사이클 벤치마크 (오프라인, 헤드리스)
+
+기록된 OHLCV 캔들(bench_fixtures/<종목>_<시간봉>.csv, 없으면 합성 캔들)을 FakePyupbit 로 재생하여
+_run_trading_cycle (get_tickers → get_ohlcv → 지표 계산 → _strategy_5min_ma50) 의
+처리량(종목 평가/초), 구간별 지연 시간, 최대 메모리와 _draw_chart 렌더링 시간,
+종목 1개당 캔들 데이터 메모리(이전 DataFrame 표현 대비 CandleBuffer)를 측정합니다.
+--engine process 는 ShardedEngine 워커 수(--workers)별 처리량을 측정합니다 (최대 메모리는 코디네이터 프로세스 기준).
+
+사용 예:
+    python bench_trading_cycle.py                       # 1, 10, 100 종목
+    python bench_trading_cycle.py --tickers 1,10 --rounds 50 --json bench.json
+    python bench_trading_cycle.py --engine process --workers 1,2,4 --tickers 100
+    python bench_trading_cycle.py --record KRW-BTC,KRW-ETH   # 실제 캔들 기록 (네트워크 필요)
+"""
+import argparse
+import json
+import os
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+
+import headless
+from headless import FakePyupbit, create_headless_app, attach_headless_chart, install_fake_pyupbit
+from Auto_trading_gui import CandleBuffer, ShardedEngine
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURE_DIR = os.path.join(BENCH_DIR, "bench_fixtures")
+REPORT_STAGES = ['cycle', 'api.get_tickers', 'api.get_ohlcv', 'indicators', 'strategy']
+
+
+def build_universe(fixtures, ticker_count, interval):
+    """fixture 캔들을 순환 사용하여 ticker_count 개 종목의 재생 데이터를 구성"""
+    if not fixtures:
+        return {f"KRW-BENCH{i:03d}": headless.synthetic_ohlcv(f"KRW-BENCH{i:03d}", interval=interval)
+                for i in range(ticker_count)}
+
+    sources = list(fixtures.items())
+    universe = {}
+    for i in range(ticker_count):
+        source_ticker, df = sources[i % len(sources)]
+        ticker = source_ticker if i < len(sources) else f"{source_ticker}{i:03d}"
+        universe[ticker] = df
+    return universe
+
+
+def run_cycles(app, fake, tickers, rounds, strategy, interval, mode):
+    """rounds 회 동안 모든 종목에 대해 트레이딩 사이클을 실행하고 총 평가 횟수를 반환"""
+    evaluations = 0
+    for _ in range(rounds):
+        for ticker in tickers:
+            app.target_ticker = ticker
+            with app.metrics.timer('cycle'):
+                app._run_trading_cycle(ticker, strategy, mode, interval)
+            app.master.discard_pending()
+            evaluations += 1
+        fake.advance()
+    return evaluations
+
+
+def run_sharded_cycles(app, fake, engine, tickers, rounds, strategy, interval, mode):
+    """run_cycles 의 멀티 프로세스 엔진 버전 (샤드 워커의 FakePyupbit 는 조회마다 스스로 전진)"""
+    evaluations = 0
+    for _ in range(rounds):
+        app._run_sharded_cycles(engine, tickers, strategy, interval, mode)
+        app.master.discard_pending()
+        evaluations += len(tickers)
+        fake.advance()
+    return evaluations
+
+
+def bench_ticker_count(fixtures, ticker_count, rounds, interval, strategy, mode, workers=None):
+    """종목 수 하나에 대한 처리량/지연/메모리 측정 (workers: 멀티 프로세스 엔진 샤드 수, None 이면 단일 스레드)"""
+    universe = build_universe(fixtures, ticker_count, interval)
+    fake = FakePyupbit(universe)
+    original = install_fake_pyupbit(fake)
+    engine = None
+    try:
+        tickers = list(fake.candles)
+        app = create_headless_app(mode=mode, strategy=strategy, tickers=','.join(tickers))
+        if workers is None:
+            cycles = lambda count: run_cycles(app, fake, tickers, count, strategy, interval, mode)
+        else:
+            engine = ShardedEngine(workers, archive_root=None, initializer=headless.install_shard_fake_pyupbit,
+                                   initargs=(universe, fake.window)).start()
+            app.trading_active = True
+            cycles = lambda count: run_sharded_cycles(app, fake, engine, tickers, count, strategy, interval, mode)
+
+        cycles(1)
+        app.metrics.reset()
+
+        started = time.perf_counter()
+        evaluations = cycles(rounds)
+        elapsed = time.perf_counter() - started
+        stages = app.metrics.snapshot()['stages']
+
+        tracemalloc.start()
+        cycles(1)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        if engine is not None:
+            engine.stop()
+        install_fake_pyupbit(original)
+
+    return {
+        'tickers': ticker_count,
+        'workers': workers,
+        'evaluations': evaluations,
+        'elapsed_seconds': elapsed,
+        'evaluations_per_second': evaluations / elapsed if elapsed else 0.0,
+        'peak_memory_mb': peak_bytes / (1024 * 1024),
+        'stages': {name: stages[name] for name in REPORT_STAGES if name in stages},
+    }
+
+
+def bench_chart(fixtures, renders, interval):
+    """_draw_chart 렌더링 시간 측정 (Agg 백엔드)"""
+    ticker, df = next(iter(fixtures.items())) if fixtures else ('KRW-BENCH000', headless.synthetic_ohlcv('KRW-BENCH000', interval=interval))
+    app = attach_headless_chart(create_headless_app(tickers=ticker))
+    app.target_ticker = ticker
+
+    df = df.tail(400).copy()
+    df['MA50'] = app._calculate_moving_average(df, 50)
+    df['MA200'] = app._calculate_moving_average(df, 200)
+    df['VWMA100'] = app._calculate_vwma(df, 100)
+
+    app._draw_chart(df, '5분')
+    app.metrics.reset()
+    for _ in range(renders):
+        app._draw_chart(df, '5분')
+    return app.metrics.snapshot()['stages'].get('draw_chart', {})
+
+
+def _traced_bytes(build):
+    """build() 가 반환한 객체가 유지하는 메모리 (tracemalloc 현재 할당량, 바이트)"""
+    tracemalloc.start()
+    kept = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def bench_memory_per_ticker(fixtures, interval):
+    """종목 1개당 사이클 캔들 데이터 메모리 비교
+    
+    - 이전: get_ohlcv(count=400) DataFrame + 지표 3열 + 차트용 tail(200).copy()
+    - 현재: CandleBuffer (epoch int64 + OHLCV float32, 전략 판단용 용량) + 마지막 캔들 지표 캐시
+    """
+    df = next(iter(fixtures.values())) if fixtures else headless.synthetic_ohlcv('KRW-BENCH000', interval=interval)
+    app = create_headless_app()
+
+    def legacy():
+        frame = df.tail(400).copy()
+        frame['MA50'] = app._calculate_moving_average(frame, 50)
+        frame['MA200'] = app._calculate_moving_average(frame, 200)
+        frame['VWMA100'] = app._calculate_vwma(frame, 100)
+        return frame, frame.tail(200).copy()
+
+    def compact():
+        candles = CandleBuffer()
+        candles.merge(df.tail(candles.capacity))
+        candles.latest()
+        return candles
+
+    before = _traced_bytes(legacy)
+    after = _traced_bytes(compact)
+    return {'before_bytes': before, 'after_bytes': after, 'ratio': before / after if after else 0.0}
+
+
+def print_report(results, chart, memory=None):
+    print(f"{'종목 수':>8} {'샤드':>6} {'평가 수':>8} {'평가/초':>10} {'최대 메모리(MB)':>16}")
+    for result in results:
+        workers = result['workers'] or '-'
+        print(f"{result['tickers']:>8} {workers:>6} {result['evaluations']:>8} {result['evaluations_per_second']:>10,.1f} {result['peak_memory_mb']:>16,.2f}")
+
+    print()
+    print(f"{'종목 수':>8} {'구간':<18} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'최대(ms)':>9}")
+    for result in results:
+        for stage, stats in result['stages'].items():
+            print(f"{result['tickers']:>8} {stage:<18} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['max_ms']:>9.2f}")
+
+    if chart:
+        print()
+        print(f"차트 렌더링 ({chart['count']}회): p50 {chart['p50_ms']:.1f} ms / p95 {chart['p95_ms']:.1f} ms / 최대 {chart['max_ms']:.1f} ms")
+
+    if memory:
+        print()
+        print(f"종목당 캔들 데이터 메모리: 이전 {memory['before_bytes'] / 1024:,.1f} KB → 현재 {memory['after_bytes'] / 1024:,.1f} KB ({memory['ratio']:.1f}배 감소)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="트레이딩 사이클 오프라인 벤치마크")
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURE_DIR, help="기록된 캔들 CSV 디렉터리")
+    parser.add_argument('--interval', default='minute5', help="캔들 시간봉 (기본: minute5)")
+    parser.add_argument('--tickers', default='1,10,100', help="측정할 종목 수 목록 (쉼표 구분)")
+    parser.add_argument('--rounds', type=int, default=20, help="종목 수별 반복 사이클 수")
+    parser.add_argument('--chart-renders', type=int, default=20, help="차트 렌더링 측정 횟수 (0: 생략)")
+    parser.add_argument('--mode', default='SIMULATION', choices=['SIMULATION', 'DEVELOPMENT'])
+    parser.add_argument('--strategy', default='5분봉_50선_트레이딩')
+    parser.add_argument('--engine', default='thread', choices=['thread', 'process'], help="thread: 단일 스레드, process: ShardedEngine")
+    parser.add_argument('--workers', default=str(os.cpu_count() or 1), help="--engine process 샤드 수 목록 (쉼표 구분)")
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument('--record', help="실제 Upbit 캔들을 fixture 로 기록할 종목 (쉼표 구분, 네트워크 필요)")
+    args = parser.parse_args()
+
+    if args.record:
+        headless.record_ohlcv_fixtures(args.fixtures, [t.strip().upper() for t in args.record.split(',') if t.strip()], args.interval)
+        return
+
+    fixtures = headless.load_ohlcv_fixtures(args.fixtures, args.interval)
+    if fixtures:
+        print(f"기록된 캔들 사용: {', '.join(fixtures)} ({args.fixtures})")
+    else:
+        print(f"기록된 캔들이 없어 합성 캔들을 사용합니다 ({args.fixtures})")
+
+    worker_counts = [int(w) for w in args.workers.split(',') if w.strip()] if args.engine == 'process' else [None]
+    results = [bench_ticker_count(fixtures, int(count), args.rounds, args.interval, args.strategy, args.mode, workers)
+               for count in args.tickers.split(',') if count.strip() for workers in worker_counts]
+    chart = bench_chart(fixtures, args.chart_renders, args.interval) if args.chart_renders > 0 else {}
+    memory = bench_memory_per_ticker(fixtures, args.interval)
+
+    print_report(results, chart, memory)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'interval': args.interval, 'engine': args.engine, 'results': results, 'chart': chart, 'memory_per_ticker': memory}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
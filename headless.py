@@ -0,0 +1,201 @@
+"""Tk 화면 없이 AutoTradingGUI 트레이딩 로직을 실행하기 위한 헤드리스 도구 모음
+
+- HeadlessMaster / HeadlessVar: Tk master 와 tk.StringVar 대체
+- FakePyupbit: 기록된(또는 합성) 캔들을 재생하는 오프라인 pyupbit 대체 모듈
+- create_headless_app: 위젯 없이 트레이딩 상태만 초기화된 AutoTradingGUI 인스턴스 생성
+"""
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import Auto_trading_gui
+from Auto_trading_gui import AutoTradingGUI, INTERVAL_SECONDS, CHART_MODE_RECENT, ENGINE_THREAD
+
+
+class HeadlessVar:
+    """tk.StringVar / tk.BooleanVar 대체 (get/set 만 지원)"""
+
+    def __init__(self, value=None):
+        self._value = value
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        self._value = value
+
+
+class HeadlessMaster:
+    """Tk master 대체 - after(0, ...) 콜백은 큐에 쌓고, 지연 콜백(주기 갱신)은 무시"""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, delay_ms, callback=None, *args):
+        if callback is not None and delay_ms == 0:
+            self.pending.append((callback, args))
+        return None
+
+    def update(self):
+        pass
+
+    def run_pending(self):
+        """쌓인 UI 콜백 실행"""
+        pending, self.pending = self.pending, []
+        for callback, args in pending:
+            callback(*args)
+
+    def discard_pending(self):
+        """쌓인 UI 콜백 폐기 (차트 렌더링 등 UI 비용 제외 시 사용)"""
+        self.pending = []
+
+
+class FakePyupbit:
+    """pyupbit 모듈 대체 - 종목별 전체 캔들 중 커서 위치까지만 조회되도록 재생
+    
+    auto_advance=True 이면 get_ohlcv 조회 후 해당 종목 커서를 1캔들 전진 (advance() 를 호출할 수 없는 샤드 워커 프로세스용)
+    """
+
+    def __init__(self, candles, window=400, auto_advance=False):
+        self.candles = candles
+        self.window = window
+        self.auto_advance = auto_advance
+        self.cursor = {ticker: min(len(df), window) for ticker, df in candles.items()}
+
+    def get_tickers(self, fiat="", is_details=False, limit_info=False, verbose=False):
+        return [ticker for ticker in self.candles if not fiat or ticker.startswith(f"{fiat}-")]
+
+    def get_ohlcv(self, ticker="KRW-BTC", interval="day", count=200, to=None, period=0.1):
+        df = self.candles.get(ticker)
+        if df is None:
+            return None
+        end = self.cursor[ticker]
+        result = df.iloc[max(0, end - count):end].copy()
+        if self.auto_advance:
+            self.cursor[ticker] = end + 1 if end < len(df) else min(len(df), self.window)
+        return result
+
+    def get_current_price(self, ticker="KRW-BTC", limit_info=False, verbose=False):
+        if isinstance(ticker, list):
+            return {t: self.get_current_price(t) for t in ticker}
+        df = self.candles.get(ticker)
+        if df is None:
+            return None
+        return float(df['close'].iloc[self.cursor[ticker] - 1])
+
+    def advance(self, steps=1):
+        """모든 종목의 커서를 steps 캔들만큼 전진 (끝에 도달하면 처음 윈도우로 되감기)"""
+        for ticker, df in self.candles.items():
+            cursor = self.cursor[ticker] + steps
+            if cursor > len(df):
+                cursor = min(len(df), self.window)
+            self.cursor[ticker] = cursor
+
+
+def synthetic_ohlcv(ticker, count=2000, interval='minute5', end='2024-01-01 09:00:00'):
+    """종목명으로 시드가 고정된 합성 OHLCV (추세 구간이 바뀌는 랜덤 워크, pyupbit 컬럼 형식)"""
+    rng = np.random.default_rng(zlib.crc32(ticker.encode('utf-8')))
+
+    drift = np.repeat(rng.normal(0, 0.0015, count // 100 + 1), 100)[:count]
+    returns = drift + rng.normal(0, 0.003, count)
+    close = 10000.0 * np.exp(np.cumsum(returns))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    wick = np.abs(rng.normal(0, 0.002, (2, count)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.lognormal(3, 0.5, count)
+
+    index = pd.date_range(end=pd.Timestamp(end), periods=count, freq=f"{INTERVAL_SECONDS[interval]}s")
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close,
+                         'volume': volume, 'value': volume * close}, index=index)
+
+
+def fixture_path(directory, ticker, interval):
+    return os.path.join(directory, f"{ticker}_{interval}.csv")
+
+
+def load_ohlcv_fixtures(directory, interval='minute5'):
+    """directory 에 기록된 '<종목>_<시간봉>.csv' 캔들 파일을 모두 로드"""
+    candles = {}
+    if not os.path.isdir(directory):
+        return candles
+
+    suffix = f"_{interval}.csv"
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(suffix):
+            df = pd.read_csv(os.path.join(directory, filename), index_col=0, parse_dates=True)
+            candles[filename[:-len(suffix)]] = df
+    return candles
+
+
+def record_ohlcv_fixtures(directory, tickers, interval='minute5', count=2000):
+    """실제 Upbit 에서 캔들을 받아 재생용 CSV 로 기록 (네트워크 필요)"""
+    import pyupbit
+
+    os.makedirs(directory, exist_ok=True)
+    recorded = []
+    for ticker in tickers:
+        df = pyupbit.get_ohlcv(ticker, interval=interval, count=count)
+        if df is None or df.empty:
+            print(f"기록 실패: {ticker}")
+            continue
+        df.to_csv(fixture_path(directory, ticker, interval))
+        recorded.append(ticker)
+        print(f"기록 완료: {ticker} ({len(df)}개)")
+    return recorded
+
+
+def install_fake_pyupbit(fake):
+    """AutoTradingGUI 모듈이 사용하는 pyupbit 를 fake 로 교체하고 원래 모듈을 반환"""
+    original = Auto_trading_gui.pyupbit
+    Auto_trading_gui.pyupbit = fake
+    return original
+
+
+def install_shard_fake_pyupbit(candles, window=400):
+    """샤드 워커 프로세스 초기화 함수 (ShardedEngine initializer) - 워커 안에 자동 전진 FakePyupbit 설치"""
+    install_fake_pyupbit(FakePyupbit(candles, window, auto_advance=True))
+
+
+def create_headless_app(mode='SIMULATION', strategy='5분봉_50선_트레이딩', timeframe_label='5분',
+                        tickers='KRW-BTC', trade_ratio='100', log_sink=None, decision_trace=False):
+    """위젯 없이 트레이딩 상태만 초기화된 AutoTradingGUI 인스턴스 생성 (decision_trace: LOG_DIR 판단 트레이스 기록 여부)"""
+    app = AutoTradingGUI.__new__(AutoTradingGUI)
+    app.master = HeadlessMaster()
+    app.access_key = None
+    app.secret_key = None
+    app.upbit = None
+    app._init_trading_state()
+    app.candle_archive = None
+    if not decision_trace:
+        app.decision_trace = None
+
+    app.status_text = HeadlessVar("시작 대기 중")
+    app.balance_text = HeadlessVar("")
+    app.mode_var = HeadlessVar(mode)
+    app.strategy_var = HeadlessVar(strategy)
+    app.ma_timeframe_var = HeadlessVar(timeframe_label)
+    app.trade_ratio_var = HeadlessVar(trade_ratio)
+    app.trade_ratio = int(trade_ratio)
+    app.ticker_input_var = HeadlessVar(tickers)
+    app.auto_select_var = HeadlessVar(False)
+    app.align_candle_var = HeadlessVar(False)
+    app.data_load_time_var = HeadlessVar('10')
+    app.log_save_time_var = HeadlessVar('24')
+    app.chart_mode_var = HeadlessVar(CHART_MODE_RECENT)
+    app.engine_var = HeadlessVar(ENGINE_THREAD)
+
+    app._log_no_source = log_sink if log_sink is not None else (lambda message: None)
+    return app
+
+
+def attach_headless_chart(app):
+    """Agg 캔버스를 붙여 _draw_chart 를 화면 없이 렌더링할 수 있게 함"""
+    app.fig = Figure(figsize=(12, 4), dpi=100, facecolor='#0d1117')
+    app.ax = app.fig.add_subplot(111)
+    app.canvas = FigureCanvasAgg(app.fig)
+    return app
@@ -0,0 +1,648 @@
+"""Upbit 호환 로컬 모의 거래소 (오프라인 부하/지연 테스트용)
+
+pyupbit 가 사용하는 REST API 를 흉내 냅니다.
+- 시세: /v1/market/all, /v1/ticker, /v1/candles/{minutes/N, days, weeks} (종목명 시드 합성 캔들, 실제 시각 기준으로 진행)
+- 거래: /v1/accounts, POST /v1/orders (시장가 매수/매도), /v1/order, /v1/orders
+  주문은 wait 상태로 접수되어 --fill-delay 초 뒤 그 시점 가격(슬리피지/수수료 반영)으로 체결됩니다.
+- 요청 제한: 그룹별 초당 요청 수를 넘으면 429 와 Remaining-Req 헤더, --throttle 확률로 임의 429 주입
+- 지연 주입: --latency-ms (+ --jitter-ms) 만큼 응답 지연
+
+앱 연결 (API 키는 아무 값이나 사용):
+    python mock_upbit_server.py --tickers 300 --port 8765 --fill-delay 0.5
+    UPBIT_API_BASE_URL=http://127.0.0.1:8765 UPBIT_ACCESS_KEY=mock UPBIT_SECRET_KEY=mock python Auto_trading_gui.py
+
+부하 테스트 (서버와 헤드리스 앱을 한 프로세스에서 실행하여 데이터 경로/주문 경로 지연과 429 횟수 측정):
+    python mock_upbit_server.py --load-test --tickers 300 --rounds 2 --orders 50 --latency-ms 20 --throttle 0.02
+  사이클/주문은 그룹별 초당 제한 안에서 시작하고 (매도는 매수 체결 확인 후), 캔들을 받은 사이클이 절반 미만이거나
+  매도가 한 건도 없으면 실패(종료 코드 1)로 끝납니다.
+"""
+import argparse
+import heapq
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+import headless
+from Auto_trading_gui import CANDLE_BUFFER_SIZE, INTERVAL_SECONDS, KST_EPOCH, WEEK_ALIGN_OFFSET_SECONDS, candle_epoch_seconds
+
+HISTORY_CANDLES = 2000 # 서버 시작 시각 이전에 미리 만들어 두는 캔들 수
+FUTURE_SECONDS = 2 * 86400 # 서버 시작 이후 재생 가능한 시간
+MAX_CANDLE_COUNT = 200
+DEFAULT_CASH = 10_000_000
+DEFAULT_FEE_RATE = 0.0005
+MIN_ORDER_KRW = 5000
+RATE_LIMITS = {'market': 10, 'candles': 10, 'ticker': 10, 'default': 30, 'order': 8} # 그룹별 초당 요청 수 (Upbit 기준)
+TOO_MANY_REQUESTS = "Too many API requests."
+ORDER_FILL_TIMEOUT = 5.0 # 부하 테스트에서 매수 체결을 기다리는 최대 시간 (체결 지연에 더함, 초)
+PACE_MARGIN = 1.25 # 부하 테스트 요청 간격 = 그룹 초당 제한의 역수 × 이 값 (1초 창 경계 여유)
+DATA_MIN_SUCCESS = 0.5 # 부하 테스트 데이터 경로 최소 성공 비율 (캔들을 받은 사이클 / 전체 사이클)
+
+
+def mock_tickers(spec):
+    """'300' 이면 KRW-MOCK000 형식 합성 종목 300개, 아니면 쉼표로 구분된 종목 목록"""
+    spec = str(spec).strip()
+    if spec.isdigit():
+        return [f"KRW-MOCK{i:03d}" for i in range(int(spec))]
+    return [ticker.strip().upper() for ticker in spec.split(',') if ticker.strip()]
+
+
+def _iso(epoch):
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(epoch))
+
+
+class MockMarket:
+    """종목/시간봉별 합성 캔들 - 서버 시작 시각 기준 과거 HISTORY_CANDLES 개부터 FUTURE_SECONDS 뒤까지 미리 생성하고,
+    조회 시각에 시작된 캔들까지만 보여 줌 (진행 중인 마지막 캔들도 완성된 값으로 보임)"""
+
+    def __init__(self, tickers, started_at=None):
+        self.tickers = list(tickers)
+        self._known = set(self.tickers)
+        self.started_at = time.time() if started_at is None else started_at
+        self._series = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _align(epoch, interval):
+        seconds = INTERVAL_SECONDS[interval]
+        offset = WEEK_ALIGN_OFFSET_SECONDS if interval == 'week' else 0
+        return int(epoch - (epoch - offset) % seconds)
+
+    def series(self, ticker, interval):
+        """(캔들 시작 epoch 배열, OHLCV+거래대금 (6, n) 배열)"""
+        key = (ticker, interval)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.get(key)
+                if series is None:
+                    seconds = INTERVAL_SECONDS[interval]
+                    future = max(1, FUTURE_SECONDS // seconds)
+                    last_start = self._align(self.started_at, interval) + future * seconds
+                    df = headless.synthetic_ohlcv(ticker, count=HISTORY_CANDLES + future + 1, interval=interval,
+                                                  end=KST_EPOCH + pd.Timedelta(seconds=last_start))
+                    series = self._series[key] = (candle_epoch_seconds(df.index),
+                                                  df[['open', 'high', 'low', 'close', 'volume', 'value']].to_numpy().T.copy())
+        return series
+
+    def __contains__(self, ticker):
+        return ticker in self._known
+
+    def candles(self, ticker, interval, count, to_epoch, now):
+        """Upbit 캔들 응답 (최신 캔들부터, to_epoch 이전 시작 캔들만)"""
+        starts, values = self.series(ticker, interval)
+        end = int(np.searchsorted(starts, now, side='right'))
+        if to_epoch is not None:
+            end = min(end, int(np.searchsorted(starts, to_epoch, side='left')))
+        begin = max(0, end - count)
+
+        rows = []
+        for i in range(end - 1, begin - 1, -1):
+            start = int(starts[i])
+            rows.append({
+                'market': ticker,
+                'candle_date_time_utc': _iso(start),
+                'candle_date_time_kst': _iso(start + 9 * 3600),
+                'opening_price': float(values[0, i]),
+                'high_price': float(values[1, i]),
+                'low_price': float(values[2, i]),
+                'trade_price': float(values[3, i]),
+                'timestamp': int(min(now, start + INTERVAL_SECONDS[interval]) * 1000),
+                'candle_acc_trade_price': float(values[5, i]),
+                'candle_acc_trade_volume': float(values[4, i]),
+                'unit': INTERVAL_SECONDS[interval] // 60 if interval.startswith('minute') else 1,
+            })
+        return rows
+
+    def price(self, ticker, now):
+        """현재가 (진행 중인 5분봉 종가)"""
+        starts, values = self.series(ticker, 'minute5')
+        return float(values[3, max(0, int(np.searchsorted(starts, now, side='right')) - 1)])
+
+
+class MockExchange:
+    """단일 계좌 모의 거래 - 시장가 주문 접수 시 금액/수량을 묶어 두고 fill_delay 초 뒤 체결 스레드가 체결"""
+
+    def __init__(self, market, cash=DEFAULT_CASH, fee_rate=DEFAULT_FEE_RATE, slippage=0.0, fill_delay=0.0):
+        self.market = market
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.fill_delay = fill_delay
+        self.accounts = {'KRW': {'balance': float(cash), 'locked': 0.0, 'avg_buy_price': 0.0}}
+        self.orders = {}
+        self.filled = 0
+        self._pending = []
+        self._cond = threading.Condition()
+        self._running = True
+        self._matcher = threading.Thread(target=self._match_loop, name="MockMatcher", daemon=True)
+        self._matcher.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def _account(self, currency):
+        return self.accounts.setdefault(currency, {'balance': 0.0, 'locked': 0.0, 'avg_buy_price': 0.0})
+
+    def account_list(self):
+        with self._cond:
+            return [{'currency': currency, 'balance': f"{account['balance']:.8f}", 'locked': f"{account['locked']:.8f}",
+                     'avg_buy_price': f"{account['avg_buy_price']:.8f}", 'avg_buy_price_modified': False, 'unit_currency': 'KRW'}
+                    for currency, account in self.accounts.items() if account['balance'] or account['locked'] or currency == 'KRW']
+
+    def create_order(self, params, now):
+        """시장가 주문 접수 - (HTTP 상태, 응답) 반환"""
+        market = params.get('market', '')
+        side = params.get('side')
+        ord_type = params.get('ord_type')
+
+        if market not in self.market:
+            return 404, _error('market_does_not_exist', "마켓 정보가 존재하지 않습니다.")
+        if (side, ord_type) == ('bid', 'price'):
+            amount = _float(params.get('price'))
+            if amount is None or amount < MIN_ORDER_KRW:
+                return 400, _error('under_min_total_bid', "주문 요청 금액이 최소 주문 금액 미만입니다.")
+            locked_currency, locked = 'KRW', amount * (1 + self.fee_rate)
+        elif (side, ord_type) == ('ask', 'market'):
+            volume = _float(params.get('volume'))
+            if volume is None or volume <= 0 or volume * self.market.price(market, now) < MIN_ORDER_KRW:
+                return 400, _error('under_min_total_ask', "주문 요청 금액이 최소 주문 금액 미만입니다.")
+            locked_currency, locked = market.split('-')[1], volume
+        else:
+            return 400, _error('validation_error', "잘못된 API 요청입니다. (모의 거래소는 시장가 주문만 지원)")
+
+        with self._cond:
+            account = self._account(locked_currency)
+            if account['balance'] + 1e-9 < locked:
+                name = 'insufficient_funds_bid' if side == 'bid' else 'insufficient_funds_ask'
+                return 400, _error(name, "매수/매도 가능 잔고가 부족합니다.")
+            account['balance'] -= locked
+            account['locked'] += locked
+
+            order = {
+                'uuid': str(uuid.uuid4()), 'side': side, 'ord_type': ord_type, 'market': market, 'state': 'wait',
+                'price': params.get('price') if side == 'bid' else None, 'volume': params.get('volume') if side == 'ask' else None,
+                'remaining_volume': params.get('volume') if side == 'ask' else None, 'executed_volume': '0',
+                'reserved_fee': f"{locked - locked / (1 + self.fee_rate):.8f}" if side == 'bid' else '0',
+                'remaining_fee': '0', 'paid_fee': '0', 'locked': f"{locked:.8f}", 'trades_count': 0,
+                'created_at': _iso(now + 9 * 3600) + '+09:00', 'trades': [],
+            }
+            self.orders[order['uuid']] = order
+            heapq.heappush(self._pending, (now + self.fill_delay, order['uuid']))
+            self._cond.notify_all()
+        return 201, {key: value for key, value in order.items() if key != 'trades'}
+
+    def _match_loop(self):
+        with self._cond:
+            while self._running:
+                now = time.time()
+                while self._pending and self._pending[0][0] <= now:
+                    _, order_id = heapq.heappop(self._pending)
+                    self._fill(self.orders[order_id], now)
+                timeout = self._pending[0][0] - now if self._pending else None
+                self._cond.wait(timeout)
+
+    def _fill(self, order, now):
+        """주문 체결 (락 보유 상태에서 호출)"""
+        market = order['market']
+        coin = self._account(market.split('-')[1])
+        krw = self._account('KRW')
+
+        if order['side'] == 'bid':
+            price = self.market.price(market, now) * (1 + self.slippage)
+            locked = float(order['locked'])
+            funds = locked / (1 + self.fee_rate)
+            volume = math.floor(funds / price * 1e8) / 1e8 # Upbit 수량 단위 (소수점 8자리)
+            fee = locked - funds
+            krw['locked'] -= locked
+            total_cost = coin['avg_buy_price'] * coin['balance'] + funds
+            coin['balance'] += volume
+            coin['avg_buy_price'] = total_cost / coin['balance']
+        else:
+            price = self.market.price(market, now) * (1 - self.slippage)
+            volume = float(order['volume'])
+            funds = volume * price
+            fee = funds * self.fee_rate
+            coin['locked'] = max(0.0, coin['locked'] - volume)
+            krw['balance'] += funds - fee
+            if coin['balance'] <= 1e-12 and coin['locked'] <= 1e-12:
+                coin['avg_buy_price'] = 0.0
+
+        order.update(state='done', executed_volume=f"{volume:.8f}", remaining_volume='0', paid_fee=f"{fee:.8f}",
+                     trades_count=1, locked='0')
+        order['trades'] = [{'market': market, 'uuid': str(uuid.uuid4()), 'price': f"{price:.8f}", 'volume': f"{volume:.8f}",
+                            'funds': f"{funds:.8f}", 'side': order['side'], 'created_at': _iso(now + 9 * 3600) + '+09:00'}]
+        self.filled += 1
+
+    def get_order(self, order_id):
+        with self._cond:
+            order = self.orders.get(order_id)
+            return dict(order) if order is not None else None
+
+    def list_orders(self, market=None, state='wait'):
+        with self._cond:
+            return [{key: value for key, value in order.items() if key != 'trades'}
+                    for order in reversed(list(self.orders.values()))
+                    if (market is None or order['market'] == market) and (state is None or order['state'] == state)]
+
+
+class RateLimiter:
+    """그룹별 1초 창 요청 수 제한 (Remaining-Req 헤더 값 계산 포함)"""
+
+    def __init__(self, limits=RATE_LIMITS):
+        self.limits = dict(limits)
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, group, now):
+        """(허용 여부, Remaining-Req 헤더) 반환"""
+        limit = self.limits.get(group, self.limits['default'])
+        second = int(now)
+        with self._lock:
+            window, count = self._windows.get(group, (second, 0))
+            if window != second:
+                window, count = second, 0
+            allowed = count < limit
+            if allowed:
+                count += 1
+            self._windows[group] = (window, count)
+        remaining = max(0, limit - count)
+        return allowed, f"group={group}; min={limit * 60}; sec={remaining}"
+
+
+def _error(name, message):
+    return {'error': {'name': name, 'message': message}}
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class MockUpbitHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.mock.handle(self, 'GET')
+
+    def do_POST(self):
+        self.server.mock.handle(self, 'POST')
+
+    def do_DELETE(self):
+        self.server.mock.handle(self, 'DELETE')
+
+
+class MockUpbitServer:
+    """모의 거래소 HTTP 서버 (ThreadingHTTPServer, 별도 스레드에서 실행)"""
+
+    CANDLE_PATHS = {'/v1/candles/days': 'day', '/v1/candles/weeks': 'week'}
+
+    def __init__(self, tickers, host='127.0.0.1', port=0, cash=DEFAULT_CASH, fee_rate=DEFAULT_FEE_RATE, slippage=0.0,
+                 fill_delay=0.0, latency_ms=0.0, jitter_ms=0.0, throttle=0.0, rate_limits=RATE_LIMITS, seed=None):
+        self.market = MockMarket(tickers)
+        self.exchange = MockExchange(self.market, cash, fee_rate, slippage, fill_delay)
+        self.limiter = RateLimiter(rate_limits)
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.throttle = throttle
+        self._random = random.Random(seed)
+        self.stats = {'requests': 0, 'throttled': 0, 'injected_throttle': 0, 'errors': 0, 'paths': {}}
+        self._stats_lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), MockUpbitHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="MockUpbitServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.exchange.stop()
+
+    def _count(self, path, status):
+        with self._stats_lock:
+            self.stats['requests'] += 1
+            self.stats['paths'][path] = self.stats['paths'].get(path, 0) + 1
+            if status == 429:
+                self.stats['throttled'] += 1
+            elif status >= 400:
+                self.stats['errors'] += 1
+
+    @staticmethod
+    def _group(method, path):
+        if path == '/v1/market/all':
+            return 'market'
+        if path.startswith('/v1/candles'):
+            return 'candles'
+        if path == '/v1/ticker':
+            return 'ticker'
+        if path == '/v1/orders' and method == 'POST':
+            return 'order'
+        return 'default'
+
+    def handle(self, request, method):
+        """요청 1건 처리 - 지연/요청 제한 적용 후 경로별 처리 결과를 JSON 으로 응답"""
+        parts = urlsplit(request.path)
+        path = parts.path.replace('//', '/')
+        pairs = parse_qsl(parts.query)
+        length = int(request.headers.get('Content-Length') or 0)
+        if length:
+            body = request.rfile.read(length).decode('utf-8')
+            if 'json' in (request.headers.get('Content-Type') or ''):
+                pairs += list(json.loads(body or '{}').items())
+            else:
+                pairs += parse_qsl(body)
+        params = {}
+        for key, value in pairs:
+            # 목록 파라미터(markets=A&markets=B)는 쉼표로 합침
+            params[key] = f"{params[key]},{value}" if key in params else value
+
+        if self.latency or self.jitter:
+            time.sleep(self.latency + self._random.uniform(0, self.jitter))
+
+        now = time.time()
+        allowed, remaining = self.limiter.acquire(self._group(method, path), now)
+        if allowed and self.throttle and self._random.random() < self.throttle:
+            allowed = False
+            with self._stats_lock:
+                self.stats['injected_throttle'] += 1
+
+        if not allowed:
+            status, payload = 429, TOO_MANY_REQUESTS
+        else:
+            try:
+                status, payload = self._route(method, path, params, request.headers, now)
+            except Exception as e:
+                status, payload = 500, _error('server_error', f"{type(e).__name__}: {e}")
+
+        self._count(path, status)
+        data = payload.encode('utf-8') if isinstance(payload, str) else json.dumps(payload).encode('utf-8')
+        request.send_response(status)
+        request.send_header('Content-Type', 'text/plain; charset=utf-8' if isinstance(payload, str) else 'application/json; charset=utf-8')
+        request.send_header('Content-Length', str(len(data)))
+        request.send_header('Remaining-Req', remaining)
+        request.end_headers()
+        request.wfile.write(data)
+
+    def _route(self, method, path, params, headers, now):
+        if path == '/v1/market/all':
+            return 200, [{'market': ticker, 'korean_name': ticker.split('-')[1], 'english_name': ticker.split('-')[1]}
+                         for ticker in self.market.tickers]
+
+        if path == '/v1/ticker':
+            markets = [market for market in params.get('markets', '').split(',') if market]
+            if not markets or any(market not in self.market for market in markets):
+                return 404, _error('not_found', "Code not found")
+            return 200, [{'market': market, 'trade_price': self.market.price(market, now), 'timestamp': int(now * 1000)}
+                         for market in markets]
+
+        if path.startswith('/v1/candles/'):
+            return self._candles(path, params, now)
+
+        if path == '/mock/stats':
+            return 200, self.snapshot()
+
+        if not (headers.get('Authorization') or '').startswith('Bearer '):
+            return 401, _error('jwt_verification', "JWT 토큰 검증에 실패했습니다.")
+
+        if path == '/v1/accounts' and method == 'GET':
+            return 200, self.exchange.account_list()
+        if path == '/v1/orders' and method == 'POST':
+            return self.exchange.create_order(params, now)
+        if path == '/v1/orders' and method == 'GET':
+            return 200, self.exchange.list_orders(params.get('market'), params.get('state', 'wait'))
+        if path == '/v1/order' and method == 'GET':
+            order = self.exchange.get_order(params.get('uuid'))
+            return (200, order) if order is not None else (404, _error('order_not_found', "주문을 찾지 못했습니다."))
+        return 404, _error('not_found', f"모의 거래소에서 지원하지 않는 API 입니다: {method} {path}")
+
+    def _candles(self, path, params, now):
+        interval = self.CANDLE_PATHS.get(path)
+        if interval is None and path.startswith('/v1/candles/minutes/'):
+            interval = f"minute{path.rsplit('/', 1)[1]}"
+        if interval not in INTERVAL_SECONDS:
+            return 404, _error('not_found', f"지원하지 않는 캔들 단위입니다: {path}")
+
+        market = params.get('market')
+        if market not in self.market:
+            return 404, _error('not_found', "Code not found")
+
+        count = min(MAX_CANDLE_COUNT, max(1, int(_float(params.get('count')) or MAX_CANDLE_COUNT)))
+        to_epoch = None
+        if params.get('to'):
+            # pyupbit 는 UTC 기준 'YYYY-MM-DD HH:MM:SS' 로 보냄
+            to_epoch = (pd.Timestamp(params['to']).tz_localize(None) - pd.Timestamp('1970-01-01')) // pd.Timedelta(seconds=1)
+        return 200, self.market.candles(market, interval, count, to_epoch, now)
+
+    def snapshot(self):
+        with self._stats_lock:
+            stats = {key: (dict(value) if isinstance(value, dict) else value) for key, value in self.stats.items()}
+        stats['orders'] = len(self.exchange.orders)
+        stats['filled'] = self.exchange.filled
+        return stats
+
+
+def run_load_test(server, args):
+    """서버에 헤드리스 앱(TRADING 모드)을 연결하여 데이터 경로(트레이딩 사이클)와 주문 경로(매수→체결 대기→매도)를 측정"""
+    import pyupbit
+    from Auto_trading_gui import set_upbit_api_base_url
+
+    set_upbit_api_base_url(server.url)
+    tickers = server.market.tickers
+    app = headless.create_headless_app(mode='TRADING', tickers=','.join(tickers), trade_ratio=str(args.trade_ratio))
+    app.upbit = pyupbit.Upbit('mock-access-key', 'mock-secret-key-for-load-test-only')
+
+    # 데이터 경로: 캔들 그룹 초당 제한 안에서 사이클을 시작하고, 캔들을 실제로 받은 사이클만 처리량에 포함
+    # (첫 조회는 MAX_CANDLE_COUNT 개씩 나눠 요청하므로 사이클당 요청 수만큼 간격을 늘림.
+    #  pyupbit.get_ohlcv 는 429 등 오류를 삼키고 None 을 돌려주므로 스레드별로 응답을 기록)
+    requests_per_cycle = math.ceil(CANDLE_BUFFER_SIZE / MAX_CANDLE_COUNT)
+    data_pace = _pacer(PACE_MARGIN * requests_per_cycle / server.limiter.limits.get('candles', server.limiter.limits['default']))
+    fetched = threading.local()
+    get_ohlcv = pyupbit.get_ohlcv
+
+    def recorded_get_ohlcv(*args, **kwargs):
+        df = get_ohlcv(*args, **kwargs)
+        fetched.ok = df is not None and not df.empty
+        return df
+
+    def cycle(ticker):
+        # 트레이딩 루프와 같이 사이클 예외(요청 제한 등)는 loop_error 로 집계하고 다음 종목 진행
+        data_pace()
+        fetched.ok = False
+        try:
+            with app.metrics.timer('cycle'):
+                app._run_trading_cycle(ticker, '5분봉_50선_트레이딩', 'TRADING', 'minute5')
+        except Exception:
+            app.metrics.increment('loop_error')
+        app.master.discard_pending()
+        return fetched.ok
+
+    pyupbit.get_ohlcv = recorded_get_ohlcv
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.workers) as pool:
+            data_ok = sum(sum(pool.map(cycle, tickers)) for _ in range(args.rounds))
+        data_seconds = time.perf_counter() - started
+    finally:
+        pyupbit.get_ohlcv = get_ohlcv
+
+    # 주문 경로: 주문 그룹 초당 제한 안에서 제출하고, 매수 주문이 체결된 뒤(대기 주문 없음) 매도
+    order_tickers = tickers[:args.orders]
+    pace = _pacer(PACE_MARGIN / server.limiter.limits.get('order', server.limiter.limits['default']))
+    # 체결 확인 조회(default 그룹)는 모든 스레드가 동시에 조회해도 그룹 초당 제한 안에 들도록 간격 설정
+    poll_interval = args.workers * PACE_MARGIN / server.limiter.limits['default']
+
+    def wait_filled(ticker):
+        deadline = time.monotonic() + server.exchange.fill_delay + ORDER_FILL_TIMEOUT
+        time.sleep(server.exchange.fill_delay)
+        while time.monotonic() < deadline:
+            waiting = app.metrics.call('get_order', app.upbit.get_order, ticker, state='wait')
+            if isinstance(waiting, list) and not waiting:
+                return True
+            time.sleep(poll_interval)
+        return False
+
+    def round_trip(ticker):
+        """(매수 성공, 매도 성공) - 매수 실패/체결 시간 초과면 매도하지 않음"""
+        pace()
+        if not app._execute_buy(ticker, server.market.price(ticker, time.time())):
+            return False, False
+        if not wait_filled(ticker):
+            app.metrics.increment('fill_timeout')
+            return True, False
+        pace()
+        app._execute_sell(ticker)
+        return True, ticker not in app.positions
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.workers) as pool:
+        results = list(pool.map(round_trip, order_tickers))
+    order_seconds = time.perf_counter() - started
+    time.sleep(server.exchange.fill_delay + 0.05)
+
+    set_upbit_api_base_url(None)
+    return {
+        'tickers': len(tickers),
+        'cycles': len(tickers) * args.rounds,
+        'data_seconds': data_seconds,
+        'data_ok': data_ok,
+        'cycles_per_second': data_ok / data_seconds if data_seconds else 0.0,
+        'orders': len(order_tickers),
+        'bought': sum(1 for bought, _ in results if bought),
+        'sold': sum(1 for _, sold in results if sold),
+        'order_seconds': order_seconds,
+        'client': app.metrics.snapshot(),
+        'server': server.snapshot(),
+    }
+
+
+def _pacer(interval):
+    """여러 스레드의 호출을 interval 초 간격으로 한 건씩 통과시키는 대기 함수 반환"""
+    lock = threading.Lock()
+    next_at = [time.monotonic()]
+
+    def wait():
+        with lock:
+            now = time.monotonic()
+            at = max(now, next_at[0])
+            next_at[0] = at + interval
+        time.sleep(max(0.0, at - now))
+    return wait
+
+
+def print_load_report(report):
+    print(f"데이터 경로: 종목 {report['tickers']}개 × 사이클 {report['cycles'] // max(1, report['tickers'])}회 = "
+          f"{report['cycles']:,}회 (캔들 수신 {report['data_ok']:,}회), {report['data_seconds']:.2f}초 "
+          f"(캔들 수신 기준 {report['cycles_per_second']:,.1f} 사이클/초)")
+    print(f"주문 경로: 매수 {report['bought']}/{report['orders']}건, 매도 {report['sold']}건, {report['order_seconds']:.2f}초")
+    print()
+    print(f"{'구간':<24} {'횟수':>7} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'최대(ms)':>9}")
+    for stage, stats in report['client']['stages'].items():
+        print(f"{stage:<24} {stats['count']:>7} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['max_ms']:>9.2f}")
+
+    counters = report['client']['counters']
+    if counters:
+        print()
+        print("앱 카운터: " + ", ".join(f"{name}={value}" for name, value in counters.items()))
+    server = report['server']
+    print(f"서버: 요청 {server['requests']:,}건, 429 {server['throttled']:,}건 (주입 {server['injected_throttle']:,}건), "
+          f"오류 {server['errors']:,}건, 주문 {server['orders']}건 (체결 {server['filled']}건)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upbit 호환 로컬 모의 거래소")
+    parser.add_argument('--tickers', default='50', help="합성 종목 수 또는 종목 목록 (쉼표 구분)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help="0 이면 빈 포트 자동 선택")
+    parser.add_argument('--cash', type=float, default=DEFAULT_CASH, help="계좌 초기 원화 잔고")
+    parser.add_argument('--fee-rate', type=float, default=DEFAULT_FEE_RATE)
+    parser.add_argument('--slippage', type=float, default=0.0, help="시장가 체결 슬리피지 비율")
+    parser.add_argument('--fill-delay', type=float, default=0.2, help="주문 접수 후 체결까지 걸리는 시간 (초)")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="모든 응답에 더할 지연 (ms)")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="지연에 더할 0~N ms 무작위 값")
+    parser.add_argument('--throttle', type=float, default=0.0, help="허용 범위 안의 요청에도 429 를 돌려줄 확률")
+    parser.add_argument('--no-rate-limit', action='store_true', help="그룹별 초당 요청 수 제한 해제")
+    parser.add_argument('--seed', type=int, help="지연/429 주입 난수 시드")
+    parser.add_argument('--load-test', action='store_true', help="헤드리스 앱을 붙여 부하 테스트 후 종료")
+    parser.add_argument('--rounds', type=int, default=1, help="부하 테스트 종목별 트레이딩 사이클 횟수")
+    parser.add_argument('--orders', type=int, default=20, help="부하 테스트 매수→매도 주문 종목 수")
+    parser.add_argument('--workers', type=int, default=8, help="부하 테스트 동시 요청 스레드 수")
+    parser.add_argument('--trade-ratio', type=int, default=1, help="부하 테스트 매수 시 사용할 잔고 비율 (%%)")
+    parser.add_argument('--json', help="부하 테스트 결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    rate_limits = {group: 10 ** 9 for group in RATE_LIMITS} if args.no_rate_limit else RATE_LIMITS
+    server = MockUpbitServer(mock_tickers(args.tickers), args.host, 0 if args.load_test else args.port, args.cash,
+                             args.fee_rate, args.slippage, args.fill_delay, args.latency_ms, args.jitter_ms,
+                             args.throttle, rate_limits, args.seed).start()
+
+    if args.load_test:
+        try:
+            report = run_load_test(server, args)
+        finally:
+            server.stop()
+        print_load_report(report)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        if report['data_ok'] < report['cycles'] * DATA_MIN_SUCCESS:
+            raise SystemExit(f"부하 테스트 실패: 캔들을 받은 사이클이 {report['data_ok']}/{report['cycles']}회입니다 (데이터 경로 미검증).")
+        if report['orders'] and not report['sold']:
+            raise SystemExit("부하 테스트 실패: 매도된 주문이 없습니다 (주문 경로 미검증).")
+        return
+
+    print(f"모의 거래소 실행 중: {server.url} (종목 {len(server.market.tickers)}개, 체결 지연 {args.fill_delay}초)")
+    print(f"앱 연결: UPBIT_API_BASE_URL={server.url} UPBIT_ACCESS_KEY=mock UPBIT_SECRET_KEY=mock python Auto_trading_gui.py")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
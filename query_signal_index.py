@@ -0,0 +1,71 @@
+"""신호 인덱스(캔들 보관소 signals.bin) 조회 도구
+
+캔들 보관소에 마감 캔들별로 기록된 5분봉 50선 전략 신호 플래그에서 조건이 맞은 캔들 목록이나 종목별 횟수를 출력합니다.
+여러 신호를 지정하면 모두 켜진 캔들만 찾습니다 (예: trend_ok,breakout = 매수 신호).
+
+사용 예:
+    python query_signal_index.py --signals buy --start 2024-01-01 --end 2024-01-31
+    python query_signal_index.py --signals stop_signal_1 --count
+    python query_signal_index.py --backfill --tickers KRW-BTC,KRW-ETH   # 보관소 캔들로 인덱스 생성/보충
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from Auto_trading_gui import CandleArchive, CANDLE_ARCHIVE_DIR, SIGNAL_NAMES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="신호 인덱스 조회")
+    parser.add_argument('--root', default=CANDLE_ARCHIVE_DIR, help="캔들 보관소 디렉터리")
+    parser.add_argument('--interval', default='minute5', help="캔들 시간봉 (기본: minute5)")
+    parser.add_argument('--tickers', help="조회할 종목 (쉼표 구분, 기본: 인덱스가 있는 전체 종목)")
+    parser.add_argument('--signals', default='buy', help=f"신호 이름 (쉼표 구분, 모두 충족): {', '.join(SIGNAL_NAMES)}")
+    parser.add_argument('--start', help="시작 시각 (KST, 포함)")
+    parser.add_argument('--end', help="종료 시각 (KST, 포함)")
+    parser.add_argument('--count', action='store_true', help="종목별 횟수만 출력")
+    parser.add_argument('--backfill', action='store_true', help="조회 전에 보관소 캔들로 인덱스 보충")
+    parser.add_argument('--tail', type=int, default=50, help="출력할 마지막 캔들 수 (0: 전체)")
+    parser.add_argument('--csv', help="전체 결과를 저장할 CSV 경로")
+    args = parser.parse_args()
+
+    try:
+        mask = 0
+        for name in args.signals.split(','):
+            if name.strip():
+                mask |= SIGNAL_NAMES[name.strip().lower()]
+    except KeyError as e:
+        parser.error(f"알 수 없는 신호: {e.args[0]}")
+
+    index = CandleArchive(args.root).signals
+    if args.tickers:
+        tickers = [t.strip().upper() for t in args.tickers.split(',') if t.strip()]
+    elif args.backfill and os.path.isdir(args.root):
+        tickers = sorted(t for t in os.listdir(args.root) if os.path.isdir(os.path.join(args.root, t, args.interval)))
+    else:
+        tickers = index.tickers(args.interval)
+
+    if args.backfill:
+        for ticker in tickers:
+            added = index.update(ticker, args.interval)
+            print(f"인덱스 보충: {ticker} {added:,}개")
+
+    if args.count:
+        counts = pd.Series(index.count(tickers, args.interval, mask, args.start, args.end), name='count', dtype='int64')
+        print(counts.to_string() if len(counts) else "인덱스가 있는 종목이 없습니다.")
+        print(f"합계: {counts.sum():,}")
+        return
+
+    df = index.query(tickers, args.interval, mask, args.start, args.end)
+    print(f"캔들 {len(df):,}개 / 종목 {df['ticker'].nunique()}개 ({args.signals})")
+    if args.csv:
+        df.to_csv(args.csv, index=False, encoding='utf-8-sig')
+        print(f"저장: {args.csv}")
+    else:
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(df if args.tail == 0 else df.tail(args.tail))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""판단 트레이스(DECISION_TRACE_*.bin) 조회 도구
+
+트레이딩 중 매 틱 기록된 전략 판단(시각, 캔들, 종목, 판단, 사유, 신호 플래그, 가격, 수익률)을 표/CSV 로 출력합니다.
+
+사용 예:
+    python read_decision_trace.py ../TRADING_LOG/DECISION_TRACE_20240101_090000.bin
+    python read_decision_trace.py trace.bin --ticker KRW-BTC --changes
+    python read_decision_trace.py trace.bin --csv trace.csv
+"""
+import argparse
+
+import pandas as pd
+
+from Auto_trading_gui import DecisionTrace
+
+
+def main():
+    parser = argparse.ArgumentParser(description="판단 트레이스 조회")
+    parser.add_argument('path', help="DECISION_TRACE_*.bin 파일 경로")
+    parser.add_argument('--ticker', help="특정 종목만 출력")
+    parser.add_argument('--changes', action='store_true', help="종목별로 판단/사유가 바뀐 틱만 출력")
+    parser.add_argument('--tail', type=int, default=50, help="출력할 마지막 레코드 수 (0: 전체)")
+    parser.add_argument('--csv', help="전체 결과를 저장할 CSV 경로")
+    args = parser.parse_args()
+
+    df = DecisionTrace.read(args.path)
+    if args.ticker:
+        df = df[df['ticker'] == args.ticker.upper()]
+    if args.changes:
+        state = df['action'] + '|' + df['reason']
+        df = df[state != state.groupby(df['ticker']).shift()]
+
+    print(f"레코드 {len(df):,}건 / 종목 {df['ticker'].nunique()}개")
+    if args.csv:
+        df.to_csv(args.csv, index=False, encoding='utf-8-sig')
+        print(f"저장: {args.csv}")
+    else:
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(df if args.tail == 0 else df.tail(args.tail))
+
+
+if __name__ == "__main__":
+    main()
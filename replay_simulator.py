@@ -0,0 +1,254 @@
+"""보관된 캔들을 가상 시계로 재생하는 결정적(deterministic) 모의 매매 시뮬레이터
+
+실제 트레이딩 루프(_run_trading_loop → _run_trading_cycle → _strategy_5min_ma50)를 그대로 실행하되,
+- pyupbit 는 ReplayPyupbit 로 교체되어 가상 시각까지 마감된 캔들만 반환하고
+- 루프의 캔들 마감 대기는 VirtualClock 기반 TradingScheduler 가 즉시 시간만 전진시키며
+- 가상 매수/매도는 앱의 PaperLedger 가 수수료/슬리피지 모델로 체결하여 손익을 집계합니다.
+
+사용 예:
+    python replay_simulator.py KRW-BTC --start 2024-01-01 --end 2024-01-02
+    python replay_simulator.py KRW-BTC,KRW-ETH --fixtures bench_fixtures --report replay.json
+    python replay_simulator.py KRW-TEST --synthetic --days 3
+    python replay_simulator.py KRW-TEST --synthetic --days 3 --profile   # LOG_DIR 에 collapsed-stack 저장
+    python replay_simulator.py KRW-TEST --synthetic --days 3 --trace     # LOG_DIR 에 매 틱 판단 트레이스 저장
+"""
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+import headless
+from headless import create_headless_app, install_fake_pyupbit
+from Auto_trading_gui import (CandleArchive, PaperLedger, TradingScheduler, VirtualClock,
+                              INTERVAL_SECONDS, KST_EPOCH, candle_epoch_seconds)
+
+WARMUP_CANDLES = 200
+DEFAULT_FEE_RATE = 0.0005
+DEFAULT_SLIPPAGE = 0.0005
+
+
+class ReplayPyupbit:
+    """pyupbit 대체 - 가상 시계 기준으로 이미 마감된 캔들만 조회되도록 재생"""
+
+    def __init__(self, candles, clock, interval):
+        self.candles = candles
+        self.clock = clock
+        self.close_epochs = {ticker: candle_epoch_seconds(df.index) + INTERVAL_SECONDS[interval]
+                             for ticker, df in candles.items()}
+
+    def _visible(self, ticker):
+        return int(np.searchsorted(self.close_epochs[ticker], self.clock.time(), side='right'))
+
+    def get_tickers(self, fiat="", is_details=False, limit_info=False, verbose=False):
+        return list(self.candles)
+
+    def get_ohlcv(self, ticker="KRW-BTC", interval="day", count=200, to=None, period=0.1):
+        if ticker not in self.candles:
+            return None
+        end = self._visible(ticker)
+        if end == 0:
+            return None
+        return self.candles[ticker].iloc[max(0, end - count):end].copy()
+
+    def get_current_price(self, ticker="KRW-BTC", limit_info=False, verbose=False):
+        if ticker not in self.candles:
+            return None
+        end = self._visible(ticker)
+        if end == 0:
+            return None
+        return float(self.candles[ticker]['close'].iloc[end - 1])
+
+
+class ReplaySession:
+    """종목 하나에 대한 리플레이 실행 및 체결/손익 집계"""
+
+    def __init__(self, ticker, candles, interval='minute5', strategy='5분봉_50선_트레이딩', cash=1_000_000,
+                 trade_ratio=100, fee_rate=DEFAULT_FEE_RATE, slippage=DEFAULT_SLIPPAGE, start=None, end=None, verbose=False,
+                 profile=False, trace=False):
+        self.ticker = ticker
+        self.candles = candles
+        self.interval = interval
+        self.strategy = strategy
+        self.initial_cash = float(cash)
+        self.trade_ratio = trade_ratio
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.verbose = verbose
+        self.profile = profile
+        self.profile_path = None
+        self.trace = trace
+        self.trace_path = None
+
+        close_epochs = candle_epoch_seconds(candles.index) + INTERVAL_SECONDS[interval]
+        first_ready = close_epochs[min(WARMUP_CANDLES, len(close_epochs)) - 1]
+        self.start_epoch = max(first_ready, self._to_epoch(start)) if start is not None else first_ready
+        self.end_epoch = min(close_epochs[-1], self._to_epoch(end)) if end is not None else close_epochs[-1]
+
+        self.equity_curve = []
+        self.cycles = 0
+
+    @staticmethod
+    def _to_epoch(value):
+        return int((pd.Timestamp(value) - KST_EPOCH) // pd.Timedelta(seconds=1))
+
+    def _timestamp(self):
+        return (KST_EPOCH + pd.Timedelta(seconds=self.clock.time())).strftime("%Y-%m-%d %H:%M:%S")
+
+    def _log(self, message):
+        if self.verbose:
+            print(f"[{self._timestamp()}] {message}")
+
+    def _on_cycle_end(self, seconds):
+        """가상 시각이 진행되기 직전 (다음 캔들 마감 대기) - 평가금액 기록 및 종료 판정"""
+        self.cycles += 1
+        self.app.master.discard_pending()
+
+        self.equity_curve.append(self.ledger.equity())
+
+        if self.clock.time() + seconds > self.end_epoch:
+            self.app.trading_active = False
+
+    def run(self):
+        """리플레이 실행 후 손익 보고서(dict) 반환"""
+        self.clock = VirtualClock(self.start_epoch, on_sleep=self._on_cycle_end)
+        self.fake = ReplayPyupbit({self.ticker: self.candles}, self.clock, self.interval)
+        self.app = create_headless_app(mode='SIMULATION', strategy=self.strategy, tickers=self.ticker,
+                                       trade_ratio=str(self.trade_ratio), log_sink=self._log, decision_trace=self.trace)
+        self.app.clock = self.clock
+        self.app.scheduler = TradingScheduler(self.clock)
+        self.app._jitter_random = random.Random(0)
+        self.ledger = self.app.paper_ledger = PaperLedger(self.initial_cash, self.fee_rate, self.slippage)
+
+        original = install_fake_pyupbit(self.fake)
+        if self.profile:
+            self.app._start_profiler()
+        started = time.perf_counter()
+        try:
+            self.app.trading_active = True
+            self.app._run_trading_loop(INTERVAL_SECONDS[self.interval], self.strategy, self.interval,
+                                       [self.ticker], False, 'SIMULATION', align=True) # 캔들 마감 시점마다 판단
+        finally:
+            install_fake_pyupbit(original)
+            if self.profile:
+                self.profile_path = self.app._stop_profiler(wait=True)
+            if self.trace:
+                self.trace_path = self.app.decision_trace.close()
+        wall_seconds = time.perf_counter() - started
+
+        return self._report(wall_seconds)
+
+    def _report(self, wall_seconds):
+        closes = self.candles['close']
+        first_price = float(closes.iloc[min(WARMUP_CANDLES, len(closes)) - 1])
+        last_price = self.fake.get_current_price(self.ticker) or first_price
+        self.ledger.mark(self.ticker, last_price)
+        summary = self.ledger.summary()
+
+        equity = np.asarray(self.equity_curve) if self.equity_curve else np.asarray([self.initial_cash])
+        peaks = np.maximum.accumulate(equity)
+        max_drawdown = float(((equity - peaks) / peaks).min() * 100)
+
+        fills = self.ledger.fills_frame()
+        sells = fills[fills['side'] == PaperLedger.SIDE_SELL]
+        trades = [{'time': row.time.strftime("%Y-%m-%d %H:%M:%S"), 'side': 'buy' if row.side == PaperLedger.SIDE_BUY else 'sell',
+                   'price': row.price, 'quantity': row.quantity, 'fee': row.fee, 'realized_pnl': row.realized_pnl, 'cash': row.cash}
+                  for row in fills.itertuples()]
+        position = self.ledger.position(self.ticker)
+
+        return {
+            'ticker': self.ticker,
+            'interval': self.interval,
+            'start': (KST_EPOCH + pd.Timedelta(seconds=int(self.start_epoch))).strftime("%Y-%m-%d %H:%M:%S"),
+            'end': (KST_EPOCH + pd.Timedelta(seconds=int(self.end_epoch))).strftime("%Y-%m-%d %H:%M:%S"),
+            'cycles': self.cycles,
+            'fee_rate': self.fee_rate,
+            'slippage': self.slippage,
+            'initial_cash': self.initial_cash,
+            'final_equity': summary['equity'],
+            'return_pct': summary['return_pct'],
+            'realized_pnl': summary['realized_pnl'],
+            'unrealized_pnl': summary['unrealized_pnl'],
+            'buy_and_hold_pct': (last_price / first_price - 1) * 100,
+            'max_drawdown_pct': max_drawdown,
+            'fees': summary['fees'],
+            'trades': trades,
+            'sells': len(sells),
+            'win_rate_pct': float((sells['realized_pnl'] > 0).mean() * 100) if len(sells) else 0.0,
+            'open_quantity': float(position['quantity']) if position is not None else 0.0,
+            'wall_seconds': wall_seconds,
+            'profile_path': self.profile_path,
+            'trace_path': self.trace_path,
+        }
+
+
+def load_candles(ticker, args):
+    """리플레이 입력 캔들 로드 (합성 / fixture CSV / 로컬 캔들 저장소 순)"""
+    if args.synthetic:
+        count = args.days * 86400 // INTERVAL_SECONDS[args.interval] + WARMUP_CANDLES
+        return headless.synthetic_ohlcv(ticker, count=count, interval=args.interval)
+
+    if args.fixtures:
+        return headless.load_ohlcv_fixtures(args.fixtures, args.interval).get(ticker)
+
+    warmup_start = None
+    if args.start:
+        warmup_start = pd.Timestamp(args.start) - pd.Timedelta(seconds=INTERVAL_SECONDS[args.interval] * WARMUP_CANDLES)
+    return CandleArchive().load(ticker, args.interval, warmup_start, args.end)
+
+
+def print_report(report):
+    print(f"=== {report['ticker']} ({report['interval']}) {report['start']} ~ {report['end']} ===")
+    print(f"사이클: {report['cycles']:,}회 / 체결: {len(report['trades'])}건 (매도 {report['sells']}건, 승률 {report['win_rate_pct']:.1f}%)")
+    print(f"최종 평가금액: {report['final_equity']:,.0f} 원 (수익률 {report['return_pct']:+.2f}%, 단순 보유 {report['buy_and_hold_pct']:+.2f}%)")
+    print(f"실현 손익: {report['realized_pnl']:+,.0f} 원 / 평가 손익: {report['unrealized_pnl']:+,.0f} 원")
+    print(f"최대 낙폭: {report['max_drawdown_pct']:.2f}% / 수수료 합계: {report['fees']:,.0f} 원")
+    print(f"재생 소요 시간: {report['wall_seconds']:.2f}초")
+    if report['profile_path']:
+        print(f"프로파일링 결과: {report['profile_path']}")
+    if report['trace_path']:
+        print(f"판단 트레이스: {report['trace_path']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캔들 리플레이 모의 매매 시뮬레이터")
+    parser.add_argument('tickers', help="재생할 종목 (쉼표 구분)")
+    parser.add_argument('--interval', default='minute5')
+    parser.add_argument('--strategy', default='5분봉_50선_트레이딩')
+    parser.add_argument('--start', help="재생 시작 시각 (KST, 예: 2024-01-01 09:00)")
+    parser.add_argument('--end', help="재생 종료 시각 (KST)")
+    parser.add_argument('--cash', type=float, default=1_000_000, help="초기 가상 원화 잔고")
+    parser.add_argument('--trade-ratio', type=int, default=100, help="매수 시 사용할 잔고 비율 (%%)")
+    parser.add_argument('--fee-rate', type=float, default=DEFAULT_FEE_RATE, help="체결 금액 대비 수수료율")
+    parser.add_argument('--slippage', type=float, default=DEFAULT_SLIPPAGE, help="시장가 체결 슬리피지 비율")
+    parser.add_argument('--fixtures', help="캔들 저장소 대신 사용할 fixture CSV 디렉터리")
+    parser.add_argument('--synthetic', action='store_true', help="합성 캔들로 재생 (오프라인 확인용)")
+    parser.add_argument('--days', type=int, default=1, help="--synthetic 사용 시 재생 일수")
+    parser.add_argument('--report', help="손익 보고서를 저장할 JSON 파일 경로")
+    parser.add_argument('--verbose', action='store_true', help="전략 로그를 가상 시각과 함께 출력")
+    parser.add_argument('--trace', action='store_true', help="매 틱 전략 판단을 LOG_DIR 에 바이너리 트레이스로 저장")
+    parser.add_argument('--profile', action='store_true', help="재생 중 샘플링 프로파일러를 켜고 LOG_DIR 에 collapsed-stack 저장")
+    args = parser.parse_args()
+
+    reports = []
+    for ticker in [t.strip().upper() for t in args.tickers.split(',') if t.strip()]:
+        candles = load_candles(ticker, args)
+        if candles is None or len(candles) < WARMUP_CANDLES:
+            print(f"{ticker}: 재생할 캔들이 부족합니다 (최소 {WARMUP_CANDLES}개 필요).")
+            continue
+
+        session = ReplaySession(ticker, candles, args.interval, args.strategy, args.cash, args.trade_ratio,
+                                args.fee_rate, args.slippage, args.start, args.end, args.verbose, args.profile, args.trace)
+        report = session.run()
+        print_report(report)
+        reports.append(report)
+
+    if args.report and reports:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import numpy as np
+
+from Auto_trading_gui import CandleBuffer, candle_epoch_seconds
+from headless import synthetic_ohlcv
+
+INTERVAL_SECONDS = 300
+
+
+def _assert_holds(buffer, df):
+    assert len(buffer) == len(df)
+    np.testing.assert_array_equal(buffer.epoch[-len(df):], candle_epoch_seconds(df.index))
+    np.testing.assert_array_equal(buffer.column('close'), df['close'].to_numpy(dtype=np.float32))
+
+
+def test_merge_overwrites_same_epoch_and_shifts_on_append():
+    df = synthetic_ohlcv('KRW-TEST', count=120)
+    buffer = CandleBuffer(capacity=100)
+    assert buffer.merge(df.iloc[:50]) == 50
+    _assert_holds(buffer, df.iloc[:50])
+
+    live = df.iloc[40:50].copy()
+    live.iloc[-1, live.columns.get_loc('close')] *= 1.01
+    assert buffer.merge(live) == 0
+    assert len(buffer) == 50
+    assert buffer.last_close == np.float32(live['close'].iloc[-1])
+
+    assert buffer.merge(df.iloc[45:60]) == 10
+    _assert_holds(buffer, df.iloc[:60])
+    assert buffer.merge(None) == 0 and buffer.merge(df.iloc[:0]) == 0
+
+
+def test_merge_past_capacity_keeps_newest_candles():
+    df = synthetic_ohlcv('KRW-TEST', count=300)
+    buffer = CandleBuffer(capacity=100)
+    buffer.merge(df.iloc[:80])
+    assert buffer.merge(df.iloc[80:150]) == 70
+    _assert_holds(buffer, df.iloc[50:150])
+
+    assert buffer.merge(df.iloc[150:]) == 100
+    _assert_holds(buffer, df.iloc[200:])
+
+
+def test_missing_count_covers_gap_and_live_candle():
+    df = synthetic_ohlcv('KRW-TEST', count=200)
+    buffer = CandleBuffer(capacity=100)
+    assert buffer.missing_count(0, INTERVAL_SECONDS) == 100
+    buffer.merge(df.iloc[:60])
+    assert buffer.missing_count(0, INTERVAL_SECONDS) == 100
+
+    buffer.merge(df)
+    last = buffer.last_epoch
+    assert buffer.missing_count(last, INTERVAL_SECONDS) == 2
+    assert buffer.missing_count(last + 3 * INTERVAL_SECONDS + 10, INTERVAL_SECONDS) == 5
+    assert buffer.missing_count(last + 1000 * INTERVAL_SECONDS, INTERVAL_SECONDS) == 100
+
+
+def test_resize_keeps_newest_candles():
+    df = synthetic_ohlcv('KRW-TEST', count=150)
+    buffer = CandleBuffer(capacity=120)
+    buffer.merge(df)
+    assert not np.isnan(buffer.latest()[0])
+
+    buffer.resize(40)
+    assert buffer.capacity == 40
+    _assert_holds(buffer, df.iloc[-40:])
+    assert np.isnan(buffer.latest()[0]) # 캔들 40개 → MA50 계산 불가 (캐시 무효화 확인)
+
+    buffer.resize(200)
+    _assert_holds(buffer, df.iloc[-40:])
+    assert buffer.merge(df.iloc[-40:]) == 0
+    assert buffer.missing_count(buffer.last_epoch, INTERVAL_SECONDS) == 200
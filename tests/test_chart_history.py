@@ -0,0 +1,64 @@
+import numpy as np
+
+from Auto_trading_gui import ChartHistory, compute_indicators, decimate_ohlc
+from headless import synthetic_ohlcv
+
+
+def _assert_matches(history, df):
+    ma50, ma200, vwma100 = compute_indicators(df['close'].to_numpy(), df['volume'].to_numpy())
+    assert len(history) == len(df)
+    assert history.first_timestamp == df.index[0]
+    np.testing.assert_allclose(history.arrays['close'], df['close'].to_numpy())
+    np.testing.assert_allclose(history.ma50, ma50, equal_nan=True)
+    np.testing.assert_allclose(history.ma200, ma200, equal_nan=True)
+    np.testing.assert_allclose(history.vwma100, vwma100, equal_nan=True)
+
+
+def test_append_overwrites_last_bar_and_extends():
+    df = synthetic_ohlcv('KRW-TEST', count=1200)
+    history = ChartHistory('KRW-TEST', 'minute5')
+    assert history.append(df.iloc[:1000]) == 1000
+
+    live = df.iloc[700:1000].copy()
+    live.iloc[-1, live.columns.get_loc('close')] *= 1.01
+    assert history.append(live) == 0
+    assert history.arrays['close'][-1] == live['close'].iloc[-1]
+
+    for end in range(1001, 1201):
+        assert history.append(df.iloc[end - 300:end]) == 1
+    _assert_matches(history, df)
+
+
+def test_merge_prepends_older_candles():
+    df = synthetic_ohlcv('KRW-TEST', count=1000)
+    history = ChartHistory('KRW-TEST', 'minute5')
+    history.merge(df.iloc[600:])
+    assert history.merge(df.iloc[:610]) == 600
+    assert history.merge(df.iloc[:0]) == 0
+    _assert_matches(history, df)
+
+
+def test_decimate_ohlc_matches_groupby_per_column():
+    df = synthetic_ohlcv('KRW-TEST', count=2000)
+    x = np.arange(len(df), dtype=np.float64)
+    arrays = [df[column].to_numpy() for column in ('open', 'high', 'low', 'close')]
+    x0, x1, columns = 300.0, 1500.0, 97
+    result = decimate_ohlc(x, *arrays, x0, x1, columns)
+
+    # 화면 양 끝 바깥 캔들 하나씩 포함
+    window = df.iloc[299:1502].assign(x=x[299:1502], row=np.arange(299, 1502))
+    key = np.clip(((window['x'] - x0) / (x1 - x0) * columns).astype(np.int64), -1, columns)
+    expected = window.groupby(key.to_numpy(), sort=True).agg(
+        x=('x', 'first'), open=('open', 'first'), high=('high', 'max'), low=('low', 'min'), close=('close', 'last'), last=('row', 'last'))
+    assert len(expected) <= columns + 2
+    for column in ('x', 'open', 'high', 'low', 'close', 'last'):
+        np.testing.assert_array_equal(result[column], expected[column].to_numpy(), err_msg=column)
+
+
+def test_decimate_ohlc_passes_through_sparse_range():
+    df = synthetic_ohlcv('KRW-TEST', count=100)
+    x = np.arange(len(df), dtype=np.float64)
+    arrays = [df[column].to_numpy() for column in ('open', 'high', 'low', 'close')]
+    result = decimate_ohlc(x, *arrays, 10.0, 40.0, 200)
+    np.testing.assert_array_equal(result['last'], np.arange(9, 42))
+    np.testing.assert_array_equal(result['high'], arrays[1][9:42])
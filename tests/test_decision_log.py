@@ -0,0 +1,42 @@
+from Auto_trading_gui import REASON_NONE, REASON_WAIT_TREND, DecisionLog
+
+
+def test_observe_emits_only_state_changes_with_repeat_count():
+    log = DecisionLog(summary_seconds=60)
+    assert log.observe('KRW-A', 'buy', 'wait', "대기 1") == "대기 1"
+    assert log.observe('KRW-A', 'buy', 'wait', "대기 2") is None
+    assert log.observe('KRW-A', 'buy', 'wait', "대기 3") is None
+    assert log.observe('KRW-B', 'buy', 'wait', "B 대기") == "B 대기"
+    assert log.observe('KRW-A', 'sell', 'wait', "매도 대기") == "매도 대기"
+    assert log.suppressed == 2
+
+    assert log.observe('KRW-A', 'buy', 'signal', "매수 신호") == "매수 신호 (직전 판단 2회 반복 생략)"
+    assert log.observe('KRW-A', 'buy', 'wait', "대기 4") == "대기 4"
+
+
+def test_summary_reports_repeats_once_per_period():
+    log = DecisionLog(summary_seconds=60)
+    assert log.summary(1000) == []
+    for i in range(3):
+        log.observe('KRW-A', 'buy', 'wait', f"매수 대기 {i}")
+        log.observe('KRW-A', 'sell', 'hold', f"보유 {i}")
+    log.observe('KRW-B', 'buy', 'wait', "B 대기")
+    assert log.summary(1059) == []
+
+    assert log.summary(1060) == ["판단 요약: KRW-A 지난 요약 이후 2회 반복 - 매수 대기 2 / 보유 2"]
+    assert log.summary(1200) == []
+    log.observe('KRW-A', 'buy', 'wait', "매수 대기 3")
+    assert log.summary(1259) == []
+    assert log.summary(1260) == ["판단 요약: KRW-A 지난 요약 이후 1회 반복 - 매수 대기 3"]
+
+
+def test_remove_forgets_ticker_state_and_reason():
+    log = DecisionLog()
+    log.observe('KRW-A', 'buy', 'wait', "대기")
+    log.set_reason('KRW-A', REASON_WAIT_TREND)
+    log.set_reason('KRW-B', REASON_WAIT_TREND)
+    log.remove('KRW-A')
+    assert log.pop_reason('KRW-B') == REASON_WAIT_TREND
+    assert log.pop_reason('KRW-B') == REASON_NONE
+    assert log.pop_reason('KRW-A') == REASON_NONE
+    assert log.observe('KRW-A', 'buy', 'wait', "대기") == "대기"
@@ -0,0 +1,79 @@
+import threading
+
+import numpy as np
+import pytest
+
+from Auto_trading_gui import SIGNAL_BUY, MarketScanner, candle_epoch_seconds, compute_signal_flags
+from headless import FakePyupbit, create_headless_app, install_fake_pyupbit, synthetic_ohlcv
+
+INTERVAL = 'minute5'
+WINDOW = 256
+
+
+def _buy_ends(df):
+    """매수 조건(SIGNAL_BUY)이 마지막 캔들에서 충족되는 구간 끝 위치 목록 (window 이상 쌓인 뒤)"""
+    flags = compute_signal_flags(*(df[column].to_numpy(dtype=np.float64) for column in ('open', 'high', 'low', 'close', 'volume')))
+    return [row + 1 for row in np.flatnonzero((flags & SIGNAL_BUY) == SIGNAL_BUY) if row + 1 >= WINDOW]
+
+
+def test_update_merges_overlap_and_keeps_newest_window():
+    df = synthetic_ohlcv('KRW-TEST', count=600)
+    scanner = MarketScanner(window=WINDOW)
+    scanner.update('KRW-TEST', df.iloc[:300])
+    live = df.iloc[290:300].copy()
+    live.iloc[-1, live.columns.get_loc('close')] *= 1.01
+    scanner.update('KRW-TEST', live)
+    assert scanner.block[3, 0, -1] == live['close'].iloc[-1]
+
+    scanner.update('KRW-TEST', df.iloc[299:450])
+    scanner.update('KRW-TEST', None)
+    np.testing.assert_array_equal(scanner.block[3, 0], df['close'].to_numpy()[450 - WINDOW:450])
+    assert scanner.last_candle_time('KRW-TEST') == candle_epoch_seconds(df.index[449:450])[0]
+    assert scanner.last_candle_time('KRW-NONE') is None
+
+
+def test_scan_ranks_buy_signals_by_trade_value():
+    ends = {}
+    for i in range(6):
+        df = synthetic_ohlcv(f'KRW-T{i}', count=1500)
+        buy_ends = _buy_ends(df)
+        ends[f'KRW-T{i}'] = (df, buy_ends[0] if i % 2 == 0 else buy_ends[0] + 1)
+
+    scanner = MarketScanner(window=WINDOW)
+    for ticker, (df, end) in ends.items():
+        scanner.update(ticker, df.iloc[max(0, end - 400):end - 20])
+        scanner.update(ticker, df.iloc[end - 30:end])
+
+    trade_value = {ticker: df['value'].iloc[end - WINDOW:end].sum() for ticker, (df, end) in ends.items()}
+    matched = sorted((ticker for ticker, (df, end) in ends.items() if end in _buy_ends(df)), key=lambda t: -trade_value[t])
+    assert len(matched) >= 3
+    results = scanner.scan()
+    assert [result['ticker'] for result in results] == matched
+    for result in results:
+        assert result['trade_value'] == pytest.approx(trade_value[result['ticker']])
+        assert result['flags'] & SIGNAL_BUY == SIGNAL_BUY
+
+    threshold = trade_value[matched[1]]
+    assert [result['ticker'] for result in scanner.scan(threshold)] == matched[:2]
+    scanner.remove(matched[0])
+    assert [result['ticker'] for result in scanner.scan()] == matched[1:]
+    df, end = ends[matched[1]]
+    assert scanner.last_candle_time(matched[1]) == candle_epoch_seconds(df.index[end - 1:end])[0]
+
+
+def test_refresh_counts_failed_markets_once_per_pass(monkeypatch):
+    monkeypatch.setattr('Auto_trading_gui.SCANNER_REQUEST_INTERVAL', 0)
+    universe = {ticker: synthetic_ohlcv(ticker, count=400) for ticker in ('KRW-A', 'KRW-B')}
+    original = install_fake_pyupbit(FakePyupbit(universe))
+    messages = []
+    app = create_headless_app(log_sink=messages.append)
+    scanner = MarketScanner()
+    try:
+        app._refresh_market_scan(scanner, ['KRW-A', 'KRW-GONE', 'KRW-B', 'KRW-MISSING'], INTERVAL, threading.Event())
+    finally:
+        install_fake_pyupbit(original)
+
+    assert sorted(scanner.tickers) == ['KRW-A', 'KRW-B']
+    assert app.metrics.snapshot()['counters']['scan_error'] == 2
+    failures = [message for message in messages if '캔들 조회 실패' in message]
+    assert len(failures) == 1 and '2개 / 4개' in failures[0]
@@ -0,0 +1,34 @@
+import argparse
+
+import pytest
+
+pytest.importorskip('pyupbit')
+
+from mock_upbit_server import MockUpbitServer, mock_tickers, run_load_test
+
+
+def _load_test(throttle=0.0, orders=3):
+    server = MockUpbitServer(mock_tickers(4), fill_delay=0.05, throttle=throttle, seed=7).start()
+    args = argparse.Namespace(rounds=1, orders=orders, workers=2, trade_ratio=1)
+    try:
+        return run_load_test(server, args)
+    finally:
+        server.stop()
+
+
+def test_load_test_round_trips_every_order():
+    report = _load_test()
+    assert report['data_ok'] == report['cycles'] == 4
+    assert report['bought'] == report['orders'] == 3
+    assert report['sold'] == 3
+    assert report['server']['filled'] == 6
+    assert report['client']['counters'].get('fill_timeout', 0) == 0
+
+
+def test_throttled_load_test_reports_counts():
+    report = _load_test(throttle=0.3, orders=4)
+    assert isinstance(report['bought'], int) and isinstance(report['sold'], int)
+    assert 0 <= report['data_ok'] <= report['cycles']
+    assert report['cycles_per_second'] * report['data_seconds'] == pytest.approx(report['data_ok'])
+    assert 0 <= report['sold'] <= report['bought'] <= report['orders']
+    assert report['server']['injected_throttle'] > 0
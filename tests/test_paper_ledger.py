@@ -0,0 +1,105 @@
+import threading
+
+import pytest
+
+from Auto_trading_gui import PaperLedger
+from headless import create_headless_app
+
+
+def test_buy_sell_round_trip_accounts_fees():
+    ledger = PaperLedger(cash=1_000_000, fee_rate=0.001)
+    quantity = ledger.buy('KRW-BTC', 10_000, 100_000, epoch=1)
+    assert quantity == pytest.approx((100_000 - 100) / 10_000)
+    assert ledger.cash == pytest.approx(900_000)
+
+    realized = ledger.sell('KRW-BTC', 11_000, 1.0, epoch=2)
+    proceeds = quantity * 11_000
+    assert realized == pytest.approx(proceeds * 0.999 - 100_000)
+    assert ledger.cash == pytest.approx(900_000 + proceeds * 0.999)
+    assert ledger.position('KRW-BTC')['quantity'] == 0
+
+    summary = ledger.summary()
+    assert summary['fills'] == 2
+    assert summary['equity'] == pytest.approx(ledger.cash)
+    assert summary['realized_pnl'] == pytest.approx(realized)
+    assert summary['fees'] == pytest.approx(100 + proceeds * 0.001)
+
+
+def test_half_sell_keeps_proportional_cost():
+    ledger = PaperLedger(cash=100_000, fee_rate=0.0)
+    quantity = ledger.buy('KRW-ETH', 1_000, 50_000)
+    ledger.sell('KRW-ETH', 1_000, 0.5)
+    position = ledger.position('KRW-ETH')
+    assert position['quantity'] == pytest.approx(quantity / 2)
+    assert position['cost'] == pytest.approx(25_000)
+    assert ledger.equity() == pytest.approx(100_000)
+
+
+def test_buy_is_capped_by_cash_and_rejects_empty_orders():
+    ledger = PaperLedger(cash=10_000, fee_rate=0.0)
+    assert ledger.buy('KRW-XRP', 100, 50_000) == pytest.approx(100)
+    assert ledger.cash == 0
+    assert ledger.buy('KRW-XRP', 100, 1_000) == 0.0
+    assert ledger.sell('KRW-DOGE', 100) == 0.0
+    assert ledger.fill_count == 1
+
+
+def test_fills_frame_round_trip():
+    ledger = PaperLedger(cash=100_000)
+    ledger.buy('KRW-BTC', 1_000, 10_000, epoch=0)
+    ledger.buy('KRW-ETH', 2_000, 10_000, epoch=60)
+    ledger.sell('KRW-BTC', 1_100, 1.0, epoch=120)
+    fills = ledger.fills_frame()
+    assert list(fills['ticker']) == ['KRW-BTC', 'KRW-ETH', 'KRW-BTC']
+    assert list(fills['side']) == [PaperLedger.SIDE_BUY, PaperLedger.SIDE_BUY, PaperLedger.SIDE_SELL]
+    assert fills['cash'].iloc[-1] == pytest.approx(ledger.cash)
+
+
+@pytest.mark.parametrize('trade_ratio, cash', [('0', 1_000_000), ('100', 0)])
+def test_zero_paper_fill_does_not_open_position(trade_ratio, cash):
+    app = create_headless_app(trade_ratio=trade_ratio)
+    app.paper_ledger = PaperLedger(cash=cash)
+    assert app._paper_buy('KRW-BTC', 10_000) is False
+    assert 'KRW-BTC' not in app.positions
+    assert app.paper_ledger.fill_count == 0
+
+
+def test_paper_buy_opens_position_with_filled_quantity():
+    app = create_headless_app(trade_ratio='50')
+    app.paper_ledger = PaperLedger(cash=1_000_000, fee_rate=0.0)
+    assert app._paper_buy('KRW-BTC', 10_000, buy_candle_time=300) is True
+    position = app.positions.get('KRW-BTC')
+    assert position.buy_volume == pytest.approx(50)
+    assert position.buy_candle_time == 300
+    assert app._paper_buy('KRW-BTC', 10_000) is False
+
+
+def test_paper_buy_uses_applied_trade_ratio_not_widget_value():
+    app = create_headless_app(trade_ratio='100')
+    app.paper_ledger = PaperLedger(cash=1_000_000, fee_rate=0.0)
+    app.trade_ratio = 25
+    app.trade_ratio_var.set('0')
+    assert app._paper_buy('KRW-BTC', 10_000) is True
+    assert app.paper_ledger.cash == pytest.approx(750_000)
+
+
+def test_summary_is_consistent_with_concurrent_fills():
+    ledger = PaperLedger(cash=1_000_000, fee_rate=0.0, slippage=0.0)
+    stop = threading.Event()
+
+    def trade(ticker):
+        while not stop.is_set():
+            ledger.buy(ticker, 1_000, 10_000)
+            ledger.mark(ticker, 1_000)
+            ledger.sell(ticker, 1_000, 1.0)
+
+    threads = [threading.Thread(target=trade, args=(f"KRW-T{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        equities = [ledger.summary()['equity'] for _ in range(2000)]
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    assert equities == pytest.approx([1_000_000] * len(equities))
@@ -0,0 +1,119 @@
+import threading
+
+import pytest
+
+from Auto_trading_gui import (POSITION_CLOSING, POSITION_HALF_SOLD, POSITION_OPEN, POSITION_OPENING, PositionStore)
+from headless import create_headless_app
+
+
+def test_buy_half_sell_close_round_trip():
+    store = PositionStore()
+    assert store.reserve('KRW-BTC')
+    assert store.get('KRW-BTC').state == POSITION_OPENING
+    assert store.confirm_open('KRW-BTC', 1000.0, 2.0, buy_candle_time=300, manual_buy=True)
+
+    position = store.get('KRW-BTC')
+    assert (position.state, position.buy_price, position.buy_volume, position.buy_candle_time, position.manual_buy) == \
+        (POSITION_OPEN, 1000.0, 2.0, 300, True)
+
+    assert store.mark_half_sold('KRW-BTC')
+    assert store.get('KRW-BTC').state == POSITION_HALF_SOLD
+    previous = store.begin_close('KRW-BTC')
+    assert previous.state == POSITION_HALF_SOLD
+    assert store.get('KRW-BTC').state == POSITION_CLOSING
+    store.finish_close('KRW-BTC', True, previous)
+    assert 'KRW-BTC' not in store
+    assert len(store) == 0
+
+
+def test_failed_close_restores_previous_state():
+    store = PositionStore()
+    store.reserve('KRW-ETH')
+    store.confirm_open('KRW-ETH', 500.0)
+    previous = store.begin_close('KRW-ETH')
+    store.finish_close('KRW-ETH', False, previous)
+    assert store.get('KRW-ETH') == previous
+
+
+def test_release_only_drops_opening_positions():
+    store = PositionStore()
+    store.reserve('KRW-XRP')
+    store.release('KRW-XRP')
+    assert 'KRW-XRP' not in store
+
+    store.reserve('KRW-XRP')
+    store.confirm_open('KRW-XRP', 100.0)
+    store.release('KRW-XRP')
+    assert store.get('KRW-XRP').state == POSITION_OPEN
+
+
+def test_invalid_transitions_are_rejected():
+    store = PositionStore()
+    assert not store.confirm_open('KRW-BTC', 1.0)
+    assert not store.mark_half_sold('KRW-BTC')
+    assert store.begin_close('KRW-BTC') is None
+    assert store.close('KRW-BTC') is None
+    store.finish_close('KRW-BTC', True)
+
+    store.reserve('KRW-BTC')
+    assert not store.reserve('KRW-BTC')
+    assert not store.mark_half_sold('KRW-BTC')
+    assert store.begin_close('KRW-BTC') is None
+    assert store.close('KRW-BTC') is None
+
+    store.confirm_open('KRW-BTC', 1.0)
+    assert not store.confirm_open('KRW-BTC', 2.0)
+    assert store.mark_half_sold('KRW-BTC')
+    assert not store.mark_half_sold('KRW-BTC')
+
+    store.begin_close('KRW-BTC')
+    assert store.begin_close('KRW-BTC') is None
+    assert store.close('KRW-BTC') is None
+    assert not store.reserve('KRW-BTC')
+    assert store.get('KRW-BTC').buy_price == 1.0
+
+
+def test_close_returns_removed_position():
+    store = PositionStore()
+    store.reserve('KRW-SOL')
+    store.confirm_open('KRW-SOL', 10.0)
+    assert store.close('KRW-SOL').buy_price == 10.0
+    assert store.snapshot() == {}
+
+
+def test_concurrent_reserve_has_single_winner():
+    store = PositionStore()
+    barrier = threading.Barrier(16)
+    wins = []
+
+    def contend():
+        barrier.wait()
+        wins.append(store.reserve('KRW-BTC'))
+
+    threads = [threading.Thread(target=contend) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert wins.count(True) == 1
+
+
+class _Upbit:
+    def __init__(self, balance):
+        self.balance = balance
+        self.orders = []
+
+    def get_balance(self, currency):
+        return self.balance
+
+    def buy_market_order(self, ticker, amount):
+        self.orders.append((ticker, amount))
+        return {'uuid': 'test'}
+
+
+@pytest.mark.parametrize('balance, expected', [(None, False), (1000, False), (1_000_000, True)])
+def test_execute_buy_always_returns_bool(balance, expected):
+    app = create_headless_app(mode='TRADING')
+    app.upbit = _Upbit(balance)
+    assert app._execute_buy('KRW-BTC', 10_000.0) is expected
+    assert ('KRW-BTC' in app.positions) is expected
@@ -0,0 +1,84 @@
+import threading
+
+from Auto_trading_gui import SystemClock, TradingScheduler, VirtualClock, next_candle_close
+from headless import create_headless_app
+
+
+def test_virtual_timers_fire_in_time_then_registration_order():
+    clock = VirtualClock(1000)
+    scheduler = TradingScheduler(clock)
+    fired = []
+    for when, name in ((1030, 'c'), (1010, 'a'), (1030, 'd'), (1020, 'b')):
+        scheduler.call_at(when, lambda name=name: fired.append((name, clock.time())), name=name)
+
+    assert scheduler.wait(scheduler.call_at(1030, name='last'))
+    assert fired == [('a', 1010), ('b', 1020), ('c', 1030), ('d', 1030)]
+    assert clock.time() == 1030
+
+
+def test_cancelled_timer_does_not_run_and_reports_cancel():
+    clock = VirtualClock(0)
+    scheduler = TradingScheduler(clock)
+    fired = []
+    timer = scheduler.call_at(10, lambda: fired.append('x'))
+    timer.cancel()
+    assert scheduler.wait(timer) is False
+    scheduler.run_until(20)
+    assert fired == []
+    assert clock.time() == 20
+
+
+def test_callback_error_does_not_stop_later_timers():
+    clock = VirtualClock(0)
+    scheduler = TradingScheduler(clock)
+    fired = []
+    scheduler.call_at(1, lambda: 1 / 0)
+    scheduler.call_at(2, lambda: fired.append(2))
+    scheduler.run_until(5)
+    assert fired == [2]
+
+
+def test_stop_wakes_realtime_waiters_and_cancels_new_timers():
+    scheduler = TradingScheduler(SystemClock()).start()
+    timer = scheduler.call_later(3600)
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(scheduler.wait(timer)))
+    waiter.start()
+    scheduler.stop()
+    waiter.join(2)
+    assert results == [False]
+    assert scheduler.call_later(0).cancelled
+
+
+def test_next_candle_close_aligns_to_interval_boundaries():
+    assert next_candle_close('minute5', 600) == 900
+    assert next_candle_close('minute5', 899.5) == 900
+    assert next_candle_close('hour1', 3600) == 7200
+    week = next_candle_close('week', 0)
+    assert week % (7 * 86400) == 4 * 86400
+
+
+def _wait_seconds(app, load_time):
+    start = app.clock.time()
+    app._wait_next_cycle('day', load_time, app._trading_config['align'])
+    return app.clock.time() - start
+
+
+def test_aligned_wait_polls_at_load_time_only_while_holding():
+    app = create_headless_app()
+    app.clock = VirtualClock(86400 * 10 + 60)
+    app.scheduler = TradingScheduler(app.clock)
+    app.cycle_jitter_seconds = 0
+    app._trading_config = {'align': True}
+
+    assert _wait_seconds(app, 10) == 86400 - 60
+
+    app.positions.reserve('KRW-BTC')
+    app.positions.confirm_open('KRW-BTC', 1000.0)
+    assert _wait_seconds(app, 10) == 10
+
+    app._trading_config = {'align': False}
+    app.align_candle_var.set(True) # 적용 전 체크박스 변경은 대기 방식에 영향 없음
+    app.positions.begin_close('KRW-BTC')
+    app.positions.finish_close('KRW-BTC', True, None)
+    assert _wait_seconds(app, 10) == 10
@@ -0,0 +1,43 @@
+import numpy as np
+
+from Auto_trading_gui import CANDLE_BUFFER_SIZE, CandleBuffer, PerformanceMetrics, ShardedEngine, candle_epoch_seconds, refresh_candles
+from headless import FakePyupbit, install_fake_pyupbit, install_shard_fake_pyupbit, synthetic_ohlcv
+
+INTERVAL = 'minute5'
+
+
+def _assert_same(candles, expected):
+    assert len(candles) == len(expected)
+    np.testing.assert_array_equal(candles.epoch[-len(candles):], expected.epoch[-len(expected):])
+    np.testing.assert_array_equal(candles.values[:, -len(candles):], expected.values[:, -len(expected):])
+    assert candles.latest() == expected.latest()
+
+
+def test_shard_deltas_rebuild_coordinator_buffers():
+    universe = {ticker: synthetic_ohlcv(ticker, count=600) for ticker in ('KRW-A', 'KRW-B', 'KRW-C')}
+    now = int(candle_epoch_seconds(universe['KRW-A'].index[-1:])[0])
+    fake = FakePyupbit(universe, auto_advance=True)
+    original = install_fake_pyupbit(fake)
+    metrics = PerformanceMetrics()
+    expected = {ticker: CandleBuffer() for ticker in universe}
+    engine = ShardedEngine(2, archive_root=None, initializer=install_shard_fake_pyupbit, initargs=(universe,)).start()
+    try:
+        engine.assign(list(universe))
+        for _ in range(4):
+            received = dict(engine.tick(now, INTERVAL))
+            assert set(received) == set(universe)
+            for ticker, candles in received.items():
+                refresh_candles(expected[ticker], ticker, INTERVAL, now, metrics)
+                _assert_same(candles, expected[ticker])
+
+        # 배정에서 빠졌다가 돌아온 종목은 샤드가 전체를 다시 보냄
+        engine.assign(['KRW-A', 'KRW-B'])
+        assert ('KRW-C', INTERVAL) not in engine.buffers
+        dict(engine.tick(now, INTERVAL))
+        engine.assign(list(universe))
+        received = dict(engine.tick(now, INTERVAL))
+        assert received['KRW-C'] is engine.buffers[('KRW-C', INTERVAL)]
+        assert len(received['KRW-C']) == CANDLE_BUFFER_SIZE
+    finally:
+        engine.stop()
+        install_fake_pyupbit(original)
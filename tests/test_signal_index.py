@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from Auto_trading_gui import (CandleArchive, SIGNAL_ABOVE_MA50, SIGNAL_INDEX_DTYPE, SIGNAL_INDEX_MAGIC, SIGNAL_TREND_OK,
+                              candle_epoch_seconds, compute_signal_flags)
+from headless import synthetic_ohlcv
+
+TICKER = 'KRW-TEST'
+INTERVAL = 'minute5'
+
+
+@pytest.fixture
+def candles():
+    return synthetic_ohlcv(TICKER, count=900, interval=INTERVAL)
+
+
+def _expected_flags(df):
+    return compute_signal_flags(*(df[column].to_numpy(dtype=np.float64) for column in ('open', 'high', 'low', 'close', 'volume')))
+
+
+def test_incremental_update_matches_full_compute(tmp_path, candles):
+    archive = CandleArchive(str(tmp_path))
+    for end in range(300, len(candles) + 1, 75):
+        archive.append(TICKER, INTERVAL, candles.iloc[:end], closed_only=False)
+    archive.append(TICKER, INTERVAL, candles, closed_only=False)
+
+    records = archive.signals.records(TICKER, INTERVAL)
+    assert len(records) == len(candles)
+    np.testing.assert_array_equal(records['epoch'], candle_epoch_seconds(candles.index))
+    np.testing.assert_array_equal(records['flags'], _expected_flags(candles))
+
+
+def test_backfill_after_truncated_index(tmp_path, candles):
+    archive = CandleArchive(str(tmp_path))
+    archive.append(TICKER, INTERVAL, candles, closed_only=False)
+    path = archive.signals.path(TICKER, INTERVAL)
+    with open(path, 'r+b') as f:
+        f.truncate(len(SIGNAL_INDEX_MAGIC) + 500 * SIGNAL_INDEX_DTYPE.itemsize)
+
+    reopened = CandleArchive(str(tmp_path))
+    assert reopened.signals.last_epoch(TICKER, INTERVAL) == candle_epoch_seconds(candles.index[499:500])[0]
+    assert reopened.signals.update(TICKER, INTERVAL) == len(candles) - 500
+    assert reopened.signals.update(TICKER, INTERVAL) == 0
+
+    records = reopened.signals.records(TICKER, INTERVAL)
+    np.testing.assert_array_equal(records['epoch'], candle_epoch_seconds(candles.index))
+    np.testing.assert_array_equal(records['flags'], _expected_flags(candles))
+
+
+def test_count_and_query_filter_by_mask_and_inclusive_range(tmp_path, candles):
+    archive = CandleArchive(str(tmp_path))
+    archive.append(TICKER, INTERVAL, candles, closed_only=False)
+    other = synthetic_ohlcv('KRW-OTHER', count=900, interval=INTERVAL)
+    archive.append('KRW-OTHER', INTERVAL, other, closed_only=False)
+    signals = archive.signals
+    assert signals.tickers(INTERVAL) == ['KRW-OTHER', TICKER]
+
+    mask = SIGNAL_TREND_OK | SIGNAL_ABOVE_MA50
+    start, end = candles.index[400], candles.index[700]
+    expected = {}
+    for ticker, df in ((TICKER, candles), ('KRW-OTHER', other)):
+        flags = _expected_flags(df)
+        window = (df.index >= start) & (df.index <= end)
+        expected[ticker] = int(np.count_nonzero(window & ((flags & mask) == mask)))
+    assert signals.count([TICKER, 'KRW-OTHER'], INTERVAL, mask, start, end) == expected
+
+    result = signals.query([TICKER, 'KRW-OTHER'], INTERVAL, mask, start, end)
+    assert len(result) == sum(expected.values())
+    assert result['time'].is_monotonic_increasing
+    assert result['time'].between(start, end).all()
+    assert ((result['flags'] & mask) == mask).all()
+    assert signals.count([TICKER], INTERVAL, mask, end=start - (end - start)) == {TICKER: 0}
+
+
+def test_records_rejects_foreign_file(tmp_path):
+    archive = CandleArchive(str(tmp_path))
+    path = archive.signals.path(TICKER, INTERVAL)
+    (tmp_path / TICKER / INTERVAL).mkdir(parents=True)
+    with open(path, 'wb') as f:
+        f.write(b'NOTINDEX' + bytes(SIGNAL_INDEX_DTYPE.itemsize))
+
+    with pytest.raises(ValueError):
+        archive.signals.records(TICKER, INTERVAL)
+    assert archive.signals.records('KRW-NONE', INTERVAL).dtype == SIGNAL_INDEX_DTYPE